@@ -35,3 +35,7 @@ from .content_service import ContentService
 content_service = ContentService()
 
 
+
+# init async facade (needs content)
+from .async_content_service import AsyncContentService
+async_content_service = AsyncContentService()
@@ -0,0 +1,289 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# python 3.6 has no get_running_loop, get_event_loop returns running loop there
+get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+class AsyncContentService:
+    """
+    Async content service
+    Provides awaitable versions of content service methods for asyncio
+    applications. Calls run in a bounded pool of threads so that database,
+    cache and search requests do not block the event loop, while items are
+    still retrieved and serialized by the regular content service.
+
+    The number of calls running at the same time is limited by the size of
+    the pool, extra calls wait for a free thread. Calls exceeding timeout
+    raise asyncio.TimeoutError, however the underlying request will still
+    run to completion in its thread.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Init service
+        If any parameters are given to constructor, a delayed initializer is
+        called with these parameters.
+        """
+        self.content_service = None
+        self.max_workers = 10
+        self.timeout = None
+        self._executor = None
+
+        if args or kwargs:
+            self.init(*args, **kwargs)
+
+    def init(self, content_service=None, max_workers=10, timeout=None):
+        """
+        Delayed service initializer
+        :param content_service: shiftcontent.content_service.ContentService
+        :param max_workers: int, max number of calls to run concurrently
+        :param timeout: float, default call timeout in seconds
+        :return: shiftcontent.async_content_service.AsyncContentService
+        """
+        self.shutdown(wait=False)
+        self.content_service = content_service
+        self.max_workers = max_workers
+        self.timeout = timeout
+        return self
+
+    @property
+    def service(self):
+        """
+        Service
+        Returns content service to delegate calls to, global one by default
+        :return: shiftcontent.content_service.ContentService
+        """
+        if not self.content_service:
+            from shiftcontent import content_service
+            self.content_service = content_service
+        return self.content_service
+
+    @property
+    def executor(self):
+        """
+        Executor
+        Returns pool of threads to run calls in, creating it on first access
+        :return: concurrent.futures.ThreadPoolExecutor
+        """
+        if not self._executor:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='shiftcontent'
+            )
+        return self._executor
+
+    def shutdown(self, wait=True):
+        """
+        Shutdown
+        Stops the pool of threads. A new one will be created on next call.
+        :param wait: bool, wait for running calls to finish
+        :return: None
+        """
+        if self._executor:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    async def call(self, method, *args, timeout=None, **kwargs):
+        """
+        Call
+        Runs content service method in the pool and waits for the result
+        :param method: str, content service method name
+        :param args: positional arguments for the method
+        :param timeout: float, call timeout in seconds, overrides default
+        :param kwargs: keyword arguments for the method
+        :return: mixed
+        """
+        loop = get_running_loop()
+        method = getattr(self.service, method)
+        call = functools.partial(method, *args, **kwargs)
+        future = loop.run_in_executor(self.executor, call)
+        timeout = timeout if timeout is not None else self.timeout
+        return await asyncio.wait_for(future, timeout)
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    async def get_item(self, object_id, timeout=None):
+        """
+        Get item
+        :param object_id: str, object id
+        :param timeout: float, call timeout in seconds
+        :return: shiftcontent.item.Item
+        """
+        return await self.call('get_item', object_id, timeout=timeout)
+
+    async def get_items(self, object_ids, timeout=None):
+        """
+        Get items
+        Resolves a list of object ids in one batch
+        :param object_ids: list, object ids
+        :param timeout: float, call timeout in seconds
+        :return: list
+        """
+        return await self.call('get_items', object_ids, timeout=timeout)
+
+    async def list_items(self, timeout=None, **kwargs):
+        """
+        List items
+        Accepts the same keyword arguments as ContentService.list_items
+        :param timeout: float, call timeout in seconds
+        :return: dict
+        """
+        return await self.call('list_items', timeout=timeout, **kwargs)
+
+    async def get_path(self, object_id, timeout=None):
+        """
+        Get path
+        :param object_id: str, object id
+        :param timeout: float, call timeout in seconds
+        :return: list
+        """
+        return await self.call('get_path', object_id, timeout=timeout)
+
+    async def get_children(self, object_id, timeout=None):
+        """
+        Get children
+        :param object_id: str, object id
+        :param timeout: float, call timeout in seconds
+        :return: list
+        """
+        return await self.call('get_children', object_id, timeout=timeout)
+
+    async def get_descendants(self, object_id, max_depth=None, timeout=None):
+        """
+        Get descendants
+        :param object_id: str, object id
+        :param max_depth: int, max depth relative to the item
+        :param timeout: float, call timeout in seconds
+        :return: list
+        """
+        return await self.call(
+            'get_descendants',
+            object_id,
+            max_depth=max_depth,
+            timeout=timeout
+        )
+
+    async def get_tree(
+        self,
+        object_id,
+        max_depth=None,
+        fields=None,
+        timeout=None):
+        """
+        Get tree
+        :param object_id: str, object id
+        :param max_depth: int, max depth relative to the item
+        :param fields: list, custom fields to project items to
+        :param timeout: float, call timeout in seconds
+        :return: dict
+        """
+        return await self.call(
+            'get_tree',
+            object_id,
+            max_depth=max_depth,
+            fields=fields,
+            timeout=timeout
+        )
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    async def create_item(
+        self,
+        author,
+        content_type,
+        fields,
+        parent=None,
+        timeout=None):
+        """
+        Create item
+        :param author: str, author id
+        :param content_type: str, content type
+        :param fields: dict, item fields
+        :param parent: shiftcontent.item.Item, optional parent item
+        :param timeout: float, call timeout in seconds
+        :return: shiftcontent.item.Item
+        """
+        return await self.call(
+            'create_item',
+            author,
+            content_type,
+            fields,
+            parent=parent,
+            timeout=timeout
+        )
+
+    async def update_item(self, author, item, timeout=None):
+        """
+        Update item
+        :param author: str, author id
+        :param item: shiftcontent.item.Item, item to save
+        :param timeout: float, call timeout in seconds
+        :return: shiftcontent.item.Item
+        """
+        return await self.call('update_item', author, item, timeout=timeout)
+
+    async def update_item_field(
+        self,
+        author,
+        object_id,
+        field,
+        value,
+        version=None,
+        timeout=None):
+        """
+        Update item field
+        :param author: str, author id
+        :param object_id: str, object id to update
+        :param field: str, field name
+        :param value: str, new value to set
+        :param version: int, expected item version
+        :param timeout: float, call timeout in seconds
+        :return: shiftcontent.item.Item
+        """
+        return await self.call(
+            'update_item_field',
+            author,
+            object_id,
+            field,
+            value,
+            version=version,
+            timeout=timeout
+        )
+
+    async def delete_item(self, author, object_id, timeout=None):
+        """
+        Delete item
+        :param author: str, author id
+        :param object_id: str, object id
+        :param timeout: float, call timeout in seconds
+        :return: shiftcontent.content_service.ContentService
+        """
+        return await self.call(
+            'delete_item',
+            author,
+            object_id,
+            timeout=timeout
+        )
+
+    async def set_parent(self, author, item, parent, timeout=None):
+        """
+        Set parent
+        :param author: str, author id
+        :param item: shiftcontent.item.Item
+        :param parent: shiftcontent.item.Item
+        :param timeout: float, call timeout in seconds
+        :return: shiftcontent.content_service.ContentService
+        """
+        return await self.call(
+            'set_parent',
+            author,
+            item,
+            parent,
+            timeout=timeout
+        )
@@ -28,6 +28,8 @@ def content_feature(app):
     db_params = dict(
         meta=cfg.get('SHIFTCONTENT_DB_META'),
         dialect=cfg.get('SHIFTCONTENT_DB_DIALECT'),
+        type_tables=cfg.get('SHIFTCONTENT_DB_TYPE_TABLES', False),
+        outbox=cfg.get('SHIFTCONTENT_DB_OUTBOX', False),
         **cfg.get('SHIFTCONTENT_DB_PARAMS', {})
     )
     if engine:
@@ -51,6 +53,8 @@ def content_feature(app):
             host=cfg.get('SHIFTCONTENT_CACHE_HOST', 'localhost'),
             port=cfg.get('SHIFTCONTENT_CACHE_PORT', 6379),
             db=cfg.get('SHIFTCONTENT_CACHE_DB', 1),
+            local_cache_size=cfg.get('SHIFTCONTENT_CACHE_LOCAL_SIZE'),
+            local_cache_ttl=cfg.get('SHIFTCONTENT_CACHE_LOCAL_TTL', 60),
             **cfg.get('SHIFTCONTENT_CACHE_PARAMS', {})
         )
 
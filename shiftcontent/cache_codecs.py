@@ -0,0 +1,124 @@
+import json
+import zlib
+from shiftcontent import exceptions as x
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class JsonCodec:
+    """
+    Json codec
+    Stores items in cache as ascii-escaped json strings. This is the
+    original cache format that is readable by any version of the library.
+    """
+
+    def dumps(self, data):
+        """
+        Dumps
+        Encodes item data for cache
+        :param data: dict, item data from Item.to_json(as_string=False)
+        :return: str
+        """
+        return json.dumps(data, ensure_ascii=True)
+
+    def loads(self, data):
+        """
+        Loads
+        Decodes item data from cache
+        :param data: str or bytes, cached data
+        :return: dict or None if data can not be decoded
+        """
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        try:
+            return json.loads(data)
+        except ValueError:
+            return
+
+
+class CompactCodec(JsonCodec):
+    """
+    Compact codec
+    Stores items in cache as binary: a format version byte and a flags byte
+    followed by utf-8 json (or msgpack, if installed and enabled) that is
+    compressed with zlib when larger than a threshold. Large text fields
+    compress well, so this noticeably cuts memory used by redis.
+
+    Data in the original json format is still decoded, so the codec can be
+    switched on for existing caches. Data in unknown format is treated as a
+    cache miss.
+    """
+
+    VERSION = 1
+
+    # flags
+    COMPRESSED = 1
+    MSGPACK = 2
+
+    def __init__(self, compress_over=1024, level=1, use_msgpack=False):
+        """
+        Create codec
+        :param compress_over: int, compress data larger than this many bytes
+        :param level: int, zlib compression level
+        :param use_msgpack: bool, encode with msgpack instead of json
+        """
+        if use_msgpack and not msgpack:
+            msg = 'Install msgpack to use it for cache encoding'
+            raise x.ConfigurationException(msg)
+
+        self.compress_over = compress_over
+        self.level = level
+        self.use_msgpack = use_msgpack
+
+    def dumps(self, data):
+        """
+        Dumps
+        Encodes item data for cache
+        :param data: dict, item data from Item.to_json(as_string=False)
+        :return: bytes
+        """
+        flags = 0
+        if self.use_msgpack:
+            flags |= self.MSGPACK
+            payload = msgpack.packb(data, use_bin_type=True)
+        else:
+            payload = json.dumps(
+                data,
+                ensure_ascii=False,
+                separators=(',', ':')
+            ).encode('utf-8')
+
+        compress = self.compress_over is not None
+        if compress and len(payload) > self.compress_over:
+            flags |= self.COMPRESSED
+            payload = zlib.compress(payload, self.level)
+
+        return bytes((self.VERSION, flags)) + payload
+
+    def loads(self, data):
+        """
+        Loads
+        Decodes item data from cache
+        :param data: str or bytes, cached data
+        :return: dict or None if data can not be decoded
+        """
+        if isinstance(data, str) or data[:1] == b'{':
+            return super().loads(data)
+
+        if len(data) < 2 or data[0] != self.VERSION:
+            return
+
+        flags = data[1]
+        payload = data[2:]
+        try:
+            if flags & self.COMPRESSED:
+                payload = zlib.decompress(payload)
+            if not flags & self.MSGPACK:
+                return json.loads(payload.decode('utf-8'))
+            if msgpack:
+                return msgpack.unpackb(payload, raw=False)
+        except (ValueError, zlib.error):
+            return
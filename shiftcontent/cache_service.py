@@ -1,6 +1,13 @@
 from shiftmemory import Memory
+from redis import StrictRedis
 import json
+import math
+import random
+import time
+from uuid import uuid4
 from shiftcontent.item import Item
+from shiftcontent.local_cache import LocalCache, RedisInvalidationChannel
+from shiftcontent.cache_codecs import JsonCodec
 from shiftmemory import exceptions as cx
 from pprint import pprint as pp
 
@@ -14,6 +21,31 @@ class CacheService(Memory):
 
     cache_name = 'content'
 
+    # optional in-process cache tier
+    local_cache = None
+    invalidation_channel = None
+    _subscribed = False
+    _sender_id = None
+
+    # stampede protection (optional)
+    lock_timeout = None
+    early_refresh = None
+
+    # negative caching of missing items (optional)
+    missing_ttl = None
+
+    # item encoding
+    codec = JsonCodec()
+    _data_redis = None
+
+    # release lock only if we still hold it
+    UNLOCK_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
     def init(
         self,
         cache_name='content',
@@ -21,6 +53,13 @@ class CacheService(Memory):
         host='localhost',
         port=6379,
         db=0,
+        local_cache_size=None,
+        local_cache_ttl=60,
+        invalidation_channel=None,
+        lock_timeout=None,
+        early_refresh=None,
+        missing_ttl=None,
+        codec=None,
         **kwargs
     ):
         """
@@ -35,11 +74,37 @@ class CacheService(Memory):
         :param host: str, redis host, defaults to localhost
         :param port: int, redis port defaults to 6379
         :param db: int, redis database id to use, defaults to 0
+        :param local_cache_size: int, enables in-process cache of this size
+        :param local_cache_ttl: int, in-process cache ttl in seconds
+        :param invalidation_channel: custom channel to broadcast invalidations
+        :param lock_timeout: float, enables redis lock on misses, in seconds
+        :param early_refresh: int, window before expiry to refresh items in
+        :param missing_ttl: int, enables caching of missing ids, in seconds
+        :param codec: cache codec to encode items with, defaults to json
         :param kwargs: additional config params to pass to redis adapter
         :return: shiftcontent.cache_service.CacheService
         """
 
         self.cache_name = cache_name
+        self.lock_timeout = lock_timeout
+        self.early_refresh = early_refresh
+        self.missing_ttl = missing_ttl
+        self.codec = codec or JsonCodec()
+        self._data_redis = None
+
+        # local cache (optional)
+        if self.invalidation_channel and self._subscribed:
+            self.invalidation_channel.close()
+
+        self.local_cache = None
+        self.invalidation_channel = invalidation_channel
+        self._subscribed = False
+        self._sender_id = uuid4().hex
+        if local_cache_size:
+            self.local_cache = LocalCache(
+                size=local_cache_size,
+                ttl=local_cache_ttl
+            )
 
         # cache adapters (only using redis)
         adapters = dict(
@@ -79,29 +144,143 @@ class CacheService(Memory):
 
         return cache
 
+    @property
+    def data_redis(self):
+        """
+        Data redis
+        Returns redis connection that reads raw bytes, used to get items
+        encoded by codec. Shares config with the cache adapter.
+        :return: redis.StrictRedis
+        """
+        if not self.cache:
+            return
+
+        if not self._data_redis:
+            config = dict(self.cache.config)
+            config['decode_responses'] = False
+            self._data_redis = StrictRedis(**config)
+
+        return self._data_redis
+
+    @property
+    def channel(self):
+        """
+        Invalidation channel
+        Returns channel used to broadcast local cache invalidations between
+        processes and starts listening to it on first access. Defaults to
+        redis pub/sub. Only available when local cache is enabled.
+        :return: shiftcontent.local_cache.RedisInvalidationChannel
+        """
+        if self.local_cache is None:
+            return
+
+        if not self.invalidation_channel:
+            if not self.cache:
+                return
+            self.invalidation_channel = RedisInvalidationChannel(
+                redis=self.cache.get_redis(),
+                channel='{}::invalidate'.format(self.cache_name)
+            )
+
+        if not self._subscribed:
+            self.invalidation_channel.subscribe(self.on_invalidate)
+            self._subscribed = True
+
+        return self.invalidation_channel
+
+    def on_invalidate(self, message):
+        """
+        On invalidate
+        Handles invalidation message from another process by dropping the
+        item (or everything) from local cache. Skips own messages.
+        :param message: str, message in the form of sender:object_ids
+        :return: None
+        """
+        if self.local_cache is None:
+            return
+
+        sender, _, object_ids = str(message).partition(':')
+        if sender == self._sender_id:
+            return
+
+        if object_ids == '*':
+            self.local_cache.delete_all()
+            return
+
+        for object_id in object_ids.split(','):
+            self.local_cache.delete(object_id)
+
+    def invalidate(self, object_id=None):
+        """
+        Invalidate
+        Drops item from local cache in this process and broadcasts the
+        invalidation to other processes. Drops everything if no object id
+        given.
+        :param object_id: str, object id
+        :return: shiftcontent.cache_service.CacheService
+        """
+        if self.local_cache is None:
+            return self
+
+        object_id = str(object_id) if object_id is not None else '*'
+        if object_id == '*':
+            self.local_cache.delete_all()
+        else:
+            self.local_cache.delete(object_id)
+
+        channel = self.channel
+        if channel:
+            channel.publish('{}:{}'.format(self._sender_id, object_id))
+
+        return self
+
+    def invalidate_many(self, object_ids):
+        """
+        Invalidate many
+        Drops several items from local cache in this process and broadcasts
+        the invalidation to other processes with a single message.
+        :param object_ids: list, object ids
+        :return: shiftcontent.cache_service.CacheService
+        """
+        object_ids = [str(object_id) for object_id in object_ids]
+        if self.local_cache is None or not object_ids:
+            return self
+
+        for object_id in object_ids:
+            self.local_cache.delete(object_id)
+
+        channel = self.channel
+        if channel:
+            message = ','.join(object_ids)
+            channel.publish('{}:{}'.format(self._sender_id, message))
+
+        return self
+
     def disconnect(self):
         """
         Disconnect
         Erases configured adapters and caches
         :return: shiftcontent.cache_service.CacheService
         """
+        if self.invalidation_channel and self._subscribed:
+            self.invalidation_channel.close()
+
+        self.local_cache = None
+        self.invalidation_channel = None
+        self._subscribed = False
+        self._data_redis = None
         self.adapters = {}
         self.caches = {}
 
-    def set(self, item, **kwargs):
+    def set(self, item, ttl=None):
         """
         Set
         Adds item to cache or updates item cache
         :param item: shiftcontent.item.Item
-        :param kwargs: keyword arguments to pass to cache adapter
+        :param ttl: int, optional custom ttl, defaults to cache ttl
         :return: shiftcontent.cache_service.CacheService
         """
-        if not self.cache:
-            return self
-
-        data = item.to_json()
-        self.cache.set(item.object_id, data, **kwargs)
-        return self
+        return self.set_many([item], ttl=ttl)
 
     def get(self, object_id):
         """
@@ -113,13 +292,230 @@ class CacheService(Memory):
         if not self.cache:
             return
 
-        data = self.cache.get(object_id)
+        object_id = str(object_id)
+        if self.local_cache is not None:
+            data = self.local_cache.get(object_id)
+            if data:
+                return Item().from_json(data)
+
+        key = self.cache.get_full_item_key(object_id)
+        data = self.data_redis.hget(key, 'data')
         if not data:
             return
 
-        item = Item()
-        item.from_json(data)
-        return item
+        return self.from_cache(object_id, data)
+
+    def get_with_ttl(self, object_id):
+        """
+        Get with ttl
+        Retrieves item from cache along with its remaining ttl in a single
+        round-trip. Ttl is None for items found in local cache or items that
+        never expire.
+        :param object_id: str, object id
+        :return: tuple, (shiftcontent.item.Item, ttl in seconds)
+        """
+        if not self.cache:
+            return None, None
+
+        object_id = str(object_id)
+        if self.local_cache is not None:
+            data = self.local_cache.get(object_id)
+            if data:
+                return Item().from_json(data), None
+
+        key = self.cache.get_full_item_key(object_id)
+        pipe = self.data_redis.pipeline(transaction=False)
+        pipe.hget(key, 'data')
+        pipe.pttl(key)
+        data, ttl = pipe.execute()
+        item = self.from_cache(object_id, data) if data else None
+        if not item:
+            return None, None
+
+        ttl = ttl / 1000 if ttl is not None and ttl >= 0 else None
+        return item, ttl
+
+    def should_refresh(self, ttl):
+        """
+        Should refresh
+        Decides whether an item should be refreshed ahead of its expiry.
+        Chance of refresh grows as the item gets closer to expiry within the
+        early refresh window, so that usually a single request refreshes a
+        hot item while the rest are still served from cache.
+        :param ttl: float, remaining ttl in seconds
+        :return: bool
+        """
+        if not self.early_refresh or ttl is None:
+            return False
+
+        chance = -math.log(1 - random.random())
+        return ttl <= self.early_refresh * chance
+
+    def lock_key(self, object_id):
+        """
+        Lock key
+        Returns cache key for a lock held while item is being loaded
+        :param object_id: str, object id
+        :return: str
+        """
+        return self.cache.get_full_item_key('lock::{}'.format(object_id))
+
+    def lock(self, object_id):
+        """
+        Lock
+        Tries to acquire a lease on loading an item so that only one process
+        goes to the database on a cache miss. The lock expires by itself
+        after lock timeout in case the holder dies.
+        :param object_id: str, object id
+        :return: str, lock token or None if lock is held by someone else
+        """
+        if not self.cache or not self.lock_timeout:
+            return
+
+        token = uuid4().hex
+        acquired = self.cache.get_redis().set(
+            self.lock_key(object_id),
+            token,
+            nx=True,
+            px=int(self.lock_timeout * 1000)
+        )
+        return token if acquired else None
+
+    def unlock(self, object_id, token):
+        """
+        Unlock
+        Releases item lock if it is still held with the given token
+        :param object_id: str, object id
+        :param token: str, lock token
+        :return: shiftcontent.cache_service.CacheService
+        """
+        if not self.cache or not token:
+            return self
+
+        redis = self.cache.get_redis()
+        redis.eval(self.UNLOCK_SCRIPT, 1, self.lock_key(object_id), token)
+        return self
+
+    def wait(self, object_id, interval=0.05):
+        """
+        Wait
+        Waits for another process holding the lock to put item to cache.
+        Gives up when the lock gets released or expires.
+        :param object_id: str, object id
+        :param interval: float, polling interval in seconds
+        :return: shiftcontent.item.Item or None
+        """
+        if not self.cache or not self.lock_timeout:
+            return
+
+        redis = self.cache.get_redis()
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(interval)
+            item = self.get(object_id)
+            if item or not redis.exists(self.lock_key(object_id)):
+                return item
+
+    def from_cache(self, object_id, data):
+        """
+        From cache
+        Creates an item from cached data and puts decoded data to local
+        cache, if enabled. Makes sure we listen to invalidations before
+        keeping anything locally. Data that can't be decoded is treated as
+        a cache miss.
+        :param object_id: str, object id
+        :param data: bytes, cached data
+        :return: shiftcontent.item.Item
+        """
+        data = self.codec.loads(data)
+        if data is None:
+            return
+
+        if self.local_cache is not None and self.channel:
+            self.local_cache.set(object_id, data)
+
+        return Item().from_json(data)
+
+    def set_many(self, items, ttl=None):
+        """
+        Set many
+        Adds several items to cache or updates their caches in a single
+        round-trip by pipelining writes to redis. Items are tagged with their
+        type and ancestors so that they can be dropped together later.
+        :param items: list, of shiftcontent.item.Item
+        :param ttl: int, optional custom ttl, defaults to cache ttl
+        :return: shiftcontent.cache_service.CacheService
+        """
+        if not self.cache or not items:
+            return self
+
+        tags_ttl = max(ttl or 0, self.cache.ttl)
+        redis = self.cache.get_redis()
+        pipe = redis.pipeline(transaction=False)
+        for item in items:
+            key = self.cache.get_full_item_key(str(item.object_id))
+            tags = self.item_tags(item)
+            data = self.codec.dumps(item.to_json(as_string=False))
+            pipe.hset(key, 'data', data)
+            pipe.hset(key, 'tags', ','.join(tags))
+            pipe.expire(key, ttl or self.cache.ttl)
+            for tag in tags:
+                tag_key = self.cache.get_tag_set_key(tag)
+                pipe.sadd(tag_key, key)
+                pipe.expire(tag_key, tags_ttl)
+
+        pipe.execute()
+        self.invalidate_many([item.object_id for item in items])
+        return self
+
+    def item_tags(self, item):
+        """
+        Item tags
+        Returns tags to mark cached item with: its content type and each of
+        its ancestors
+        :param item: shiftcontent.item.Item
+        :return: list
+        """
+        tags = ['type:{}'.format(item.type)]
+        if item.path:
+            ancestors = str(item.path).split('.')
+            tags.extend('tree:{}'.format(ancestor) for ancestor in ancestors)
+        return tags
+
+    def get_many(self, object_ids):
+        """
+        Get many
+        Retrieves several items from cache in a single round-trip by
+        pipelining reads to redis. Returns a dictionary of found items keyed
+        by object id, cache misses are not included.
+        :param object_ids: list, object ids
+        :return: dict
+        """
+        found = dict()
+        if not self.cache or not object_ids:
+            return found
+
+        object_ids = [str(object_id) for object_id in object_ids]
+        if self.local_cache is not None:
+            for object_id in object_ids:
+                data = self.local_cache.get(object_id)
+                if data:
+                    found[object_id] = Item().from_json(data)
+
+            object_ids = [i for i in object_ids if i not in found]
+            if not object_ids:
+                return found
+
+        pipe = self.data_redis.pipeline(transaction=False)
+        for object_id in object_ids:
+            pipe.hget(self.cache.get_full_item_key(object_id), 'data')
+
+        for object_id, data in zip(object_ids, pipe.execute()):
+            item = self.from_cache(object_id, data) if data else None
+            if item:
+                found[object_id] = item
+
+        return found
 
     def delete(self, object_id, **kwargs):
         """
@@ -133,6 +529,196 @@ class CacheService(Memory):
             return
 
         self.cache.delete(object_id, **kwargs)
+        self.invalidate(object_id)
+        return self
+
+    def delete_many(self, object_ids):
+        """
+        Delete many
+        Removes several items from cache in a single round-trip
+        :param object_ids: list, object ids
+        :return: shiftcontent.cache_service.CacheService
+        """
+        object_ids = [str(object_id) for object_id in object_ids if object_id]
+        if not self.cache or not object_ids:
+            return self
+
+        keys = [self.cache.get_full_item_key(i) for i in object_ids]
+        self.cache.get_redis().delete(*keys)
+        self.invalidate_many(object_ids)
+        return self
+
+    def delete_tagged(self, *tags):
+        """
+        Delete tagged
+        Removes all items marked with any of the tags from cache
+        :param tags: str, tags
+        :return: int, number of items removed
+        """
+        if not self.cache or not tags:
+            return 0
+
+        tag_keys = [self.cache.get_tag_set_key(tag) for tag in tags]
+        redis = self.cache.get_redis()
+        pipe = redis.pipeline(transaction=False)
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+
+        keys = set()
+        for members in pipe.execute():
+            keys.update(members)
+
+        prefix = self.cache.item_prefix
+        self.delete_many([key[len(prefix):] for key in keys])
+        redis.delete(*tag_keys)
+        return len(keys)
+
+    def delete_type(self, *content_types):
+        """
+        Delete type
+        Removes all items of given content types from cache
+        :param content_types: str, content type names
+        :return: int, number of items removed
+        """
+        tags = ['type:{}'.format(t) for t in content_types]
+        return self.delete_tagged(*tags)
+
+    def delete_subtree(self, object_id):
+        """
+        Delete subtree
+        Removes item along with all of its descendants from cache
+        :param object_id: str, object id of subtree root
+        :return: int, number of descendants removed
+        """
+        self.delete_many([object_id])
+        return self.delete_tagged('tree:{}'.format(object_id))
+
+    def children_key(self, object_id):
+        """
+        Children key
+        Returns cache key for a list of item's child ids
+        :param object_id: str, object id
+        :return: str
+        """
+        return 'children::{}'.format(object_id)
+
+    def set_children(self, object_id, child_ids, **kwargs):
+        """
+        Set children
+        Caches a list of object ids of item's direct children
+        :param object_id: str, parent object id
+        :param child_ids: list, child object ids
+        :param kwargs: keyword arguments to pass to cache adapter
+        :return: shiftcontent.cache_service.CacheService
+        """
+        if not self.cache:
+            return self
+
+        key = self.children_key(object_id)
+        self.cache.set(key, json.dumps(list(child_ids)), **kwargs)
+        return self
+
+    def get_children(self, object_id):
+        """
+        Get children
+        Retrieves a list of child object ids of an item or None if the list
+        is not cached
+        :param object_id: str, parent object id
+        :return: list
+        """
+        if not self.cache:
+            return
+
+        data = self.cache.get(self.children_key(object_id))
+        if data is None:
+            return
+
+        return json.loads(data)
+
+    def delete_children(self, *object_ids):
+        """
+        Delete children
+        Drops cached child id lists of given items in a single round-trip
+        :param object_ids: str, parent object ids
+        :return: shiftcontent.cache_service.CacheService
+        """
+        object_ids = [i for i in object_ids if i]
+        if not self.cache or not object_ids:
+            return self
+
+        keys = [self.children_key(object_id) for object_id in object_ids]
+        keys = [self.cache.get_full_item_key(key) for key in keys]
+        self.cache.get_redis().delete(*keys)
+        return self
+
+    def missing_key(self, object_id):
+        """
+        Missing key
+        Returns cache key for a tombstone of missing item
+        :param object_id: str, object id
+        :return: str
+        """
+        return self.cache.get_full_item_key('missing::{}'.format(object_id))
+
+    def set_missing(self, *object_ids):
+        """
+        Set missing
+        Puts short-lived tombstones for items that do not exist so that
+        repeated requests for them do not hit the database
+        :param object_ids: str, object ids
+        :return: shiftcontent.cache_service.CacheService
+        """
+        object_ids = [i for i in object_ids if i]
+        if not self.cache or not self.missing_ttl or not object_ids:
+            return self
+
+        pipe = self.cache.get_redis().pipeline(transaction=False)
+        for object_id in object_ids:
+            pipe.set(self.missing_key(object_id), 1, ex=self.missing_ttl)
+
+        pipe.execute()
+        return self
+
+    def get_missing(self, object_ids):
+        """
+        Get missing
+        Returns object ids that have a tombstone out of the given ones
+        :param object_ids: list, object ids
+        :return: set
+        """
+        object_ids = [str(object_id) for object_id in object_ids]
+        if not self.cache or not self.missing_ttl or not object_ids:
+            return set()
+
+        pipe = self.cache.get_redis().pipeline(transaction=False)
+        for object_id in object_ids:
+            pipe.exists(self.missing_key(object_id))
+
+        found = zip(object_ids, pipe.execute())
+        return set(object_id for object_id, exists in found if exists)
+
+    def is_missing(self, object_id):
+        """
+        Is missing
+        Checks if there is a tombstone for the item
+        :param object_id: str, object id
+        :return: bool
+        """
+        return str(object_id) in self.get_missing([object_id])
+
+    def delete_missing(self, *object_ids):
+        """
+        Delete missing
+        Removes tombstones of items that have been created
+        :param object_ids: str, object ids
+        :return: shiftcontent.cache_service.CacheService
+        """
+        object_ids = [i for i in object_ids if i]
+        if not self.cache or not self.missing_ttl or not object_ids:
+            return self
+
+        keys = [self.missing_key(object_id) for object_id in object_ids]
+        self.cache.get_redis().delete(*keys)
         return self
 
     def delete_all(self):
@@ -145,6 +731,7 @@ class CacheService(Memory):
             return
 
         self.cache.delete_all()
+        self.invalidate()
         return self
 
 
@@ -17,3 +17,7 @@ def cli():
 
 from shiftcontent.cli.definition import cli as definition
 cli.add_command(definition, name='definition')
+from shiftcontent.cli.content import cli as content
+cli.add_command(content, name='content')
+from shiftcontent.cli.search import cli as search
+cli.add_command(search, name='search')
@@ -0,0 +1,178 @@
+import click, os, json
+from shiftcontent.cli.colours import *
+import yaml
+from pprint import pprint as pp
+from shiftcontent import content_service
+from shiftcontent import db
+from shiftcontent.database import tree
+from shiftcontent.database import field_index
+from shiftcontent.database import type_tables
+from shiftcontent.outbox_worker import OutboxWorker
+from shiftcontent.columnar import write_csv
+
+# -----------------------------------------------------------------------------
+# Group setup
+# -----------------------------------------------------------------------------
+
+
+@click.group(help=yellow('Content commands'))
+def cli():
+    pass
+
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+
+def read_items(path):
+    """
+    Read items
+    Streams items from a file one by one. Supports JSON lines (one item per
+    line) and YAML files, either as a stream of documents or a single
+    document with a list of items.
+
+    :param path: str, path to file
+    :return: generator
+    """
+    _, ext = os.path.splitext(path)
+    with open(path) as file:
+        if ext.lower() in ('.yml', '.yaml'):
+            for document in yaml.safe_load_all(file):
+                if type(document) is list:
+                    yield from document
+                elif document:
+                    yield document
+            return
+
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+# -----------------------------------------------------------------------------
+# Commands
+# -----------------------------------------------------------------------------
+
+@cli.command(name='import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--author', '-a', required=True, help='Import author id')
+@click.option('--batch-size', '-b', default=500, help='Items per batch')
+def import_items(path, author, batch_size):
+    """ Import content items from JSONL or YAML file """
+    print(yellow('\nImporting content items from file: \n{}'.format(path)))
+    print(yellow('-' * 80))
+
+    report = content_service.import_items(
+        author=author,
+        items=read_items(path),
+        batch_size=batch_size
+    )
+
+    print(green('Imported {} items'.format(report['imported'])))
+    if not report['errors']:
+        print()
+        return
+
+    print(red('Skipped {} invalid items:'.format(len(report['errors']))))
+    for index, errors in report['errors'].items():
+        print(yellow('{} * Item {}:'.format(' ' * 4, index)))
+        for field, messages in errors.items():
+            for message in messages:
+                print('{} - {}: {}'.format(' ' * 8, field, message))
+
+    print()
+
+
+@cli.command(name='export')
+@click.argument('content_type')
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+@click.option('--fields', '-f', default=None, help='Comma-separated fields')
+@click.option('--batch-size', '-b', default=5000, help='Items per batch')
+def export_items(content_type, path, fields, batch_size):
+    """ Export content items of a type to CSV file """
+    print(yellow('\nExporting [{}] items to file: \n{}'.format(
+        content_type,
+        path
+    )))
+    print(yellow('-' * 80))
+
+    if fields:
+        fields = [field.strip() for field in fields.split(',')]
+
+    batches = content_service.export_columns(
+        content_type,
+        fields=fields,
+        batch_size=batch_size
+    )
+    with open(path, 'w', newline='') as file:
+        count = write_csv(batches, file)
+
+    print(green('Exported {} items\n'.format(count)))
+
+
+@cli.command(name='rebuild-tree')
+@click.option('--batch-size', '-b', default=1000, help='Items per batch')
+def rebuild_tree(batch_size):
+    """ Rebuild content hierarchy from item paths """
+    print(yellow('\nRebuilding content hierarchy'))
+    print(yellow('-' * 80))
+
+    with db.engine.begin() as conn:
+        count = tree.rebuild(conn, batch_size=batch_size)
+
+    print(green('Processed {} items\n'.format(count)))
+
+
+@cli.command(name='rebuild-index')
+@click.option('--batch-size', '-b', default=1000, help='Items per batch')
+def rebuild_field_index(batch_size):
+    """ Rebuild index of fields marked as indexed """
+    print(yellow('\nRebuilding field index'))
+    print(yellow('-' * 80))
+
+    with db.engine.begin() as conn:
+        count = field_index.rebuild(conn, batch_size=batch_size)
+
+    print(green('Processed {} items\n'.format(count)))
+
+
+@cli.command(name='rebuild-type-tables')
+@click.option('--batch-size', '-b', default=1000, help='Items per batch')
+def rebuild_type_tables(batch_size):
+    """ Rebuild per content type projection tables """
+    print(yellow('\nRebuilding type tables'))
+    print(yellow('-' * 80))
+
+    with db.engine.begin() as conn:
+        count = type_tables.rebuild(conn, batch_size=batch_size)
+
+    print(green('Processed {} items\n'.format(count)))
+
+
+@cli.command(name='outbox-worker')
+@click.option('--batch-size', '-b', default=500, help='Entries per batch')
+@click.option('--interval', '-i', default=1, help='Idle wait in seconds')
+def run_outbox_worker(batch_size, interval):
+    """ Apply queued search and cache updates until interrupted """
+    print(yellow('\nRunning outbox worker, press Ctrl+C to stop'))
+    print(yellow('-' * 80))
+
+    worker = OutboxWorker(batch_size=batch_size, interval=interval)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+
+    print(green('\nStopped\n'))
+
+
+@cli.command(name='outbox-stats')
+def outbox_stats():
+    """ Show pending and failed outbox entries and lag """
+    stats = OutboxWorker().stats()
+    print(yellow('\nContent outbox'))
+    print(yellow('-' * 80))
+    print('{} * Pending: {}'.format(' ' * 4, stats['pending']))
+    print('{} * Failed: {}'.format(' ' * 4, stats['failed']))
+    print('{} * Lag: {:.1f}s\n'.format(' ' * 4, stats['lag']))
@@ -0,0 +1,45 @@
+import click
+from shiftcontent.cli.colours import *
+from pprint import pprint as pp
+from shiftcontent import definition_service
+from shiftcontent import search_service
+from shiftcontent import exceptions as x
+
+# -----------------------------------------------------------------------------
+# Group setup
+# -----------------------------------------------------------------------------
+
+
+@click.group(help=yellow('Search index commands'))
+def cli():
+    pass
+
+
+# -----------------------------------------------------------------------------
+# Commands
+# -----------------------------------------------------------------------------
+
+@cli.command(name='rebuild')
+@click.argument('content_types', nargs=-1)
+@click.option('--batch-size', '-b', default=1000, help='Items per batch')
+def rebuild_index(content_types, batch_size):
+    """ Rebuild search index for content types (all if none given) """
+    if not content_types:
+        content_types = sorted(definition_service.definition.keys())
+
+    print(yellow('\nRebuilding search indices'))
+    print(yellow('-' * 80))
+
+    for content_type in content_types:
+        try:
+            count = search_service.rebuild_index(content_type, batch_size)
+        except x.UndefinedContentType:
+            print(red('{} * {}: undefined content type'.format(
+                ' ' * 4,
+                content_type
+            )))
+            continue
+
+        print('{} * {}: {} items'.format(' ' * 4, content_type, count))
+
+    print(green('\nDone\n'))
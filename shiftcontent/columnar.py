@@ -0,0 +1,179 @@
+"""
+Columnar
+Turns content items into typed columns for analytics without creating an
+item object per row. Values are converted by their field types and put to
+compact python arrays: numbers and booleans as they are, datetimes as
+seconds since epoch (utc) and dates as days since epoch, the same way arrow
+stores timestamps and dates. Text and fields of other types are kept in
+lists. Missing values are stored as zeroes (or None in lists) and recorded
+in batch nulls.
+"""
+
+import csv
+import json
+import calendar
+from array import array
+from datetime import date
+from collections import OrderedDict
+from shiftcontent.field_types import field_types as default_field_types
+from shiftcontent import exceptions as x
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+# array type codes by field type, fields of other types are kept in lists
+array_types = dict(
+    integer='q',
+    float='d',
+    boolean='b',
+    date='l',
+    datetime='q',
+    datetime_meta='q',
+)
+
+EPOCH_DAY = date(1970, 1, 1).toordinal()
+
+
+def to_column_value(field_type, value):
+    """
+    To column value
+    Converts field value to its column representation
+    :param field_type: str, field type name
+    :param value: mixed, field value
+    :return: mixed
+    """
+    if field_type in ('datetime', 'datetime_meta'):
+        return calendar.timegm(value.utctimetuple())
+    if field_type == 'date':
+        return value.toordinal() - EPOCH_DAY
+    if field_type == 'boolean':
+        return int(value)
+    return value
+
+
+class ColumnBatch:
+    """
+    Column batch
+    Holds a batch of rows as columns of equal length along with field types
+    of the columns and indexes of rows with missing values per column.
+    """
+
+    def __init__(self, types, field_types=None):
+        """
+        Create batch
+        :param types: OrderedDict, field types by column name
+        :param field_types: dict, field type names to field type classes
+        """
+        self.types = types
+        self.field_types = field_types or default_field_types
+        self.columns = OrderedDict()
+        self.nulls = dict()
+        for name, field_type in types.items():
+            code = array_types.get(field_type)
+            self.columns[name] = array(code) if code else list()
+            self.nulls[name] = set()
+
+    def __len__(self):
+        """ Returns number of rows in batch """
+        for column in self.columns.values():
+            return len(column)
+        return 0
+
+    def __getitem__(self, name):
+        """ Returns column by name """
+        return self.columns[name]
+
+    def append(self, values):
+        """
+        Append
+        Adds a row of field values converted by field types. Values missing
+        from the dict are recorded as nulls.
+        :param values: dict, field values by column name
+        :return: None
+        """
+        row = len(self)
+        for name, field_type in self.types.items():
+            column = self.columns[name]
+            value = values.get(name)
+            if value is None:
+                self.nulls[name].add(row)
+                column.append(None if type(column) is list else 0)
+                continue
+
+            value = self.field_types[field_type].value_from_db(value)
+            column.append(to_column_value(field_type, value))
+
+    def rows(self):
+        """
+        Rows
+        Iterates over batch rows as tuples with missing values as None
+        :return: generator
+        """
+        names = list(self.columns.keys())
+        for row, values in enumerate(zip(*self.columns.values())):
+            yield tuple(
+                None if row in self.nulls[name] else value
+                for name, value in zip(names, values)
+            )
+
+    def to_arrow(self):
+        """
+        To arrow
+        Converts batch to arrow record batch that can be written to parquet
+        or feather files. Requires pyarrow to be installed.
+        :return: pyarrow.RecordBatch
+        """
+        if not pyarrow:
+            msg = 'Install pyarrow to export content in arrow format'
+            raise x.ConfigurationException(msg)
+
+        arrow_types = dict(
+            integer=pyarrow.int64(),
+            float=pyarrow.float64(),
+            boolean=pyarrow.bool_(),
+            date=pyarrow.date32(),
+            datetime=pyarrow.timestamp('s', tz='UTC'),
+            datetime_meta=pyarrow.timestamp('s', tz='UTC'),
+        )
+
+        arrays = []
+        for name, column in self.columns.items():
+            field_type = self.types[name]
+            values = list(column)
+            if field_type == 'boolean':
+                values = [bool(value) for value in values]
+
+            nulls = self.nulls[name]
+            mask = [row in nulls for row in range(len(values))]
+            arrays.append(pyarrow.array(
+                values,
+                type=arrow_types.get(field_type, pyarrow.string()),
+                mask=mask if nulls else None
+            ))
+
+        names = list(self.columns.keys())
+        return pyarrow.RecordBatch.from_arrays(arrays, names)
+
+
+def write_csv(batches, file):
+    """
+    Write CSV
+    Writes column batches to a file as CSV with a header row. Datetimes and
+    dates are written as seconds and days since epoch, missing values as
+    empty cells.
+    :param batches: iterable, of shiftcontent.columnar.ColumnBatch
+    :param file: file object open for writing
+    :return: int, number of rows written
+    """
+    writer = csv.writer(file)
+    count = 0
+    for batch in batches:
+        if not count:
+            writer.writerow(batch.columns.keys())
+        writer.writerows(batch.rows())
+        count += len(batch)
+
+    return count
@@ -1,9 +1,22 @@
 from uuid import uuid1
+from collections import defaultdict, OrderedDict
+import json
+import base64
+import arrow
+from sqlalchemy import select, and_, or_, func
+from sqlalchemy import DateTime as DateTimeColumn
+from sqlalchemy import Date as DateColumn
 from pprint import pprint as pp
 from shiftcontent import exceptions as x
-from shiftcontent.item import Item
+from shiftcontent.item import Item, ItemLayout
+from shiftcontent.field_types import field_types
+from shiftcontent.database import field_index
+from shiftcontent.database import type_tables
+from shiftcontent.fields import DateTime
 from shiftcontent.item_schema import CreateItemSchema, UpdateItemSchema
 from shiftcontent.utils import import_by_name
+from shiftcontent.single_flight import SingleFlight
+from shiftcontent.columnar import ColumnBatch
 from shiftcontent import db
 from shiftcontent import definition_service
 from shiftcontent import event_service
@@ -16,10 +29,21 @@ class ContentService:
     projections to retrieve content, handles content updates via event
     service, monitors and updates in-memory caches and search indexes
     """
+    def __init__(self):
+        """
+        Init service
+        Sets up a registry of compiled item schemas and in-flight item loads
+        """
+        self._schemas = dict()
+        self._schemas_hash = None
+        self._loads = SingleFlight()
+
     def get_item(self, object_id):
         """
         Get item
-        Selects an item from projection table by its unique object_id
+        Selects an item from projection table by its unique object_id.
+        Concurrent cache misses for the same item are coalesced, so that
+        only one of them goes to the database.
         :param object_id: str, object id
         :return: shiftcontent.ite.Item
         """
@@ -27,30 +51,446 @@ class ContentService:
         object_id = str(object_id)
 
         # try getting from cache first
-        item = cache_service.get(object_id)
-        if item:
+        item, ttl = cache_service.get_with_ttl(object_id)
+        if item and not cache_service.should_refresh(ttl):
+            return item
+
+        # item is being refreshed already
+        if item and object_id in self._loads:
             return item
 
         # get from projection table
+        loaded, shared = self._loads.do(
+            object_id,
+            self.load_item,
+            object_id,
+            current=item
+        )
+
+        # don't hand out the same instance to several callers
+        if loaded and shared:
+            loaded = Item().from_json(loaded.to_json())
+
+        # and return
+        return loaded
+
+    def load_item(self, object_id, current=None):
+        """
+        Load item
+        Selects an item from projection table and puts it to cache. When
+        cache locks are enabled and another process is loading the same
+        item already, waits for it to be cached instead.
+        :param object_id: str, object id
+        :param current: shiftcontent.item.Item, item being refreshed
+        :return: shiftcontent.item.Item
+        """
+        token = cache_service.lock(object_id)
+        if cache_service.lock_timeout and not token:
+            if current:
+                return current
+            item = cache_service.wait(object_id)
+            if item:
+                return item
+
+        try:
+            if cache_service.is_missing(object_id):
+                return
+
+            items = db.tables['items']
+            with db.engine.begin() as conn:
+                query = items.select().where(items.c.object_id == object_id)
+                result = conn.execute(query).fetchone()
+                if not result:
+                    cache_service.set_missing(object_id)
+                    return
+
+            try:
+                definition_service.get_type(result.type)
+            except x.UndefinedContentType:
+                msg = 'Database contains item ({}) of undefined type [{}]'
+                raise x.UndefinedContentType(msg.format(result.id, result.type))
+
+            # put to cache
+            item = Item().from_db(result)
+            cache_service.set(item)
+            return item
+        finally:
+            cache_service.unlock(object_id, token)
+
+    def get_items(self, object_ids):
+        """
+        Get items
+        Selects several items at once by their object ids. Tries cache first
+        with a single pipelined read, then selects all the misses from
+        projection table with a single query and puts those to cache.
+
+        Items are returned in the order they were requested. Items that could
+        not be found are not dropped, but returned as None in their position.
+
+        :param object_ids: list, object ids
+        :return: list
+        """
+        object_ids = [str(object_id) for object_id in object_ids]
+        if not object_ids:
+            return []
+
+        # try getting from cache first
+        found = cache_service.get_many(object_ids)
+        missing = [i for i in dict.fromkeys(object_ids) if i not in found]
+        if not missing:
+            return [found.get(object_id) for object_id in object_ids]
+
+        # skip items known to be missing
+        tombstones = cache_service.get_missing(missing)
+        missing = [i for i in missing if i not in tombstones]
+        if not missing:
+            return [found.get(object_id) for object_id in object_ids]
+
+        # get misses from projection table
         items = db.tables['items']
         with db.engine.begin() as conn:
-            query = items.select().where(items.c.object_id == object_id)
-            result = conn.execute(query).fetchone()
-            if not result:
-                return
+            query = items.select().where(items.c.object_id.in_(missing))
+            results = conn.execute(query).fetchall()
+
+        fetched = []
+        for result in results:
+            try:
+                definition_service.get_type(result.type)
+            except x.UndefinedContentType:
+                msg = 'Database contains item ({}) of undefined type [{}]'
+                raise x.UndefinedContentType(
+                    msg.format(result.id, result.type)
+                )
 
-        try:
-            definition_service.get_type(result.type)
-        except x.UndefinedContentType:
-            msg = 'Database contains item ({}) of undefined type [{}]'
-            raise x.UndefinedContentType(msg.format(result.id, result.type))
+            item = Item().from_db(result)
+            found[item.object_id] = item
+            fetched.append(item)
 
         # put to cache
-        item = Item().from_db(result)
-        cache_service.set(item)
+        if fetched:
+            cache_service.set_many(fetched)
+        cache_service.set_missing(*[i for i in missing if i not in found])
 
         # and return
-        return item
+        return [found.get(object_id) for object_id in object_ids]
+
+    def list_items(
+        self,
+        content_type=None,
+        author=None,
+        parent=None,
+        where=None,
+        order_by='created',
+        after=None,
+        limit=50,
+        fields=None):
+        """
+        List items
+        Returns a page of items filtered by type, author or parent and sorted
+        by creation date or sort order. Pagination uses keyset seek over
+        (order column, id), so deep pages cost the same as the first one.
+        Prefix order column with a dash to sort in descending order. Items
+        without sort order go last.
+
+        Custom fields marked as indexed in content type definition can be
+        used for filtering and ordering when content type is given. Filters
+        are given as a dict of field handles to values or (operator, value)
+        tuples, where operator is one of =, !=, <, <=, >, >= or in:
+        where=dict(published=('>=', '2018-01-01 00:00:00'))
+
+        When type tables are enabled, any custom field having a column in
+        the type table can be used this way, indexed or not.
+
+        Pass a list of fields to get dict projections instead of full
+        items (see get_projections). An empty list will only select meta
+        fields without decoding item fields at all.
+
+        The result looks like this: dict(items=[...], cursor='...'), where
+        cursor is an opaque string to pass as after= to get the next page,
+        or None on the last page.
+
+        :param content_type: str, content type
+        :param author: str, author id
+        :param parent: str, parent object id to list children of
+        :param where: dict, filters by custom fields
+        :param order_by: str, created, sort_order or custom field
+        :param after: str, cursor of previous page
+        :param limit: int, page size
+        :param fields: list, custom fields to project items to
+        :return: dict
+        """
+        items = db.tables['items']
+        tree = db.tables['tree']
+
+        columns = list(items.c)
+        if fields is not None and not fields:
+            columns = [c for c in items.c if c.name != 'fields']
+
+        source = items
+        conditions = []
+        if content_type:
+            conditions.append(items.c.type == content_type)
+        if author:
+            conditions.append(items.c.author == str(author))
+        if parent:
+            join_on = items.c.object_id == tree.c.descendant
+            source = source.join(tree, join_on)
+            conditions.append(tree.c.ancestor == str(parent))
+            conditions.append(tree.c.depth == 1)
+
+        # filter by indexed fields
+        joined = []
+        for field, condition in (where or {}).items():
+            table, on, column, to_value = self.field_column(content_type, field)
+            if table.name not in joined:
+                source = source.join(table, on)
+                joined.append(table.name)
+            conditions.append(self.field_condition(column, to_value, condition))
+
+        # order
+        descending = order_by.startswith('-')
+        order_by = order_by.lstrip('-')
+        if order_by in ('created', 'sort_order'):
+            column = items.c[order_by]
+        else:
+            table, on, column, _ = self.field_column(content_type, order_by)
+            if table.name not in joined:
+                source = source.outerjoin(table, on)
+        columns.append(column.label('order_value'))
+
+        query = select(columns).select_from(source)
+        if conditions:
+            query = query.where(and_(*conditions))
+
+        # seek past cursor
+        if after:
+            value, last_id = self.decode_cursor(after, column)
+            query = query.where(
+                self.seek(column, items.c.id, value, last_id, descending)
+            )
+
+        order = [column.desc(), items.c.id.desc()] if descending \
+            else [column, items.c.id]
+        if column.nullable:
+            order.insert(0, column.is_(None))
+
+        query = query.order_by(*order).limit(limit + 1)
+        with db.engine.begin() as conn:
+            rows = [dict(row) for row in conn.execute(query)]
+
+        cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            cursor = self.encode_cursor(rows[-1]['order_value'], rows[-1]['id'])
+
+        for row in rows:
+            del row['order_value']
+
+        if fields is None:
+            page = [Item().from_db(row) for row in rows]
+        else:
+            page = [self.projection(row, fields) for row in rows]
+
+        return dict(items=page, cursor=cursor)
+
+    def field_column(self, content_type, field):
+        """
+        Field column
+        Returns table to join to query items by a custom field along with
+        join condition, the column holding field values and a function to
+        convert filter values for this column. Uses type table of content
+        type when enabled or field index otherwise, in which case raises an
+        exception if the field is not indexed.
+
+        :param content_type: str, content type
+        :param field: str, field handle
+        :return: tuple
+        """
+        if not content_type:
+            err = 'Content type is required to query by field [{}]'
+            raise x.InvalidQuery(err.format(field))
+
+        definition = definition_service.get_type(content_type)
+        layout = ItemLayout.get(
+            Item.metafields,
+            field_types,
+            content_type,
+            definition
+        )
+
+        items = db.tables['items']
+        field_type = layout.converters.get(field)
+        if db.type_tables_enabled and field in layout.custom_fields:
+            table = type_tables.table(content_type)
+            if field in table.c and field != 'object_id':
+                on = table.c.object_id == items.c.object_id
+                to_value = lambda v: type_tables.column_value(
+                    field_type.convert(v)
+                )
+                return table, on, table.c[field], to_value
+
+        if field not in layout.indexed_fields:
+            err = 'Unable to query by [{}]: not an indexed field of [{}]'
+            raise x.InvalidQuery(err.format(field, content_type))
+
+        index = db.tables['index'].alias('index_{}'.format(field))
+        on = and_(
+            index.c.object_id == items.c.object_id,
+            index.c.field == field
+        )
+        column = index.c[field_index.value_column(field_type)]
+        to_value = lambda v: field_type.value_to_index(field_type.convert(v))
+        return index, on, column, to_value
+
+    def field_condition(self, column, to_value, condition):
+        """
+        Field condition
+        Converts filter value or (operator, value) tuple to a condition on
+        field column. String values in field index are truncated, so exact
+        comparisons use hashes of full values instead.
+        :param column: sqlalchemy.Column, field value column
+        :param to_value: callable, converts filter value for the column
+        :param condition: mixed, value or (operator, value) tuple
+        :return: sqlalchemy.sql.expression.ClauseElement
+        """
+        operator, value = '=', condition
+        if type(condition) is tuple:
+            operator, value = condition
+
+        exact, to_exact = column, to_value
+        indexed = column.table.is_derived_from(db.tables['index'])
+        if indexed and column.name == 'string_value':
+            exact = column.table.c.hash_value
+            to_exact = field_index.value_hash
+
+        operators = {
+            '=': lambda c, v: exact == to_exact(v),
+            '!=': lambda c, v: exact != to_exact(v),
+            '<': lambda c, v: c < to_value(v),
+            '<=': lambda c, v: c <= to_value(v),
+            '>': lambda c, v: c > to_value(v),
+            '>=': lambda c, v: c >= to_value(v),
+            'in': lambda c, v: exact.in_([to_exact(i) for i in v]),
+        }
+
+        if operator not in operators:
+            err = 'Unsupported filter operator [{}]'
+            raise x.InvalidQuery(err.format(operator))
+
+        return operators[operator](column, value)
+
+    def seek(self, column, id_column, value, last_id, descending=False):
+        """
+        Seek
+        Returns condition to select rows coming after (value, last_id) in
+        (column, id) order with nulls last
+        :param column: sqlalchemy.Column, order column
+        :param id_column: sqlalchemy.Column, id column
+        :param value: mixed, last seen column value
+        :param last_id: int, last seen id
+        :param descending: bool, whether order is descending
+        :return: sqlalchemy.sql.expression.ClauseElement
+        """
+        past = (lambda a, b: a < b) if descending else (lambda a, b: a > b)
+        if value is None:
+            return and_(column.is_(None), past(id_column, last_id))
+
+        condition = or_(
+            past(column, value),
+            and_(column == value, past(id_column, last_id))
+        )
+        if column.nullable:
+            condition = or_(condition, column.is_(None))
+
+        return condition
+
+    def encode_cursor(self, value, last_id):
+        """
+        Encode cursor
+        Packs last seen order value and id into an opaque string
+        :param value: mixed, last seen column value
+        :param last_id: int, last seen id
+        :return: str
+        """
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        data = json.dumps([value, last_id]).encode('utf-8')
+        return base64.urlsafe_b64encode(data).decode('ascii')
+
+    def decode_cursor(self, cursor, column):
+        """
+        Decode cursor
+        Unpacks last seen order value and id from cursor string
+        :param cursor: str, cursor
+        :param column: sqlalchemy.Column, order column
+        :return: tuple
+        """
+        try:
+            data = base64.urlsafe_b64decode(cursor.encode('ascii'))
+            value, last_id = json.loads(data.decode('utf-8'))
+            if value is not None and isinstance(column.type, DateTimeColumn):
+                value = arrow.get(value).naive
+            elif value is not None and isinstance(column.type, DateColumn):
+                value = arrow.get(value).date()
+        except (ValueError, TypeError, arrow.parser.ParserError):
+            raise x.InvalidCursor('Unable to decode cursor [{}]'.format(cursor))
+
+        return value, last_id
+
+    def export_columns(self, content_type, fields=None, batch_size=5000):
+        """
+        Export columns
+        Streams items of content type from projection table as batches of
+        typed columns for analytics. Decodes fields json straight into
+        columns without creating items. Always includes object_id column.
+        :param content_type: str, content type handle
+        :param fields: list, custom or meta fields to export, all custom
+                       fields by default
+        :param batch_size: int, number of rows per batch
+        :return: generator of shiftcontent.columnar.ColumnBatch
+        """
+        type_definition = definition_service.get_type(content_type)
+        custom = {f['handle']: f['type'] for f in type_definition['fields']}
+        if fields is None:
+            fields = list(custom.keys())
+
+        registry = definition_service.field_types()
+        types = OrderedDict(object_id='text')
+        for field in fields:
+            field_type = custom.get(field) or Item.metafields.get(field)
+            if field_type not in registry:
+                msg = 'Unable to export field [{}] of content type [{}]'
+                raise x.InvalidQuery(msg.format(field, content_type))
+            types[field] = field_type
+
+        items = db.tables['items']
+        meta = [f for f in types if f not in custom]
+        columns = [items.c.id] + [items.c[f] for f in meta if f != 'id']
+        decode = any(f in custom for f in types)
+        if decode:
+            columns.append(items.c.fields)
+
+        last_id = 0
+        while True:
+            where = and_(items.c.type == content_type, items.c.id > last_id)
+            query = select(columns)\
+                .where(where)\
+                .order_by(items.c.id)\
+                .limit(batch_size)
+
+            with db.engine.begin() as conn:
+                rows = conn.execute(query).fetchall()
+            if not rows:
+                return
+
+            batch = ColumnBatch(types, registry)
+            for row in rows:
+                values = json.loads(row.fields) if decode else dict()
+                values.update((f, row[f]) for f in meta)
+                batch.append(values)
+
+            last_id = rows[-1].id
+            yield batch
 
     def item_schema(self, content_type, schema_type='update'):
         """
@@ -58,10 +498,25 @@ class ContentService:
         definition. The schema type can either be 'create' or 'update' where
         the latter will additionally test for item id being present.
 
+        Compiled schemas are memoized per content type and schema type and
+        recompiled whenever a different definition gets loaded.
+
         :param content_type: str, content type
         :param schema_type: str, create or update
         :return: shiftschema.schema.Schema
         """
+        type_definition = definition_service.get_type(content_type)
+
+        # drop compiled schemas if definition changed
+        definition_hash = definition_service.definition_hash
+        if definition_hash != self._schemas_hash:
+            self._schemas = dict()
+            self._schemas_hash = definition_hash
+
+        key = (content_type, schema_type)
+        if key in self._schemas:
+            return self._schemas[key]
+
         # check schema type
         schema_types = dict(
             create=CreateItemSchema,
@@ -76,8 +531,6 @@ class ContentService:
         schema = schema_types[schema_type]()
 
         # add filter/validators defined in schema
-        type_definition = definition_service.get_type(content_type)
-
         for field in type_definition['fields']:
             filters = field['filters'] if 'filters' in field else ()
             validators = field['validators'] if 'validators' in field else ()
@@ -105,6 +558,7 @@ class ContentService:
                 prop.add_validator(validator)
 
         # and return
+        self._schemas[key] = schema
         return schema
 
     def create_item(self, author, content_type, fields, parent=None):
@@ -163,12 +617,104 @@ class ContentService:
 
         return self.get_item(event.object_id)
 
+    def import_items(self, author, items, batch_size=500):
+        """
+        Import items
+        Bulk-creates content items from any iterable (e.g. a stream read from
+        a file) without loading it all in memory. Each item is a dictionary
+        with content type, optional author and creation date and custom
+        fields. Items are validated one by one and valid items are created
+        in batches: each batch is a single import event, inserted with one
+        statement, cached in one round-trip and indexed in one bulk request.
+
+        Returns an import report with a number of imported items and
+        validation errors for items that were skipped, by their position
+        in the input.
+
+        :param author: str, author id
+        :param items: iterable, of dicts
+        :param batch_size: int, number of items per batch
+        :return: dict
+        """
+        report = dict(imported=0, errors=dict())
+        context = dict(definition=definition_service.definition)
+        batch = []
+
+        for index, data in enumerate(items):
+            data = {**data}
+            content_type = data.pop('type', None)
+            item_author = data.pop('author', author)
+            created = data.pop('created', None)
+
+            try:
+                type_definition = definition_service.get_type(content_type)
+            except x.UndefinedContentType as error:
+                report['errors'][index] = dict(type=[str(error)])
+                continue
+
+            # drop nonexistent fields
+            valid_fields = [f['handle'] for f in type_definition['fields']]
+            fields = {f: v for f, v in data.items() if f in valid_fields}
+
+            # validate data
+            item_data = dict(
+                type=content_type,
+                author=item_author,
+                object_id=str(uuid1()),
+                **fields
+            )
+
+            schema = self.item_schema(content_type, 'create')
+            result = schema.process(item_data, context)
+            if not result:
+                report['errors'][index] = result.get_messages()
+                continue
+
+            # keep original creation date
+            if created:
+                try:
+                    created = DateTime.value_to_json(DateTime.convert(created))
+                except (ValueError, RuntimeError):
+                    err = 'Invalid creation date [{}]'.format(created)
+                    report['errors'][index] = dict(created=[err])
+                    continue
+                item_data['created'] = created
+
+            batch.append(item_data)
+            if len(batch) >= batch_size:
+                report['imported'] += self.import_batch(author, batch)
+                batch = []
+
+        if batch:
+            report['imported'] += self.import_batch(author, batch)
+
+        return report
+
+    def import_batch(self, author, batch):
+        """
+        Import batch
+        Emits a single import event for a batch of validated items.
+
+        :param author: str, author id
+        :param batch: list, of validated item payloads
+        :return: int, number of items imported
+        """
+        event = event_service.event(
+            type='CONTENT_ITEMS_IMPORT',
+            author=author,
+            payload=dict(items=batch)
+        )
+
+        event_service.emit(event)
+        return len(batch)
+
     def update_item(self, author, item):
         """
         Update item
         Accepts an item object validates it and tries to persist it. Will
         return validation errors if item is in invalid state, otherwise will
-        emit an event.
+        emit an event. Raises version conflict if the item was changed since
+        it was read. Items can not be moved this way, use set_parent instead.
 
         :param author: str, author id
         :param item: shiftcontent.item.Item, item object (must be saved first)
@@ -187,6 +733,18 @@ class ContentService:
                   'to find item with such id [{}]'
             raise x.ItemNotFound(err.format(object_id))
 
+        if item.version != old_item.version:
+            err = 'Item [{}] was changed concurrently: expected version {}, ' \
+                  'got {}'
+            raise x.VersionConflict(
+                err.format(object_id, item.version, old_item.version),
+                expected=item.version,
+                actual=old_item.version
+            )
+
+        if item.path != old_item.path:
+            raise self.path_error(object_id)
+
         # validate
         context = dict(definition=definition_service.definition)
         schema = self.item_schema(item.type, schema_type='update')
@@ -212,18 +770,23 @@ class ContentService:
         # update in place to reflect changes in clients
         updated = self.get_item(item.object_id)
         item.from_dict(updated.to_dict())
+        item.set_field('version', updated.version, initial=True)
 
         return self.get_item(event.object_id)
 
-    def update_item_field(self, author, object_id, field, value):
+    def update_item_field(self, author, object_id, field, value, version=None):
         """
         Update item field
-        Updates single field on an item
+        Updates single field on an item. Optionally accepts item version the
+        change is based on, in which case raises version conflict if the
+        item was changed since. Path can not be updated this way, use
+        set_parent to move items.
 
         :param author: str, author id
         :param object_id: str, object id to update
         :param field: str, field name
         :param value: str, new value to set
+        :param version: int, expected item version
         :return: shiftcontent.itemItem
         """
         item = self.get_item(object_id)
@@ -231,6 +794,18 @@ class ContentService:
             err = 'Unable to find item with such id [{}]'
             raise x.ItemNotFound(err.format(object_id))
 
+        if version is not None and item.version != version:
+            err = 'Item [{}] was changed concurrently: expected version {}, ' \
+                  'got {}'
+            raise x.VersionConflict(
+                err.format(object_id, version, item.version),
+                expected=version,
+                actual=item.version
+            )
+
+        if field == 'path':
+            raise self.path_error(object_id)
+
         if not item.is_updatable(field):
             err = 'Field [{}] is not allowed for content type [{}]'
             raise x.ItemError(err.format(field, item.type))
@@ -257,7 +832,8 @@ class ContentService:
             payload=dict(
                 metafield=is_metafield,
                 field=field,
-                value=value
+                value=value,
+                version=version
             ),
             payload_rollback=dict(
                 metafield=is_metafield,
@@ -271,6 +847,18 @@ class ContentService:
         updated = self.get_item(event.object_id)
         return updated
 
+    def path_error(self, object_id):
+        """
+        Path error
+        Returns error for attempts to change item path other than with
+        set_parent that also maintains items tree.
+        :param object_id: str, object id
+        :return: shiftcontent.exceptions.ItemError
+        """
+        err = 'Unable to change path of item [{}] on update, ' \
+              'use set_parent to move items'
+        return x.ItemError(err.format(object_id))
+
     def delete_item(self, author, object_id):
         """
         Delete content item
@@ -359,56 +947,193 @@ class ContentService:
         if not item or not item.path:
             return
 
-        path = str(item.path).split('.')
-        path = [self.get_item(object_id) for object_id in path]
+        path = self.get_items(str(item.path).split('.'))
         return path
 
     def get_children(self, object_id):
         """
         Get children
-        Returns a list of direct descendants.
+        Returns a list of direct descendants. The list of child ids is
+        cached per parent, and items themselves are read through the cache.
         :param object_id: str, item object id
         :return: list
         """
-        item = self.get_item(object_id)
-        children = []
-        if item:
-            path = str(item.object_id)
-            if item.path:
-                path = '{}.{}'.format(item.path, path)
+        object_id = str(object_id)
+        child_ids = cache_service.get_children(object_id)
+        if child_ids is None:
+            child_ids = self.get_descendant_ids(object_id, max_depth=1)
+            cache_service.set_children(object_id, child_ids)
 
-            items = db.tables['items']
-            with db.engine.begin() as conn:
-                query = items.select().where(items.c.path == path)
-                data = conn.execute(query).fetchall() or ()
-                children = [Item().from_db(child) for child in data]
+        return [child for child in self.get_items(child_ids) if child]
 
-        return children
+    def get_descendant_ids(self, object_id, max_depth=None):
+        """
+        Get descendant ids
+        Returns object ids of all of the descendants below an item, closest
+        first. Can optionally be limited to a certain depth.
+        :param object_id: str, item object_id
+        :param max_depth: int, max depth below item
+        :return: list
+        """
+        items = db.tables['items']
+        tree = db.tables['tree']
+
+        where = and_(tree.c.ancestor == str(object_id), tree.c.depth > 0)
+        if max_depth is not None:
+            where = and_(where, tree.c.depth <= max_depth)
+
+        join = items.join(tree, items.c.object_id == tree.c.descendant)
+        query = select([items.c.object_id])\
+            .select_from(join)\
+            .where(where)\
+            .order_by(tree.c.depth, items.c.id)
+
+        with db.engine.begin() as conn:
+            return [row.object_id for row in conn.execute(query)]
 
-    def get_descendants(self, object_id):
+    def get_descendants(self, object_id, max_depth=None):
         """
         Get descendants
-        Returns all of the descendants below an item.
+        Returns all of the descendants below an item, closest first. Can
+        optionally be limited to a certain depth. Items are read through
+        the cache.
         :param object_id: str, item object_id
+        :param max_depth: int, max depth below item
         :return: list
         """
-        item = self.get_item(object_id)
-        descendants = []
-        if item:
-            if item.path:
-                like = '{}.{}%'.format(item.path, item.object_id)
-            else:
-                like = '{}%'.format(str(item.object_id))
+        descendant_ids = self.get_descendant_ids(object_id, max_depth)
+        return [item for item in self.get_items(descendant_ids) if item]
+
+    def iter_descendants(
+        self,
+        object_id,
+        max_depth=None,
+        order='depth',
+        batch_size=1000):
+        """
+        Iterate descendants
+        Streams descendants below an item from projection table, building
+        items lazily, so that large subtrees can be walked without loading
+        them into memory at once. Uses server-side cursors where database
+        driver supports them. Items are read from the database bypassing
+        the cache.
+
+        Items come either closest first (depth) or depth-first (path), where
+        every item is followed by its own subtree before its next sibling.
+        :param object_id: str, item object_id
+        :param max_depth: int, max depth below item
+        :param order: str, depth or path
+        :param batch_size: int, number of rows to fetch at once
+        :return: generator
+        """
+        items = db.tables['items']
+        tree = db.tables['tree']
+
+        if order == 'depth':
+            order_by = [tree.c.depth, items.c.id]
+        elif order == 'path':
+            order_by = [items.c.path + '.' + items.c.object_id]
+        else:
+            msg = 'Unable to order descendants by [{}]'.format(order)
+            raise x.InvalidQuery(msg)
+
+        where = and_(tree.c.ancestor == str(object_id), tree.c.depth > 0)
+        if max_depth is not None:
+            where = and_(where, tree.c.depth <= max_depth)
+
+        join = items.join(tree, items.c.object_id == tree.c.descendant)
+        query = select([items])\
+            .select_from(join)\
+            .where(where)\
+            .order_by(*order_by)
 
-            items = db.tables['items']
-            with db.engine.begin() as conn:
-                query = items.select().where(items.c.path.like(like))
-                data = conn.execute(query).fetchall() or ()
-                descendants = [Item().from_db(child) for child in data]
+        with db.engine.begin() as conn:
+            conn = conn.execution_options(stream_results=True)
+            result = conn.execute(query)
+            while True:
+                rows = result.fetchmany(batch_size)
+                if not rows:
+                    break
+
+                for row in rows:
+                    try:
+                        definition_service.get_type(row.type)
+                    except x.UndefinedContentType:
+                        msg = 'Database contains item ({}) of undefined '
+                        msg += 'type [{}]'
+                        raise x.UndefinedContentType(
+                            msg.format(row.id, row.type)
+                        )
+
+                    yield Item().from_db(row)
+
+    def count_descendants(self, object_id, max_depth=None):
+        """
+        Count descendants
+        Returns number of items in a subtree below an item
+        :param object_id: str, item object_id
+        :param max_depth: int, max depth below item
+        :return: int
+        """
+        tree = db.tables['tree']
+        where = and_(tree.c.ancestor == str(object_id), tree.c.depth > 0)
+        if max_depth is not None:
+            where = and_(where, tree.c.depth <= max_depth)
+
+        query = select([func.count()]).select_from(tree).where(where)
+        with db.engine.begin() as conn:
+            return conn.execute(query).scalar()
+
+    def get_projections(self, object_id, fields=(), max_depth=None):
+        """
+        Get projections
+        Returns lightweight dict representations of an item and its
+        descendants, closest first, without building full items. Every dict
+        holds item meta fields and requested custom fields as they are
+        stored in the database.
+
+        :param object_id: str, item object_id
+        :param fields: list, custom fields to include
+        :param max_depth: int, max depth below item
+        :return: list
+        """
+        items = db.tables['items']
+        tree = db.tables['tree']
+
+        where = tree.c.ancestor == str(object_id)
+        if max_depth is not None:
+            where = and_(where, tree.c.depth <= max_depth)
 
-        return descendants
+        join = items.join(tree, items.c.object_id == tree.c.descendant)
+        query = select([items])\
+            .select_from(join)\
+            .where(where)\
+            .order_by(tree.c.depth, items.c.id)
+
+        with db.engine.begin() as conn:
+            rows = conn.execute(query).fetchall()
 
-    def get_tree(self, object_id):
+        return [self.projection(row, fields) for row in rows]
+
+    def projection(self, row, fields=()):
+        """
+        Projection
+        Converts database row to a dict of meta fields and requested custom
+        fields as they are stored in the database. Item fields are only
+        decoded if any custom fields requested.
+        :param row: database row
+        :param fields: list, custom fields to include
+        :return: dict
+        """
+        projection = dict(row)
+        data = projection.pop('fields', None)
+        if fields:
+            data = json.loads(data or '{}')
+            projection.update({field: data.get(field) for field in fields})
+
+        return projection
+
+    def get_tree(self, object_id, max_depth=None, fields=None):
         """
         Get tree
         Returns a tree starting from the root node supplied. The call to
@@ -427,79 +1152,47 @@ class ContentService:
             ]
         }
 
+        Tree depth can be limited with max_depth. If a list of fields is
+        given, nodes will be dict projections with meta and requested fields
+        instead of full items (see get_projections).
+
         :param object_id: str, object_id of tree root
+        :param max_depth: int, max depth below root
+        :param fields: list, custom fields to project nodes to
         :return: dict
         """
-        root = self.get_item(object_id)
-        if not root:
-            return None
-
-        root = dict(node=root, children=[])
-
-        children = self.get_descendants(object_id)
-        children = [dict(node=child, children=[]) for child in children]
-
-        # filter out orphans
-        ids = list(child['node'].object_id for child in children)
-        ids.append(root['node'].object_id)
-
-        children = [c for c in children if all(
-            i in ids for i in c['node'].path.split('.')
-        )]
-
-        # collect items that were already added to tree
-        added_to_tree = []
-
-        def in_tree(item, tree):
-            if item['node'].object_id in added_to_tree:
-                return True
-            if tree['node'].object_id == item['node'].object_id:
-                return True
-            else:
-                return any(in_tree(item, child) for child in tree['children'])
-
-        def add_to_tree(item, tree):
-            if in_tree(item, tree):
-                return tree
-
-            parent_ids = item['node'].path.split('.')
-            parents = filter(
-                lambda x: x['node'].object_id in parent_ids,
-                children
-            )
-
-            for parent in parents:
-                if not in_tree(parent, tree):
-                    add_to_tree(parent, tree)
-
-            if tree['node'].object_id == parent_ids[-1]:
-                tree['children'].append(item)
-
-                # sort
-                tree['children'] = sorted(
-                    tree['children'],
-                    key=lambda c: c['node'].sort_order,
-                    reverse=True
-                )
-
-                added_to_tree.append(item['node'].object_id)
-            else:
-                for child in tree['children']:
-                    add_to_tree(item, child)
-
-            return tree
-
-        for child in children:
-            add_to_tree(child, root)
-
-        # and return
-        return root
-
-
-
-
-
-
-
-
-
+        if fields is None:
+            root = self.get_item(object_id)
+            if not root:
+                return None
+            nodes = self.get_descendants(object_id, max_depth=max_depth)
+            attr = getattr
+        else:
+            nodes = self.get_projections(object_id, fields, max_depth)
+            if not nodes or nodes[0]['object_id'] != str(object_id):
+                return None
+            root = nodes.pop(0)
+            attr = dict.get
+
+        # group by parent
+        by_parent = defaultdict(list)
+        for node in nodes:
+            parent_id = attr(node, 'path').split('.')[-1]
+            by_parent[parent_id].append(node)
+
+        def sort_key(node):
+            sort_order = attr(node, 'sort_order')
+            return sort_order is not None, sort_order or 0
+
+        # walk down from root, orphans are never reached
+        tree = dict(node=root, children=[])
+        branches = [tree]
+        while branches:
+            branch = branches.pop()
+            node_id = str(attr(branch['node'], 'object_id'))
+            children = by_parent.get(node_id, ())
+            children = sorted(children, key=sort_key, reverse=True)
+            branch['children'] = [dict(node=c, children=[]) for c in children]
+            branches.extend(branch['children'])
+
+        return tree
@@ -11,6 +11,14 @@ class Db:
     _meta = None
     _engine = None
 
+    # per content type projection tables
+    type_tables_enabled = False
+    type_tables = dict()
+    type_meta = None
+
+    # defer search indexing to outbox worker
+    outbox_enabled = False
+
     def __init__(self, *args, **kwargs):
         """
         Init database
@@ -26,6 +34,8 @@ class Db:
         engine=None,
         meta=None,
         dialect=None,
+        type_tables=False,
+        outbox=False,
         **db_params
     ):
         """
@@ -42,10 +52,20 @@ class Db:
         to integration content tables in already existing metadata catalogue
         of your application.
 
+        Set type_tables to maintain a content_type_<type> table with a typed
+        column per custom field for every content type in definition. These
+        get created and extended automatically when definition is loaded.
+
+        Set outbox to make event handlers queue search and cache updates in
+        content_outbox table instead of talking to elasticsearch directly.
+        These are then applied by shiftcontent.outbox_worker.OutboxWorker.
+
         :param db_url: str, database url
         :param engine: sqalchemy engine
         :param meta: metadata object to attach to
         :param dialect: str, only required for mysql
+        :param type_tables: bool, maintain per content type projection tables
+        :param outbox: bool, queue search updates for outbox worker
         :param db_params: dict, params to pass to engine
         """
         if not db_url and not engine:
@@ -58,6 +78,12 @@ class Db:
         self._meta = meta
         self.tables = define_tables(self.meta, dialect=dialect)
 
+        # type tables are generated from definition and kept separately
+        self.type_tables_enabled = type_tables
+        self.type_tables = dict()
+        self.type_meta = MetaData()
+        self.outbox_enabled = outbox
+
     @property
     def engine(self):
         """
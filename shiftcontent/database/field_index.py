@@ -0,0 +1,140 @@
+"""
+Field index
+Maintains content_items_index table that holds typed copies of custom field
+values marked with `indexed: true` in content definition. Every indexed
+field value gets a row with the value put to a string, number or date column
+depending on field type. This allows filtering and sorting items by these
+fields using database indexes instead of decoding fields json.
+
+String values are truncated to fit the column, so these also get a hash of
+the full value that is used to filter by exact values.
+
+All functions expect an open connection to run within caller's transaction.
+"""
+
+import hashlib
+from shiftcontent import db
+from shiftcontent.item import Item
+from pprint import pprint as pp
+
+
+def value_column(field_type):
+    """
+    Value column
+    Returns name of index table column to store values of field type in
+    :param field_type: shiftcontent.fields.abstract.AbstractFieldType
+    :return: str
+    """
+    return '{}_value'.format(field_type.index_type)
+
+
+def value_hash(value):
+    """
+    Value hash
+    Returns hash of full string value to compare exact values by
+    :param value: str, field value
+    :return: str
+    """
+    if value is None:
+        return None
+    return hashlib.sha256(str(value).encode('utf-8')).hexdigest()
+
+
+def item_rows(item):
+    """
+    Item rows
+    Returns index rows for indexed fields of an item that have values
+    :param item: shiftcontent.item.Item
+    :return: list
+    """
+    rows = []
+    layout = item.layout
+    for handle in layout.indexed_fields:
+        value = item.fields.get(handle)
+        if value is None:
+            continue
+
+        field_type = layout.converters[handle]
+        row = dict(
+            object_id=str(item.object_id),
+            field=handle,
+            type=item.type,
+            string_value=None,
+            hash_value=None,
+            number_value=None,
+            date_value=None,
+        )
+        row[value_column(field_type)] = field_type.value_to_index(value)
+        if field_type.index_type == 'string':
+            row['hash_value'] = value_hash(value)
+        rows.append(row)
+
+    return rows
+
+
+def index_items(conn, items):
+    """
+    Index items
+    Replaces index rows of items with their current field values. Items of
+    content types without indexed fields are skipped.
+    :param conn: sqlalchemy.engine.Connection
+    :param items: list, of shiftcontent.item.Item
+    :return: None
+    """
+    items = [item for item in items if item.layout.indexed_fields]
+    if not items:
+        return
+
+    delete_items(conn, [item.object_id for item in items])
+
+    rows = []
+    for item in items:
+        rows.extend(item_rows(item))
+
+    if rows:
+        conn.execute(db.tables['index'].insert(), rows)
+
+
+def delete_items(conn, object_ids):
+    """
+    Delete items
+    Removes index rows of items
+    :param conn: sqlalchemy.engine.Connection
+    :param object_ids: list, item object ids
+    :return: None
+    """
+    index = db.tables['index']
+    object_ids = [str(object_id) for object_id in object_ids]
+    if object_ids:
+        conn.execute(index.delete().where(index.c.object_id.in_(object_ids)))
+
+
+def rebuild(conn, batch_size=1000):
+    """
+    Rebuild
+    Recreates field index from items in the database. Run this after
+    marking existing fields as indexed.
+    :param conn: sqlalchemy.engine.Connection
+    :param batch_size: int, number of items to process at once
+    :return: int, number of items processed
+    """
+    items = db.tables['items']
+    conn.execute(db.tables['index'].delete())
+
+    count = 0
+    last_id = 0
+    while True:
+        query = items.select()\
+            .where(items.c.id > last_id)\
+            .order_by(items.c.id)\
+            .limit(batch_size)
+
+        rows = conn.execute(query).fetchall()
+        if not rows:
+            break
+
+        index_items(conn, [Item().from_db(row) for row in rows])
+        last_id = rows[-1].id
+        count += len(rows)
+
+    return count
@@ -0,0 +1,158 @@
+"""
+Json fields
+Updates single custom fields inside fields json of content items without
+reading the document into application first. Uses native json functions
+of the database where available: JSON_SET on MySQL, jsonb_set on Postgres
+and json_set on SQLite (with json1 extension), so that concurrent updates
+of different fields of the same item do not overwrite each other.
+
+On databases without json support falls back to read-modify-write with a
+compare-and-swap on item version, retried a few times before giving up.
+"""
+
+import json
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
+from shiftcontent import db
+from shiftcontent import exceptions as x
+from pprint import pprint as pp
+
+
+# json support by engine, detected once per engine
+_json_support = dict()
+
+
+def supports_json(conn):
+    """
+    Supports json
+    Checks whether database can update json documents in place. Probes
+    SQLite for json1 extension, which is optional.
+    :param conn: sqlalchemy.engine.Connection
+    :return: bool
+    """
+    dialect = conn.dialect.name
+    if dialect in ('mysql', 'postgresql'):
+        return True
+    if dialect != 'sqlite':
+        return False
+
+    key = id(conn.engine)
+    if key not in _json_support:
+        try:
+            conn.execute(sa.select([sa.func.json_set('{}', '$.a', 1)]))
+            _json_support[key] = True
+        except sa.exc.OperationalError:
+            _json_support[key] = False
+
+    return _json_support[key]
+
+
+def set_field_expression(dialect, column, field, value):
+    """
+    Set field expression
+    Returns dialect-specific sql expression to set a key inside json
+    document stored in a text column
+    :param dialect: str, dialect name
+    :param column: sqlalchemy.Column, fields column
+    :param field: str, field handle
+    :param value: mixed, field value
+    :return: sqlalchemy.sql.expression.ClauseElement
+    """
+    value = json.dumps(value, ensure_ascii=False)
+    if dialect == 'postgresql':
+        return sa.cast(sa.func.jsonb_set(
+            sa.cast(column, postgresql.JSONB),
+            postgresql.array([field]),
+            sa.cast(value, postgresql.JSONB)
+        ), sa.Text)
+
+    path = '$."{}"'.format(field)
+    if dialect == 'mysql':
+        return sa.func.JSON_SET(column, path, sa.cast(value, mysql.JSON))
+
+    return sa.func.json_set(column, path, sa.func.json(value))
+
+
+def set_field(conn, object_id, field, value, version=None, retries=5):
+    """
+    Set field
+    Sets custom field value on item in a single update statement, bumps
+    item version and returns updated item row. Falls back to
+    compare-and-swap if database has no json support. Returns None if item
+    does not exist. If expected version is given, raises an exception when
+    the item is at a different version.
+
+    :param conn: sqlalchemy.engine.Connection
+    :param object_id: str, item object id
+    :param field: str, field handle
+    :param value: mixed, field value
+    :param version: int, expected item version
+    :param retries: int, compare-and-swap attempts
+    :return: sqlalchemy.engine.RowProxy
+    """
+    items = db.tables['items']
+    where = items.c.object_id == object_id
+    select = items.select().where(where)
+
+    # update in place
+    if supports_json(conn):
+        condition = where
+        if version is not None:
+            condition = sa.and_(where, items.c.version == version)
+
+        dialect = conn.dialect.name
+        expression = set_field_expression(dialect, items.c.fields, field, value)
+        update = items.update().where(condition).values(
+            fields=expression,
+            version=items.c.version + 1
+        )
+
+        if dialect == 'postgresql':
+            row = conn.execute(update.returning(*items.c)).fetchone()
+        else:
+            row = None
+            if conn.execute(update).rowcount:
+                row = conn.execute(select).fetchone()
+
+        # nothing updated: either item is missing or at a different version
+        if row is None:
+            current = conn.execute(select).fetchone()
+            if current:
+                raise version_conflict(object_id, version, current.version)
+        return row
+
+    # compare and swap
+    for attempt in range(retries):
+        row = conn.execute(select).fetchone()
+        if not row:
+            return
+        if version is not None and row.version != version:
+            raise version_conflict(object_id, version, row.version)
+
+        fields = json.loads(row.fields) if row.fields else dict()
+        fields[field] = value
+        fields = json.dumps(fields, ensure_ascii=False)
+        update = items.update()\
+            .where(sa.and_(where, items.c.version == row.version))\
+            .values(fields=fields, version=row.version + 1)
+
+        if conn.execute(update).rowcount:
+            return conn.execute(select).fetchone()
+
+    err = 'Unable to update field [{}] of item [{}]: concurrent updates'
+    raise x.ConcurrentUpdate(err.format(field, object_id))
+
+
+def version_conflict(object_id, expected, actual):
+    """
+    Version conflict
+    Returns exception to raise when item is not at expected version
+    :param object_id: str, item object id
+    :param expected: int, expected version
+    :param actual: int, current version
+    :return: shiftcontent.exceptions.VersionConflict
+    """
+    err = 'Item [{}] was changed concurrently: expected version {}, got {}'
+    err = err.format(object_id, expected, actual)
+    return x.VersionConflict(err, expected=expected, actual=actual)
@@ -0,0 +1,184 @@
+"""
+Outbox
+Maintains content_outbox table that queues search and cache updates of
+changed items. Event handlers put entries to the outbox in the same
+transaction as the change itself, so an update can not be lost once the
+change is committed. Entries only hold item type, id and action, item data
+is read from the database when the outbox is drained by the worker.
+
+All functions expect an open connection to run within caller's transaction.
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import select, and_, or_, func
+from shiftcontent import db
+from pprint import pprint as pp
+
+
+# outbox actions
+PUT = 'put'
+DELETE = 'delete'
+
+
+def enqueue(conn, action, entries):
+    """
+    Enqueue
+    Puts entries to outbox if outbox is enabled
+    :param conn: sqlalchemy.engine.Connection
+    :param action: str, put or delete
+    :param entries: list, of (content_type, object_id) tuples
+    :return: None
+    """
+    if not db.outbox_enabled:
+        return
+
+    now = datetime.utcnow()
+    rows = [dict(
+        created=now,
+        type=content_type,
+        object_id=str(object_id),
+        action=action,
+        attempts=0,
+    ) for content_type, object_id in entries]
+
+    if rows:
+        conn.execute(db.tables['outbox'].insert(), rows)
+
+
+def put(conn, entries):
+    """
+    Put
+    Queues items to be put to cache and search index
+    :param conn: sqlalchemy.engine.Connection
+    :param entries: list, of (content_type, object_id) tuples
+    :return: None
+    """
+    enqueue(conn, PUT, entries)
+
+
+def delete(conn, entries):
+    """
+    Delete
+    Queues items to be removed from cache and search index
+    :param conn: sqlalchemy.engine.Connection
+    :param entries: list, of (content_type, object_id) tuples
+    :return: None
+    """
+    enqueue(conn, DELETE, entries)
+
+
+def is_pending(max_attempts, now):
+    """
+    Is pending
+    Returns condition selecting entries due to be processed
+    :param max_attempts: int, entries failed this many times are skipped
+    :param now: datetime, current time
+    :return: sqlalchemy.sql.expression.ClauseElement
+    """
+    outbox = db.tables['outbox']
+    return and_(
+        outbox.c.attempts < max_attempts,
+        or_(outbox.c.retry_at.is_(None), outbox.c.retry_at <= now)
+    )
+
+
+def supports_skip_locked(conn):
+    """
+    Supports skip locked
+    Checks if database can skip rows locked by other transactions when
+    selecting for update. MySQL only supports it since 8.0, MariaDB since
+    10.6 and Postgres since 9.5. Other dialects ignore row locks altogether.
+    :param conn: sqlalchemy.engine.Connection
+    :return: bool
+    """
+    dialect = conn.dialect
+    version = tuple(dialect.server_version_info or ())
+    if dialect.name == 'mysql':
+        if getattr(dialect, '_is_mariadb', False):
+            return version >= (10, 6)
+        return version >= (8, 0, 1)
+    if dialect.name == 'postgresql':
+        return version >= (9, 5)
+    return True
+
+
+def pending(conn, batch_size=500, max_attempts=5):
+    """
+    Pending
+    Returns a batch of entries due to be processed in the order they were
+    queued. Locks selected rows, skipping rows locked by other workers on
+    databases that support it. On older databases workers wait for each
+    other's locks instead.
+    :param conn: sqlalchemy.engine.Connection
+    :param batch_size: int, max number of entries
+    :param max_attempts: int, entries failed this many times are skipped
+    :return: list
+    """
+    outbox = db.tables['outbox']
+    query = outbox.select()\
+        .where(is_pending(max_attempts, datetime.utcnow()))\
+        .order_by(outbox.c.id)\
+        .limit(batch_size)\
+        .with_for_update(skip_locked=supports_skip_locked(conn))
+
+    return conn.execute(query).fetchall()
+
+
+def remove(conn, ids):
+    """
+    Remove
+    Deletes processed entries
+    :param conn: sqlalchemy.engine.Connection
+    :param ids: list, entry ids
+    :return: None
+    """
+    outbox = db.tables['outbox']
+    if ids:
+        conn.execute(outbox.delete().where(outbox.c.id.in_(ids)))
+
+
+def retry(conn, rows, errors, delay=10):
+    """
+    Retry
+    Records failed attempt on entries and postpones them with exponential
+    backoff
+    :param conn: sqlalchemy.engine.Connection
+    :param rows: list, failed entries
+    :param errors: dict, error messages by object id
+    :param delay: int, base delay in seconds
+    :return: None
+    """
+    outbox = db.tables['outbox']
+    now = datetime.utcnow()
+    for row in rows:
+        attempts = row.attempts + 1
+        retry_at = now + timedelta(seconds=delay * 2 ** (attempts - 1))
+        conn.execute(outbox.update().where(outbox.c.id == row.id).values(
+            attempts=attempts,
+            retry_at=retry_at,
+            error=errors.get(row.object_id)
+        ))
+
+
+def stats(conn, max_attempts=5):
+    """
+    Stats
+    Returns number of pending and failed entries along with lag: the age
+    of the oldest pending entry in seconds
+    :param conn: sqlalchemy.engine.Connection
+    :param max_attempts: int, entries failed this many times count as failed
+    :return: dict
+    """
+    outbox = db.tables['outbox']
+    query = select([func.count(), func.min(outbox.c.created)])\
+        .where(outbox.c.attempts < max_attempts)
+    pending_count, oldest = conn.execute(query).fetchone()
+
+    query = select([func.count()]).where(outbox.c.attempts >= max_attempts)
+    failed_count = conn.execute(query).scalar()
+
+    lag = 0
+    if oldest:
+        lag = max(0, (datetime.utcnow() - oldest).total_seconds())
+
+    return dict(pending=pending_count, failed=failed_count, lag=lag)
@@ -38,10 +38,48 @@ def define_tables(meta, dialect=None):
         sa.Column('sort_order', sa.Integer, nullable=True, index=True),
         sa.Column('author', sa.String(256), nullable=False, index=True),
         sa.Column('object_id', sa.String(256), nullable=False, index=True),
+        sa.Column('version', sa.Integer, nullable=False, server_default='1'),
         sa.Column('fields', text),
         path_index
     )
 
+    # closure table: a row per every ancestor-descendant pair (and self)
+    content_tables['tree'] = sa.Table('content_items_tree', meta,
+        sa.Column('ancestor', sa.String(256), primary_key=True),
+        sa.Column('descendant', sa.String(256), primary_key=True),
+        sa.Column('depth', sa.Integer, nullable=False),
+        sa.Index('ix_content_items_tree_descendant', 'descendant', 'depth'),
+        sa.Index('ix_content_items_tree_ancestor', 'ancestor', 'depth'),
+    )
+
+    # typed values of custom fields marked as indexed in definition
+    content_tables['index'] = sa.Table('content_items_index', meta,
+        sa.Column('object_id', sa.String(256), primary_key=True),
+        sa.Column('field', sa.String(256), primary_key=True),
+        sa.Column('type', sa.String(256), nullable=False),
+        sa.Column('string_value', sa.String(256), nullable=True),
+        sa.Column('hash_value', sa.String(64), nullable=True),
+        sa.Column('number_value', sa.Float, nullable=True),
+        sa.Column('date_value', sa.DateTime, nullable=True),
+        sa.Index('ix_content_items_index_string', 'type', 'field', 'string_value'),
+        sa.Index('ix_content_items_index_hash', 'type', 'field', 'hash_value'),
+        sa.Index('ix_content_items_index_number', 'type', 'field', 'number_value'),
+        sa.Index('ix_content_items_index_date', 'type', 'field', 'date_value'),
+    )
+
+    # pending search and cache updates, see shiftcontent.outbox_worker
+    content_tables['outbox'] = sa.Table('content_outbox', meta,
+        sa.Column('id', sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column('created', sa.DateTime, nullable=False),
+        sa.Column('type', sa.String(256), nullable=False),
+        sa.Column('object_id', sa.String(256), nullable=False),
+        sa.Column('action', sa.String(16), nullable=False),
+        sa.Column('attempts', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('retry_at', sa.DateTime, nullable=True),
+        sa.Column('error', text, nullable=True),
+        sa.Index('ix_content_outbox_pending', 'attempts', 'retry_at'),
+    )
+
     tables = {**content_tables, **event_tables}
     return tables
 
@@ -0,0 +1,128 @@
+"""
+Hierarchy closure table
+Maintains content_items_tree table alongside materialized item paths. The
+table holds a row for every ancestor-descendant pair with the distance
+between them, plus a zero-depth row linking every item to itself. This turns
+children, descendants and subtree lookups into indexed equality queries
+that do not depend on path length.
+
+All functions expect an open connection to run within caller's transaction.
+"""
+
+from sqlalchemy import select
+from shiftcontent import db
+from pprint import pprint as pp
+
+
+def node_rows(object_id, path=None):
+    """
+    Node rows
+    Returns closure rows for an item from its materialized path
+    :param object_id: str, item object id
+    :param path: str, item path
+    :return: list
+    """
+    rows = [dict(ancestor=object_id, descendant=object_id, depth=0)]
+    ancestors = path.split('.') if path else []
+    for depth, ancestor in enumerate(reversed(ancestors), 1):
+        rows.append(dict(ancestor=ancestor, descendant=object_id, depth=depth))
+
+    return rows
+
+
+def insert_nodes(conn, nodes):
+    """
+    Insert nodes
+    Links items to themselves and to their ancestors
+    :param conn: sqlalchemy.engine.Connection
+    :param nodes: list, of (object_id, path) tuples
+    :return: None
+    """
+    rows = []
+    for object_id, path in nodes:
+        rows.extend(node_rows(object_id, path))
+
+    if rows:
+        conn.execute(db.tables['tree'].insert(), rows)
+
+
+def insert_node(conn, object_id, path=None):
+    """
+    Insert node
+    Links an item to itself and to its ancestors
+    :param conn: sqlalchemy.engine.Connection
+    :param object_id: str, item object id
+    :param path: str, item path
+    :return: None
+    """
+    insert_nodes(conn, [(object_id, path)])
+
+
+def delete_nodes(conn, object_ids):
+    """
+    Delete nodes
+    Removes links from items to their ancestors. Links to descendants are
+    kept the same way descendant paths keep referencing removed items.
+    :param conn: sqlalchemy.engine.Connection
+    :param object_ids: list, item object ids
+    :return: None
+    """
+    tree = db.tables['tree']
+    if object_ids:
+        conn.execute(tree.delete().where(tree.c.descendant.in_(object_ids)))
+
+
+def delete_node(conn, object_id):
+    """
+    Delete node
+    Removes links from an item to its ancestors
+    :param conn: sqlalchemy.engine.Connection
+    :param object_id: str, item object id
+    :return: None
+    """
+    delete_nodes(conn, [object_id])
+
+
+def replace_nodes(conn, nodes):
+    """
+    Replace nodes
+    Relinks items to ancestors from their current paths. Used when items
+    are moved around the tree. When moving a subtree, all of its items
+    must be given.
+    :param conn: sqlalchemy.engine.Connection
+    :param nodes: list, of (object_id, path) tuples
+    :return: None
+    """
+    delete_nodes(conn, [object_id for object_id, _ in nodes])
+    insert_nodes(conn, nodes)
+
+
+def rebuild(conn, batch_size=1000):
+    """
+    Rebuild
+    Recreates closure table from materialized item paths. Use this to
+    populate the table for existing content.
+    :param conn: sqlalchemy.engine.Connection
+    :param batch_size: int, number of items to process at once
+    :return: int, number of items processed
+    """
+    items = db.tables['items']
+    conn.execute(db.tables['tree'].delete())
+
+    count = 0
+    last_id = 0
+    while True:
+        query = select([items.c.id, items.c.object_id, items.c.path])\
+            .where(items.c.id > last_id)\
+            .order_by(items.c.id)\
+            .limit(batch_size)
+
+        rows = conn.execute(query).fetchall()
+        if not rows:
+            break
+
+        insert_nodes(conn, [(row.object_id, row.path) for row in rows])
+        last_id = rows[-1].id
+        count += len(rows)
+
+    return count
@@ -0,0 +1,335 @@
+"""
+Type tables
+Maintains optional per content type projection tables. Every content type
+gets a content_type_<handle> table with a typed column per custom field, so
+that field values can be filtered and sorted by the database without decoding
+fields json. Items table remains the source of truth, type tables are kept
+in sync with it by event handlers and can be rebuilt from it at any time.
+
+Tables are generated from content definition. Whenever definition is loaded
+missing tables get created and new fields get added as columns. Columns of
+deleted fields are left as they are. When a field changes type, its table
+gets recreated and repopulated from items table.
+
+All functions that accept connection expect to run within caller's
+transaction. These do nothing unless type tables are enabled in db.
+"""
+
+import json
+import sqlalchemy as sa
+from datetime import datetime, timezone
+from collections import defaultdict
+from shiftcontent import db
+from shiftcontent.field_types import field_types
+from pprint import pprint as pp
+
+
+# column types by field type, fields of other types are kept in json only
+column_types = dict(
+    text=sa.Text,
+    integer=sa.Integer,
+    float=sa.Float,
+    boolean=sa.Boolean,
+    date=sa.Date,
+    datetime=sa.DateTime,
+)
+
+
+def table_name(content_type):
+    """
+    Table name
+    Returns name of type table for content type
+    :param content_type: str, content type handle
+    :return: str
+    """
+    return 'content_type_{}'.format(content_type)
+
+
+def define_table(content_type, type_definition):
+    """
+    Define table
+    Creates table definition for content type from its definition. Redefines
+    the table if it already exists in metadata to pick up new fields.
+    :param content_type: str, content type handle
+    :param type_definition: dict, content type definition
+    :return: sqlalchemy.Table
+    """
+    name = table_name(content_type)
+    if name in db.type_meta.tables:
+        db.type_meta.remove(db.type_meta.tables[name])
+
+    columns = []
+    indexes = []
+    for field in type_definition['fields']:
+        handle = field['handle']
+        column_type = column_types.get(field['type'])
+        if not column_type or handle == 'object_id':
+            continue
+
+        columns.append(sa.Column(handle, column_type, nullable=True))
+        if not field.get('indexed'):
+            continue
+
+        # mysql can only index text columns by prefix
+        index_name = 'ix_{}_{}'.format(name, handle)
+        if column_type is sa.Text:
+            index = sa.Index(index_name, handle, mysql_length=768)
+        else:
+            index = sa.Index(index_name, handle)
+        indexes.append(index)
+
+    table = sa.Table(name, db.type_meta,
+        sa.Column('object_id', sa.String(256), primary_key=True),
+        *columns,
+        *indexes
+    )
+
+    db.type_tables[content_type] = table
+    return table
+
+
+def table(content_type):
+    """
+    Table
+    Returns type table for content type, defining it from content definition
+    if necessary.
+    :param content_type: str, content type handle
+    :return: sqlalchemy.Table
+    """
+    if content_type not in db.type_tables:
+        from shiftcontent import definition_service
+        type_definition = definition_service.get_type(content_type)
+        define_table(content_type, type_definition)
+
+    return db.type_tables[content_type]
+
+
+def sync(definition):
+    """
+    Sync
+    Brings type tables in line with content definition: creates tables for
+    new content types and adds columns and indexes for new fields. Tables
+    with columns of fields that changed type are recreated and repopulated.
+    :param definition: dict, content definition
+    :return: None
+    """
+    if not db.type_tables_enabled:
+        return
+
+    with db.engine.begin() as conn:
+        inspector = sa.inspect(conn)
+        existing_tables = inspector.get_table_names()
+        for content_type, type_definition in definition.items():
+            table = define_table(content_type, type_definition)
+            if table.name not in existing_tables:
+                table.create(conn)
+                continue
+
+            columns = inspector.get_columns(table.name)
+            existing = {column['name']: column['type'] for column in columns}
+            changed = [
+                column for column in table.columns
+                if column.name in existing
+                and not same_type(existing[column.name], column.type)
+            ]
+            if changed:
+                table.drop(conn)
+                table.create(conn)
+                populate(conn, content_type, type_definition)
+                continue
+
+            for column in table.columns:
+                if column.name not in existing:
+                    add_column(conn, table, column)
+
+            indexes = inspector.get_indexes(table.name)
+            existing = [index['name'] for index in indexes]
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(conn)
+
+
+def same_type(reflected, column_type):
+    """
+    Same type
+    Checks if column type reflected from the database stores the same kind
+    of values as column type from definition. Booleans are allowed to be
+    stored as integers for databases without a boolean type.
+    :param reflected: sqlalchemy type reflected from the database
+    :param column_type: sqlalchemy type from definition
+    :return: bool
+    """
+    try:
+        actual = reflected.python_type
+    except NotImplementedError:
+        return False
+
+    expected = column_type.python_type
+    if expected is bool:
+        return actual in (bool, int)
+    return actual is expected
+
+
+def add_column(conn, table, column):
+    """
+    Add column
+    Issues DDL to add a nullable column to existing table
+    :param conn: sqlalchemy.engine.Connection
+    :param table: sqlalchemy.Table
+    :param column: sqlalchemy.Column
+    :return: None
+    """
+    quote = conn.dialect.identifier_preparer.quote
+    ddl = 'ALTER TABLE {} ADD COLUMN {} {}'.format(
+        quote(table.name),
+        quote(column.name),
+        column.type.compile(dialect=conn.dialect)
+    )
+    conn.execute(ddl)
+
+
+def column_value(value):
+    """
+    Column value
+    Converts field value to be stored in type table column
+    :param value: mixed, field value
+    :return: mixed
+    """
+    if isinstance(value, datetime) and value.tzinfo:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def definition_row(type_definition, row):
+    """
+    Definition row
+    Returns type table row for a row from items table, converting field
+    values by types in content type definition, without creating an item
+    :param type_definition: dict, content type definition
+    :param row: items table row with object_id and fields
+    :return: dict
+    """
+    fields = json.loads(row.fields)
+    data = dict(object_id=str(row.object_id))
+    for field in type_definition['fields']:
+        handle = field['handle']
+        if field['type'] not in column_types or handle == 'object_id':
+            continue
+
+        value = fields.get(handle)
+        if value is not None:
+            value = field_types[field['type']].value_from_db(value)
+        data[handle] = column_value(value)
+
+    return data
+
+
+def item_row(item):
+    """
+    Item row
+    Returns type table row for an item
+    :param item: shiftcontent.item.Item
+    :return: dict
+    """
+    row = dict(object_id=str(item.object_id))
+    columns = table(item.type).columns
+    for handle in item.layout.custom_fields:
+        if handle in columns and handle != 'object_id':
+            row[handle] = column_value(item.fields.get(handle))
+    return row
+
+
+def put_items(conn, items):
+    """
+    Put items
+    Replaces type table rows of items with their current field values
+    :param conn: sqlalchemy.engine.Connection
+    :param items: list, of shiftcontent.item.Item
+    :return: None
+    """
+    if not db.type_tables_enabled:
+        return
+
+    by_type = defaultdict(list)
+    for item in items:
+        by_type[item.type].append(item)
+
+    for content_type, typed in by_type.items():
+        object_ids = [item.object_id for item in typed]
+        delete_items(conn, content_type, object_ids)
+        rows = [item_row(item) for item in typed]
+        conn.execute(table(content_type).insert(), rows)
+
+
+def delete_items(conn, content_type, object_ids):
+    """
+    Delete items
+    Removes type table rows of items
+    :param conn: sqlalchemy.engine.Connection
+    :param content_type: str, content type handle
+    :param object_ids: list, item object ids
+    :return: None
+    """
+    if not db.type_tables_enabled:
+        return
+
+    object_ids = [str(object_id) for object_id in object_ids]
+    if object_ids:
+        type_table = table(content_type)
+        query = type_table.delete().where(type_table.c.object_id.in_(object_ids))
+        conn.execute(query)
+
+
+def rebuild(conn, batch_size=1000):
+    """
+    Rebuild
+    Recreates type table rows from items in the database. Run this after
+    enabling type tables for existing content.
+    :param conn: sqlalchemy.engine.Connection
+    :param batch_size: int, number of items to process at once
+    :return: int, number of items processed
+    """
+    if not db.type_tables_enabled:
+        return 0
+
+    from shiftcontent import definition_service
+    count = 0
+    for content_type, type_definition in definition_service.definition.items():
+        conn.execute(table(content_type).delete())
+        count += populate(conn, content_type, type_definition, batch_size)
+
+    return count
+
+
+def populate(conn, content_type, type_definition, batch_size=1000):
+    """
+    Populate
+    Puts items of content type from items table to its empty type table
+    :param conn: sqlalchemy.engine.Connection
+    :param content_type: str, content type handle
+    :param type_definition: dict, content type definition
+    :param batch_size: int, number of items to process at once
+    :return: int, number of items processed
+    """
+    items = db.tables['items']
+    type_table = db.type_tables[content_type]
+    columns = [items.c.id, items.c.object_id, items.c.fields]
+    count = 0
+    last_id = 0
+    while True:
+        where = sa.and_(items.c.type == content_type, items.c.id > last_id)
+        query = sa.select(columns)\
+            .where(where)\
+            .order_by(items.c.id)\
+            .limit(batch_size)
+
+        rows = conn.execute(query).fetchall()
+        if not rows:
+            break
+
+        data = [definition_row(type_definition, row) for row in rows]
+        conn.execute(type_table.insert(), data)
+        last_id = rows[-1].id
+        count += len(rows)
+
+    return count
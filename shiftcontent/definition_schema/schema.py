@@ -113,6 +113,10 @@ class FieldSchema(BaseSchema):
         ))
         self.type.add_validator(content_validators.FieldType())
 
+        # field index
+        self.add_property('indexed')
+        self.indexed.add_validator(content_validators.IndexableField())
+
         # field filters
         self.add_collection('filters')
         self.filters.schema = FilterSchema()
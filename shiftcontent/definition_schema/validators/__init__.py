@@ -8,3 +8,4 @@ from .handle import Handle
 from .non_metafield_handle import NonMetafieldHandle
 from .is_list import IsList
 from .field_type import FieldType
+from .indexable_field import IndexableField
@@ -0,0 +1,46 @@
+from shiftschema.validators.abstract_validator import AbstractValidator
+from shiftschema.result import Error
+from pprint import pprint as pp
+
+
+class IndexableField(AbstractValidator):
+    """
+    Indexable field
+    Checks that field marked as indexed is of a type that can be indexed
+    """
+
+    not_indexable = 'Field type [{field_type}] can not be indexed'
+
+    def __init__(self, message=None):
+        """
+        Instantiates validator and can optionally accept a custom error
+        message value
+        :param message: str, custom error message
+        """
+        if message:
+            self.not_indexable = message
+
+    def validate(self, value, model=None, context=None):
+        """
+        Validate
+        Performs validation and return an error object
+
+        :param value: bool, value being validated
+        :param model: obj or None, model being validated
+        :param context: obj or None, validation context
+        :return: shiftschema.results.SimpleResult
+        """
+        if not value or not model:
+            return Error()
+
+        from shiftcontent import definition_service
+        types = definition_service.field_types()
+        field_type = model.get('type')
+
+        # error if field type has no index column
+        if field_type in types and not types[field_type].index_type:
+            params = dict(field_type=field_type)
+            return Error(self.not_indexable, params)
+
+        # success otherwise
+        return Error()
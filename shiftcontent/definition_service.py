@@ -10,6 +10,7 @@ from frozendict import frozendict
 from shiftcontent import exceptions as x
 from shiftcontent.definition_schema.schema import DefinitionSchema
 from shiftcontent.field_types import field_types as default_field_types
+from shiftcontent.database import type_tables
 
 
 class DefinitionService:
@@ -28,6 +29,9 @@ class DefinitionService:
         self._definition = None
         self._field_types = None
 
+        # hash of currently loaded definition file
+        self.definition_hash = None
+
         if args or kwargs:
             self.init(*args, **kwargs)
 
@@ -41,6 +45,7 @@ class DefinitionService:
         self.definition_path = definition_path
         self._revisions_path = revisions_path
         self._definition = None
+        self.definition_hash = None
         if field_types:
             self._field_types = field_types
 
@@ -209,7 +214,8 @@ class DefinitionService:
         previous version and if so validate and persist. Additionally checks
         if new revision introduced breaking changes, i.g. deleted fields or
         changed field types and aborts persistence with an exception, unless
-        force flag is set to True
+        force flag is set to True. If type tables are enabled, creates tables
+        and columns for new content types and fields.
 
         :param force: bool, whether to force-load on breaking changes
         :return: dict
@@ -232,10 +238,13 @@ class DefinitionService:
         hash = hashlib.md5(str(text).encode('utf-8')).hexdigest()
         revision_path = os.path.join(self.revisions_path, hash + '.yml')
         changed = not os.path.exists(revision_path)
+        self.definition_hash = hash
 
         # return if not changed
         if not changed:
-            return self.freeze_definition(definition)
+            definition = self.freeze_definition(definition)
+            type_tables.sync(definition)
+            return definition
 
         # if changed, validate and persist
         ok = self.validate_definition(yml)
@@ -258,8 +267,12 @@ class DefinitionService:
         # save to revision registry
         self.register_revision(hash + '.yml')
 
+        # add new tables and columns
+        definition = self.freeze_definition(definition)
+        type_tables.sync(definition)
+
         # and return
-        return self.freeze_definition(definition)
+        return definition
 
     def get_latest_revision(self):
         """
@@ -3,6 +3,7 @@ from .content_item_delete import ContentItemDelete
 from .content_item_update import ContentItemUpdate
 from .content_item_update_field import ContentItemFieldUpdateField
 from .content_item_set_parent import ContentItemSetParent
+from .content_items_import import ContentItemsImport
 
 
 
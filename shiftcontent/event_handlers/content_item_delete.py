@@ -1,6 +1,10 @@
 from shiftevent.handlers.base import BaseHandler
 from shiftcontent.item import Item
 from shiftcontent import db
+from shiftcontent.database import tree
+from shiftcontent.database import field_index
+from shiftcontent.database import type_tables
+from shiftcontent.database import outbox
 from shiftcontent import search_service
 from shiftcontent import cache_service
 from pprint import pprint as pp
@@ -46,13 +50,21 @@ class ContentItemDelete(BaseHandler):
             conn.execute(items.delete().where(
                 items.c.object_id == event.object_id
             ))
+            tree.delete_node(conn, event.object_id)
+            field_index.delete_items(conn, [event.object_id])
+            if item:
+                type_tables.delete_items(conn, item.type, [item.object_id])
+                outbox.delete(conn, [(item.type, item.object_id)])
 
         if item:
             # remove from cache
             cache_service.delete(item.object_id)
+            cache_service.delete_children(item.object_id, item.parent_id)
+            cache_service.set_missing(item.object_id)
 
             # remove from index
-            search_service.delete(item.type, item.object_id)
+            if not db.outbox_enabled:
+                search_service.delete(item.type, item.object_id)
 
         return event
 
@@ -68,11 +80,16 @@ class ContentItemDelete(BaseHandler):
             del rollback_data['id']
 
         item = Item(**rollback_data)
+        item.set_field('version', item.version + 1, initial=True)
 
         # re-create
         items = db.tables['items']
         with db.engine.begin() as conn:
             result = conn.execute(items.insert(), **item.to_db(update=False))
+            tree.insert_node(conn, item.object_id, item.path)
+            field_index.index_items(conn, [item])
+            type_tables.put_items(conn, [item])
+            outbox.put(conn, [(item.type, item.object_id)])
             item.set_field(
                 field='id',
                 value=result.inserted_primary_key[0],
@@ -81,9 +98,12 @@ class ContentItemDelete(BaseHandler):
 
         # cache
         cache_service.set(item)
+        cache_service.delete_children(item.parent_id)
+        cache_service.delete_missing(item.object_id)
 
         # index
-        search_service.put_to_index(item)
+        if not db.outbox_enabled:
+            search_service.put_to_index(item)
 
         return event
 
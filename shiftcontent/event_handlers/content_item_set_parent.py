@@ -1,6 +1,9 @@
+from sqlalchemy import select, or_, func, literal
 from shiftevent.handlers.base import BaseHandler
 from shiftcontent.item import Item
 from shiftcontent import db
+from shiftcontent.database import tree
+from shiftcontent.database import outbox
 from shiftcontent import cache_service
 from shiftcontent import search_service
 from shiftmemory import exceptions as cx
@@ -28,6 +31,18 @@ class ContentItemSetParent(BaseHandler):
         'CONTENT_ITEM_SET_PARENT',
     )
 
+    def subtree_prefix(self, path, object_id):
+        """
+        Subtree prefix
+        Returns path that all the descendants of an item start with
+        :param path: str, item path
+        :param object_id: str, item object id
+        :return: str
+        """
+        if not path:
+            return str(object_id)
+        return '{}.{}'.format(path, object_id)
+
     def set_parent(self, item_object_id, parent_object_id=None):
         """
         Set parent
@@ -35,6 +50,10 @@ class ContentItemSetParent(BaseHandler):
         will make an item root-level). This gets used both in handle and
         rollback functions as they are essentially the same.
 
+        Descendant paths are rewritten with a single update statement without
+        loading descendant items. Cached descendants get their paths updated
+        in place and indexed ones get partially updated with bulk requests.
+
         :param item_object_id: str, object id of an item to set parent on
         :param parent_object_id: str, object id of the parent object
         :return:
@@ -49,51 +68,85 @@ class ContentItemSetParent(BaseHandler):
         # get item
         item = content_service.get_item(item_object_id)
 
-        # get descendants
-        children = content_service.get_descendants(item_object_id)
+        # new item path
+        path = None
+        if parent:
+            path = self.subtree_prefix(parent.path, parent.object_id)
+
+        old_parent_id = item.parent_id
+        old_prefix = self.subtree_prefix(item.path, item.object_id)
+        new_prefix = self.subtree_prefix(path, item.object_id)
 
         items = db.tables['items']
         with db.engine.begin() as conn:
 
             # update item path
-            if not parent:
-                path = None
-            elif parent.path:
-                path = '{}.{}'.format(parent.path, parent.object_id)
-            else:
-                path = str(parent.object_id)
-
-            query = items.update().where(items.c.object_id == item_object_id)
-            conn.execute(query.values(dict(path=path)))
+            where = items.c.object_id == item_object_id
+            query = items.update().where(where)
+            conn.execute(query.values(path=path, version=items.c.version + 1))
+            query = select([items.c.version]).where(where)
+            item.set_field('version', conn.execute(query).scalar(), initial=True)
             item.path = path
 
-            # update children paths
-            for child in children:
-                if item.path:
-                    update = '{}.{}'.format(
-                        item.path,
-                        item.object_id
-                    ).split('.')
-                else:
-                    update = [str(item.object_id)]
-
-                child_path = child.path.split('.')
-                index = child_path.index(str(item.object_id))
-                path = '.'.join(update + child_path[index+1:])
-
-                where = items.c.object_id == child.object_id
-                query = items.update().where(where)
-                conn.execute(query.values(dict(path=path)))
-                child.path = path
+            # rewrite descendant paths
+            in_subtree = or_(
+                items.c.path == old_prefix,
+                items.c.path.like(old_prefix + '.%')
+            )
+            tail = func.substr(items.c.path, len(old_prefix) + 1)
+            query = items.update().where(in_subtree)
+            conn.execute(query.values(
+                path=literal(new_prefix) + tail,
+                version=items.c.version + 1
+            ))
+
+            # get moved descendants
+            in_subtree = or_(
+                items.c.path == new_prefix,
+                items.c.path.like(new_prefix + '.%')
+            )
+            columns = [
+                items.c.object_id,
+                items.c.type,
+                items.c.path,
+                items.c.version
+            ]
+            query = select(columns).where(in_subtree)
+            moved = conn.execute(query).fetchall()
+
+            # relink subtree in hierarchy
+            nodes = [(item.object_id, item.path)]
+            nodes.extend((row.object_id, row.path) for row in moved)
+            tree.replace_nodes(conn, nodes)
+
+            # queue index updates
+            moved_items = [(item.type, item.object_id)]
+            moved_items.extend((row.type, row.object_id) for row in moved)
+            outbox.put(conn, moved_items)
 
         # put item to cache & index
         cache_service.set(item)
-        search_service.put_to_index(item)
-
-        # put children to cache & index
-        for child in children:
-            cache_service.set(child)
-            search_service.put_to_index(child)
+        cache_service.delete_children(old_parent_id, parent_object_id)
+        if not db.outbox_enabled:
+            search_service.put_to_index(item)
+
+        # update descendants in cache
+        rows = {row.object_id: row for row in moved}
+        cached = cache_service.get_many(list(rows.keys()))
+        for object_id, child in cached.items():
+            child.path = rows[object_id].path
+            child.set_field('version', rows[object_id].version, initial=True)
+        cache_service.set_many(list(cached.values()))
+
+        # update descendants in index
+        if db.outbox_enabled:
+            return
+
+        search_service.update_many([(
+            row.type,
+            row.object_id,
+            dict(path=row.path, version=row.version)
+        ) for row in moved])
 
         return
 
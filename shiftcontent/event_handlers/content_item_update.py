@@ -1,6 +1,11 @@
+from sqlalchemy import select, and_
 from shiftevent.handlers.base import BaseHandler
 from shiftcontent.item import Item
 from shiftcontent import db
+from shiftcontent.database import field_index
+from shiftcontent.database import json_fields
+from shiftcontent.database import type_tables
+from shiftcontent.database import outbox
 from shiftcontent import search_service
 from shiftcontent import cache_service
 from pprint import pprint as pp
@@ -38,7 +43,8 @@ class ContentItemUpdate(BaseHandler):
         """
         Handle event
         Update content item and return an event for further
-        handler chaining.
+        handler chaining. Only updates the item if it is still at the
+        version the update was based on, otherwise raises version conflict.
         :param event: shiftcontent.events.event.Event
         :return: shiftcontent.events.event.Event
         """
@@ -46,43 +52,75 @@ class ContentItemUpdate(BaseHandler):
         # update
         item = Item()
         item.from_json(event.payload_json)
+        version = item.version
         db_data = item.to_db()
         items = db.tables['items']
         with db.engine.begin() as conn:
-            query = items.update().where(items.c.object_id == event.object_id)
-            conn.execute(query.values(**db_data))
+            query = items.update().where(and_(
+                items.c.object_id == event.object_id,
+                items.c.version == version
+            ))
+            result = conn.execute(query.values(version=version + 1, **db_data))
+            if not result.rowcount:
+                query = select([items.c.version])\
+                    .where(items.c.object_id == event.object_id)
+                actual = conn.execute(query).scalar()
+                if actual is not None:
+                    self.conflict = True
+                    raise json_fields.version_conflict(
+                        event.object_id,
+                        version,
+                        actual
+                    )
+
+            field_index.index_items(conn, [item])
+            type_tables.put_items(conn, [item])
+            outbox.put(conn, [(item.type, item.object_id)])
+
+        item.set_field('version', version + 1, initial=True)
 
         # cache
         cache_service.set(item)
 
         # index
-        search_service.put_to_index(item)
+        if not db.outbox_enabled:
+            search_service.put_to_index(item)
 
         return event
 
     def rollback(self, event):
         """
         Rollback event
-        Rollback changes using before-update dta save in payload.
+        Rollback changes using before-update dta save in payload. Skipped if
+        the update itself was rejected because of version conflict.
         :param event: shiftcontent.events.event.Event
         :return: shiftcontent.events.event.Event
         """
+        if getattr(self, 'conflict', False):
+            return event
+
         # rollback
         item = Item()
         item.from_json(event.payload_rollback_json)
         db_data = item.to_db()
         items = db.tables['items']
+        where = items.c.object_id == event.object_id
         with db.engine.begin() as conn:
-            query = items.update().where(items.c.object_id == event.object_id)
-            conn.execute(query.values(**db_data))
+            query = items.update().where(where)
+            conn.execute(query.values(version=items.c.version + 1, **db_data))
+            query = select([items.c.version]).where(where)
+            version = conn.execute(query).scalar()
+            field_index.index_items(conn, [item])
+            type_tables.put_items(conn, [item])
+            outbox.put(conn, [(item.type, item.object_id)])
+
+        if version is not None:
+            item.set_field('version', version, initial=True)
 
         # cache
         cache_service.set(item)
 
         # index
-        search_service.put_to_index(item)
-
-
-
-
+        if not db.outbox_enabled:
+            search_service.put_to_index(item)
 
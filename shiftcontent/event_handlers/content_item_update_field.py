@@ -1,10 +1,15 @@
+from sqlalchemy import and_
 from shiftevent.handlers.base import BaseHandler
 from shiftcontent.item import Item
 from shiftcontent import db
+from shiftcontent import exceptions as x
+from shiftcontent.database import field_index
+from shiftcontent.database import json_fields
+from shiftcontent.database import type_tables
+from shiftcontent.database import outbox
 from shiftcontent import search_service
 from shiftcontent import cache_service
 from pprint import pprint as pp
-import json
 
 
 class ContentItemFieldUpdateField(BaseHandler):
@@ -18,7 +23,8 @@ class ContentItemFieldUpdateField(BaseHandler):
         payload={
             metafield=True,
             field='path',
-            value='new value'
+            value='new value',
+            version=3
         },
         payload_rollback={
             metafield=True,
@@ -27,6 +33,8 @@ class ContentItemFieldUpdateField(BaseHandler):
         },
     }
 
+    Version is optional and holds the item version the update is based on.
+    If given, the update will only be applied to item at that version.
     """
 
     EVENT_TYPES = (
@@ -34,10 +42,14 @@ class ContentItemFieldUpdateField(BaseHandler):
     )
 
 
-    def update_field(self, object_id, field, value, metafield):
+    def update_field(self, object_id, field, value, metafield, version=None):
         """
         Update field
-        Performs database update setting a new value on a field.
+        Performs database update setting a new value on a field. Custom
+        fields are set inside fields json by the database in one statement,
+        so concurrent updates to other fields are not lost. Bumps item
+        version and raises version conflict if expected version is given
+        and the item is at a different one.
         This was extracted to be used from both handle and rollback methods.
         Will return updated item data on success.
 
@@ -45,30 +57,50 @@ class ContentItemFieldUpdateField(BaseHandler):
         :param field: str, field name to update
         :param value: mixed, new value to set
         :param metafield: bool, whether the field is a metafield
+        :param version: int, expected item version
         :return: dict
         """
         items = db.tables['items']
         with db.engine.begin() as conn:
 
-            select = items.select().where(items.c.object_id == object_id)
-            update = items.update().where(items.c.object_id == object_id)
-
             # update metafield
             if metafield:
-                values = dict()
-                values[field] = value
-                conn.execute(update.values(**values))
+                where = items.c.object_id == object_id
+                condition = where
+                if version is not None:
+                    condition = and_(where, items.c.version == version)
 
-            # update custom field
+                values = dict(version=items.c.version + 1)
+                values[field] = value
+                update = items.update().where(condition).values(**values)
+                updated = conn.execute(update).rowcount > 0
+                item_data = conn.execute(items.select().where(where)).fetchone()
+                if not updated and item_data:
+                    raise json_fields.version_conflict(
+                        object_id,
+                        version,
+                        item_data.version
+                    )
+
+            # update custom field in place
             if not metafield:
-                item_data = conn.execute(select).fetchone()
-                fields = json.loads(item_data.fields, encoding='utf-8')
-                fields[field] = value
-                fields = json.dumps(fields, ensure_ascii=False)
-                conn.execute(update.values(fields=fields))
-
-            # get updated item data
-            item_data = conn.execute(select).fetchone()
+                item_data = json_fields.set_field(
+                    conn,
+                    object_id,
+                    field,
+                    value,
+                    version=version
+                )
+
+            if not item_data:
+                err = 'Unable to find item with such id [{}]'
+                raise x.ItemNotFound(err.format(object_id))
+
+            # update indexes
+            item = Item().from_db(item_data)
+            field_index.index_items(conn, [item])
+            type_tables.put_items(conn, [item])
+            outbox.put(conn, [(item.type, item.object_id)])
 
         # and return
         return item_data
@@ -81,12 +113,17 @@ class ContentItemFieldUpdateField(BaseHandler):
         :param event: shiftcontent.events.event.Event
         :return: shiftcontent.events.event.Event
         """
-        item_data = self.update_field(
-            object_id=event.object_id,
-            field=event.payload['field'],
-            value=event.payload['value'],
-            metafield=event.payload['metafield']
-        )
+        try:
+            item_data = self.update_field(
+                object_id=event.object_id,
+                field=event.payload['field'],
+                value=event.payload['value'],
+                metafield=event.payload['metafield'],
+                version=event.payload.get('version')
+            )
+        except x.VersionConflict:
+            self.conflict = True
+            raise
 
         # prepare item
         item = Item().from_db(item_data)
@@ -95,7 +132,8 @@ class ContentItemFieldUpdateField(BaseHandler):
         cache_service.set(item)
 
         # index
-        search_service.put_to_index(item)
+        if not db.outbox_enabled:
+            search_service.put_to_index(item)
 
         return event
 
@@ -103,9 +141,13 @@ class ContentItemFieldUpdateField(BaseHandler):
         """
         Rollback event
         Reverts changes to field using before-update data stored in payload.
+        Skipped if the update itself was rejected because of version conflict.
         :param event: shiftcontent.events.event.Event
         :return: shiftcontent.events.event.Event
         """
+        if getattr(self, 'conflict', False):
+            return event
+
         item_data = self.update_field(
             object_id=event.object_id,
             field=event.payload_rollback['field'],
@@ -120,7 +162,8 @@ class ContentItemFieldUpdateField(BaseHandler):
         cache_service.set(item)
 
         # index
-        search_service.put_to_index(item)
+        if not db.outbox_enabled:
+            search_service.put_to_index(item)
 
         return event
 
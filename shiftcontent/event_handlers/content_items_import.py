@@ -0,0 +1,127 @@
+from shiftevent.handlers.base import BaseHandler
+from collections import defaultdict
+from shiftcontent.item import Item
+from shiftcontent import db
+from shiftcontent.database import tree
+from shiftcontent.database import field_index
+from shiftcontent.database import type_tables
+from shiftcontent.database import outbox
+from shiftcontent import search_service
+from shiftcontent import cache_service
+from pprint import pprint as pp
+
+
+class ContentItemsImport(BaseHandler):
+    """
+    Import content items
+    This handler creates a batch of content items at once. It is used by
+    bulk imports to insert many items with a single statement, put them
+    to cache in one round-trip and index them with a single bulk request.
+    Expects the following payload structure:
+
+    event = {
+        ...
+        payload={
+            items=[
+                dict(
+                    type='plain_text',
+                    author=123,
+                    object_id='d2bf6e2c-aba6-11e8-89e5-38c9863edaea',
+                    custom_field='some value'
+                ),
+                ...
+            ]
+        },
+        payload_rollback=None
+    }
+    """
+
+    EVENT_TYPES = (
+        'CONTENT_ITEMS_IMPORT',
+    )
+
+    def handle(self, event):
+        """
+        Handle event
+        Create content items and return an event for further
+        handler chaining.
+        :param event: shiftcontent.events.event.Event
+        :return: shiftcontent.events.event.Event
+        """
+        created = [Item(**data) for data in event.payload['items']]
+        if not created:
+            return event
+
+        # insert
+        items = db.tables['items']
+        object_ids = [item.object_id for item in created]
+        with db.engine.begin() as conn:
+            rows = [item.to_db(update=False) for item in created]
+            conn.execute(items.insert(), rows)
+            tree.insert_nodes(conn, [(i.object_id, i.path) for i in created])
+            field_index.index_items(conn, created)
+            type_tables.put_items(conn, created)
+            outbox.put(conn, [(i.type, i.object_id) for i in created])
+
+            # get ids back
+            query = items.select()\
+                .with_only_columns([items.c.id, items.c.object_id])\
+                .where(items.c.object_id.in_(object_ids))
+            ids = {r.object_id: r.id for r in conn.execute(query)}
+
+        for item in created:
+            item.set_field('id', ids.get(item.object_id), initial=True)
+
+        # cache
+        cache_service.set_many(created)
+        cache_service.delete_children(*set(i.parent_id for i in created))
+        cache_service.delete_missing(*object_ids)
+
+        # index
+        if not db.outbox_enabled:
+            search_service.put_many(created)
+
+        return event
+
+    def rollback(self, event):
+        """
+        Rollback event
+        Removes imported content items
+        :param event: shiftcontent.events.event.Event
+        :return: shiftcontent.events.event.Event
+        """
+        imported = event.payload['items']
+        object_ids = [data['object_id'] for data in imported]
+        if not object_ids:
+            return event
+
+        imported_ids = defaultdict(list)
+        for data in imported:
+            imported_ids[data['type']].append(data['object_id'])
+
+        # delete
+        items = db.tables['items']
+        with db.engine.begin() as conn:
+            query = items.delete().where(items.c.object_id.in_(object_ids))
+            conn.execute(query)
+            tree.delete_nodes(conn, object_ids)
+            field_index.delete_items(conn, object_ids)
+            for content_type, ids in imported_ids.items():
+                type_tables.delete_items(conn, content_type, ids)
+                outbox.delete(conn, [(content_type, i) for i in ids])
+
+        # remove from cache & index
+        parent_ids = set()
+        for data in imported:
+            if data.get('path'):
+                parent_ids.add(data['path'].split('.')[-1])
+        cache_service.delete_children(*parent_ids)
+        cache_service.delete_many(object_ids)
+
+        if not db.outbox_enabled:
+            search_service.delete_many(
+                [(t, i) for t, ids in imported_ids.items() for i in ids],
+                raise_on_error=False
+            )
+
+        return event
@@ -57,8 +57,31 @@ class SearchError(ContentException, RuntimeError):
     pass
 
 
+class BulkIndexError(SearchError):
+    """ Raised when some documents fail to index during bulk indexing """
+    def __init__(self, *args, failures=None, **kwargs):
+        self.failures = failures
+        super().__init__(*args, **kwargs)
+
+
+class InvalidCursor(ContentException, ValueError):
+    """ Raised when paginating with a malformed cursor """
+    pass
 
 
+class InvalidQuery(ContentException, ValueError):
+    """ Raised when listing items with unsupported filters or ordering """
+    pass
+
 
+class ConcurrentUpdate(ContentException, RuntimeError):
+    """ Raised when item keeps changing concurrently while being updated """
+    pass
 
 
+class VersionConflict(ConcurrentUpdate):
+    """ Raised when updating an item that was changed since it was read """
+    def __init__(self, *args, expected=None, actual=None, **kwargs):
+        self.expected = expected
+        self.actual = actual
+        super().__init__(*args, **kwargs)
@@ -11,11 +11,102 @@ class AbstractFieldType(metaclass=ABCMeta):  # pragma: no cover
     back into your application.
     """
 
+    # column type to store values in when field is indexed: string, number
+    # or date. Fields with no index type can not be indexed.
+    index_type = None
+
     def __init__(self, value=None):
         self.value = None
         if value is not None:
             self.set(value)
 
+    # --------------------------------------------------------------------------
+    # Converters
+    # These work on plain values without keeping any state, so that content
+    # items can share one table of converters per content type instead of
+    # creating a field object per field. Defaults go through a throwaway
+    # field instance, override them in your field types to skip that.
+    # --------------------------------------------------------------------------
+
+    @classmethod
+    def convert(cls, value):
+        """
+        Convert value to field data type, same as set()
+        :param value: mixed
+        :return: mixed
+        """
+        field = cls()
+        field.set(value)
+        return field.get()
+
+    @classmethod
+    def value_to_db(cls, value):
+        """
+        Convert value to its db representation
+        :param value: mixed
+        :return: mixed
+        """
+        field = cls()
+        field.value = value
+        return field.to_db()
+
+    @classmethod
+    def value_from_db(cls, value):
+        """
+        Convert value from its db representation
+        :param value: mixed
+        :return: mixed
+        """
+        field = cls()
+        field.from_db(value)
+        return field.get()
+
+    @classmethod
+    def value_to_json(cls, value):
+        """
+        Convert value to its json representation
+        :param value: mixed
+        :return: mixed
+        """
+        field = cls()
+        field.value = value
+        return field.to_json()
+
+    @classmethod
+    def value_from_json(cls, value):
+        """
+        Convert value from its json representation
+        :param value: mixed
+        :return: mixed
+        """
+        field = cls()
+        field.from_json(value)
+        return field.get()
+
+    @classmethod
+    def value_to_search(cls, value):
+        """
+        Convert value to its search representation
+        :param value: mixed
+        :return: mixed
+        """
+        field = cls()
+        field.value = value
+        return field.to_search()
+
+    @classmethod
+    def value_to_index(cls, value):
+        """
+        Convert value to its field index representation
+        :param value: mixed
+        :return: mixed
+        """
+        return value
+
+    # --------------------------------------------------------------------------
+    # Field interface
+    # --------------------------------------------------------------------------
+
     @abstractmethod
     def set(self, value):
         """
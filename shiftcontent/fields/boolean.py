@@ -3,11 +3,15 @@ from .abstract import AbstractFieldType
 
 class Boolean(AbstractFieldType):
 
-    def set(self, value):
+    # field index column type
+    index_type = 'number'
+
+    @classmethod
+    def convert(cls, value):
         """
-        Sets field value
+        Converts value to boolean
         :param value: mixed, field value
-        :return: shiftcontent.fields.text.Boolean
+        :return: bool
         """
         if value is not None:
             if value in ('False', '0', 'no'):
@@ -16,8 +20,71 @@ class Boolean(AbstractFieldType):
                 value = True
             value = bool(value)
 
-        self.value = value
+        return value
+
+    @classmethod
+    def value_to_db(cls, value):
+        """
+        Returns db representation of value
+        :param value: bool, field value
+        :return: bool
+        """
+        return value
+
+    @classmethod
+    def value_from_db(cls, value):
+        """
+        Converts value from db representation
+        :param value: str or bool
+        :return: bool
+        """
+        return cls.convert(value)
 
+    @classmethod
+    def value_to_json(cls, value):
+        """
+        Returns json representation of value
+        :param value: bool, field value
+        :return: bool
+        """
+        return value
+
+    @classmethod
+    def value_from_json(cls, value):
+        """
+        Converts value from json representation
+        :param value: str or bool
+        :return: bool
+        """
+        return cls.convert(value)
+
+    @classmethod
+    def value_to_search(cls, value):
+        """
+        Returns search representation of value
+        :param value: bool, field value
+        :return: bool
+        """
+        return value
+
+    @classmethod
+    def value_to_index(cls, value):
+        """
+        Returns representation of value for field index
+        :param value: bool, field value
+        :return: int
+        """
+        if value is None:
+            return None
+        return int(value)
+
+    def set(self, value):
+        """
+        Sets field value
+        :param value: mixed, field value
+        :return: shiftcontent.fields.text.Boolean
+        """
+        self.value = self.convert(value)
         return self
 
     def get(self):
@@ -32,7 +99,7 @@ class Boolean(AbstractFieldType):
         Returns db representation of value
         :return: bool
         """
-        return self.value
+        return self.value_to_db(self.value)
 
     def from_db(self, value):
         """
@@ -40,7 +107,7 @@ class Boolean(AbstractFieldType):
         :param value: str or bool
         :return: shiftcontent.fields.text.Boolean
         """
-        self.set(value)
+        self.value = self.value_from_db(value)
         return self
 
     def to_json(self):
@@ -48,15 +115,15 @@ class Boolean(AbstractFieldType):
         Returns json representation of value
         :return: bool
         """
-        return self.value
+        return self.value_to_json(self.value)
 
     def from_json(self, value):
         """
-        Populate itself from json representation of value
-        :param value: bool
+        Populate field value from json representation
+        :param value: str or bool
         :return: shiftcontent.fields.text.Boolean
         """
-        self.set(value)
+        self.value = self.value_from_json(value)
         return self
 
     def to_search(self):
@@ -64,7 +131,7 @@ class Boolean(AbstractFieldType):
         Returns search representation of value
         :return: bool
         """
-        return self.value
+        return self.value_to_search(self.value)
 
     def search_mapping(self):
         """
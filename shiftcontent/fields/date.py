@@ -1,10 +1,101 @@
 from .abstract import AbstractFieldType
 from datetime import date, datetime
+import re
 import arrow
 
 
 class Date(AbstractFieldType):
 
+    # field index column type
+    index_type = 'date'
+
+    # canonical format that is parsed without arrow
+    pattern = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})')
+
+    @classmethod
+    def convert(cls, value):
+        """
+        Converts value to date.
+        Accepts a datetime string in a specific format and converts it to a
+        datetime object. Will assume the date is in UTC timezone.
+
+        :param value: str or date
+        :return: date
+        """
+        if value is None or type(value) is date:
+            return value
+
+        # dates from datetimes and canonical strings, without arrow
+        if isinstance(value, datetime):
+            return value.date()
+
+        value = str(value)
+        match = cls.pattern.fullmatch(value)
+        if match:
+            try:
+                return date(*map(int, match.groups()))
+            except ValueError:
+                pass
+
+        format = 'YYYY-MM-DD'
+        return arrow.get(value, format).to('UTC').date()
+
+    @classmethod
+    def value_to_db(cls, value):
+        """
+        Returns db representation of value
+        :param value: date, field value
+        :return: str
+        """
+        return value.strftime('%Y-%m-%d') if value else None
+
+    @classmethod
+    def value_from_db(cls, value):
+        """
+        Converts value from db representation
+        :param value: str or date
+        :return: date
+        """
+        return cls.convert(value)
+
+    @classmethod
+    def value_to_json(cls, value):
+        """
+        Returns json representation of value
+        :param value: date, field value
+        :return: str
+        """
+        return value.strftime('%Y-%m-%d') if value else None
+
+    @classmethod
+    def value_from_json(cls, value):
+        """
+        Converts value from json representation
+        :param value: str or date
+        :return: date
+        """
+        return cls.convert(value)
+
+    @classmethod
+    def value_to_search(cls, value):
+        """
+        Returns search representation of value
+        :param value: date, field value
+        :return: date
+        """
+        return value
+
+    @classmethod
+    def value_to_index(cls, value):
+        """
+        Returns representation of value for field index
+        :param value: date, field value
+        :return: datetime
+        """
+        if value is None:
+            return None
+        return datetime(value.year, value.month, value.day)
+
     def set(self, value):
         """
         Sets field value.
@@ -14,13 +105,7 @@ class Date(AbstractFieldType):
         :param value: str or date
         :return: shiftcontent.fields.text.Date
         """
-        format = 'YYYY-MM-DD'
-        if value is not None:
-            if type(value) is not date:
-                arr = arrow.get(str(value), format).to('UTC')
-                value = arr.date()
-
-        self.value = value
+        self.value = self.convert(value)
         return self
 
     def get(self):
@@ -35,7 +120,7 @@ class Date(AbstractFieldType):
         Returns db representation of value
         :return: str
         """
-        return self.value.strftime('%Y-%m-%d') if self.value else None
+        return self.value_to_db(self.value)
 
     def from_db(self, value):
         """
@@ -43,7 +128,7 @@ class Date(AbstractFieldType):
         :param value: str or date
         :return: shiftcontent.fields.text.Date
         """
-        self.set(value)
+        self.value = self.value_from_db(value)
         return self
 
     def to_json(self):
@@ -51,7 +136,7 @@ class Date(AbstractFieldType):
         Returns json representation of value
         :return: str
         """
-        return self.value.strftime('%Y-%m-%d') if self.value else None
+        return self.value_to_json(self.value)
 
     def from_json(self, value):
         """
@@ -59,7 +144,7 @@ class Date(AbstractFieldType):
         :param value: str or date
         :return: shiftcontent.fields.text.Date
         """
-        self.set(value)
+        self.value = self.value_from_json(value)
         return self
 
     def to_search(self):
@@ -67,7 +152,7 @@ class Date(AbstractFieldType):
         Returns search representation of value
         :return: date
         """
-        return self.value
+        return self.value_to_search(self.value)
 
     def search_mapping(self):
         """
@@ -78,4 +163,3 @@ class Date(AbstractFieldType):
             type='date'
         )
 
-
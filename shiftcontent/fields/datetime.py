@@ -1,10 +1,102 @@
 from .abstract import AbstractFieldType
+import re
 import arrow
-from datetime import datetime
+from dateutil.tz import tzutc
+from datetime import datetime, timezone
 
 
 class DateTime(AbstractFieldType):
 
+    # field index column type
+    index_type = 'date'
+
+    # canonical format that is parsed without arrow
+    pattern = re.compile(
+        r'([0-9]{4})-([0-9]{2})-([0-9]{2}) ([0-9]{2}):([0-9]{2}):([0-9]{2})'
+    )
+
+    @classmethod
+    def convert(cls, value):
+        """
+        Converts value to datetime.
+        Accepts a datetime string in a specific format and converts it to a
+        datetime object. Will assume the date is in UTC timezone. Strings in
+        exactly that format (the way values are stored) are parsed directly,
+        anything else is left to arrow.
+
+        :param value: mixed, field value
+        :return: datetime
+        """
+        if value is None or type(value) is datetime:
+            return value
+
+        value = str(value)
+        match = cls.pattern.fullmatch(value)
+        if match:
+            try:
+                return datetime(*map(int, match.groups()), tzinfo=tzutc())
+            except ValueError:
+                pass
+
+        format = 'YYYY-MM-DD HH:mm:ss'
+        return arrow.get(value, format).to('UTC').datetime
+
+    @classmethod
+    def value_to_db(cls, value):
+        """
+        Returns db representation of value
+        :param value: datetime, field value
+        :return: str
+        """
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+
+    @classmethod
+    def value_from_db(cls, value):
+        """
+        Converts value from db representation
+        :param value: str or datetime
+        :return: datetime
+        """
+        return cls.convert(value)
+
+    @classmethod
+    def value_to_json(cls, value):
+        """
+        Returns json representation of value
+        :param value: datetime, field value
+        :return: str
+        """
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+
+    @classmethod
+    def value_from_json(cls, value):
+        """
+        Converts value from json representation
+        :param value: str or datetime
+        :return: datetime
+        """
+        return cls.convert(value)
+
+    @classmethod
+    def value_to_search(cls, value):
+        """
+        Returns search representation of value
+        :param value: datetime, field value
+        :return: datetime
+        """
+        return value
+
+    @classmethod
+    def value_to_index(cls, value):
+        """
+        Returns representation of value for field index
+        :param value: datetime, field value
+        :return: datetime, naive utc
+        """
+        if value is not None and value.tzinfo:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
     def set(self, value):
         """
         Sets field value.
@@ -14,13 +106,7 @@ class DateTime(AbstractFieldType):
         :param value: mixed, field value
         :return: shiftcontent.fields.text.DateTime
         """
-        format = 'YYYY-MM-DD HH:mm:ss'
-        if value is not None:
-            if type(value) is not datetime:
-                arr = arrow.get(str(value), format).to('UTC')
-                value = arr.datetime
-
-        self.value = value
+        self.value = self.convert(value)
         return self
 
     def get(self):
@@ -35,7 +121,7 @@ class DateTime(AbstractFieldType):
         Returns db representation of value
         :return: str
         """
-        return self.value.strftime('%Y-%m-%d %H:%M:%S')
+        return self.value_to_db(self.value)
 
     def from_db(self, value):
         """
@@ -43,7 +129,7 @@ class DateTime(AbstractFieldType):
         :param value: str or date
         :return: shiftcontent.fields.text.DateTime
         """
-        self.set(value)
+        self.value = self.value_from_db(value)
         return self
 
     def to_json(self):
@@ -51,7 +137,7 @@ class DateTime(AbstractFieldType):
         Returns json representation of value
         :return: str
         """
-        return self.value.strftime('%Y-%m-%d %H:%M:%S')
+        return self.value_to_json(self.value)
 
     def from_json(self, value):
         """
@@ -59,7 +145,7 @@ class DateTime(AbstractFieldType):
         :param value: str or date
         :return: shiftcontent.fields.text.DateTime
         """
-        self.set(value)
+        self.value = self.value_from_json(value)
         return self
 
     def to_search(self):
@@ -67,7 +153,7 @@ class DateTime(AbstractFieldType):
         Returns search representation of value
         :return: datetime
         """
-        return self.value
+        return self.value_to_search(self.value)
 
     def search_mapping(self):
         """
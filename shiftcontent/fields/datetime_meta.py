@@ -5,28 +5,12 @@ from datetime import datetime
 
 class DateTimeMeta(DateTime):
 
-    def to_db(self):
+    @classmethod
+    def value_to_db(cls, value):
         """
         Returns db representation of value
-        :return: str
+        :param value: datetime, field value
+        :return: datetime
         """
-        return self.value
-
-    def from_db(self, value):
-        """
-        Populate field value from db representation
-        :param value: str or date
-        :return: shiftcontent.fields.text.DateTimeMetaField
-        """
-        self.set(value)
-        return self
-
-    def from_json(self, value):
-        """
-        Populate field value from json representation
-        :param value: str or date
-        :return: shiftcontent.fields.text.DateTimeMetaField
-        """
-        self.set(value)
-        return self
+        return value
 
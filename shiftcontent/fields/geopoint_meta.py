@@ -3,11 +3,12 @@ from .abstract import AbstractFieldType
 
 class GeopointMeta(AbstractFieldType):
 
-    def set(self, value):
+    @classmethod
+    def convert(cls, value):
         """
-        Sets field value
+        Converts value to geopoint
         :param value: dict, latitude and longitude
-        :return: shiftcontent.fields.text.GeopointMeta
+        :return: dict[float, float]
         """
         if value is not None:
             if type(value) is not dict:
@@ -19,7 +20,64 @@ class GeopointMeta(AbstractFieldType):
             value['lat'] = float(value['lat'])
             value['lon'] = float(value['lon'])
 
-        self.value = value
+        return value
+
+    @classmethod
+    def value_to_db(cls, value):
+        """
+        Returns db representation of value
+        :param value: dict[float, float], field value
+        :return: str
+        """
+        return '{},{}'.format(value['lat'], value['lon'])
+
+    @classmethod
+    def value_from_db(cls, value):
+        """
+        Converts value from db representation
+        :param value: str
+        :return: dict[float, float]
+        """
+        value = str(value).split(',')
+        return dict(
+            lat=float(value[0]),
+            lon=float(value[1]),
+        )
+
+    @classmethod
+    def value_to_json(cls, value):
+        """
+        Returns json representation of value
+        :param value: dict[float, float], field value
+        :return: dict[float, float]
+        """
+        return value
+
+    @classmethod
+    def value_from_json(cls, value):
+        """
+        Converts value from json representation
+        :param value: dict[float, float]
+        :return: dict[float, float]
+        """
+        return cls.convert(value)
+
+    @classmethod
+    def value_to_search(cls, value):
+        """
+        Returns search representation of value
+        :param value: dict[float, float], field value
+        :return: dict[float, float]
+        """
+        return value
+
+    def set(self, value):
+        """
+        Sets field value
+        :param value: dict, latitude and longitude
+        :return: shiftcontent.fields.text.GeopointMeta
+        """
+        self.value = self.convert(value)
         return self
 
     def get(self):
@@ -34,7 +92,7 @@ class GeopointMeta(AbstractFieldType):
         Returns db representation of value
         :return: int
         """
-        return '{},{}'.format(self.value['lat'], self.value['lon'])
+        return self.value_to_db(self.value)
 
     def from_db(self, value):
         """
@@ -42,12 +100,7 @@ class GeopointMeta(AbstractFieldType):
         :param value: str
         :return: shiftcontent.fields.text.GeopointMeta
         """
-        value = str(value).split(',')
-        self.value = dict(
-            lat=float(value[0]),
-            lon=float(value[1]),
-        )
-
+        self.value = self.value_from_db(value)
         return self
 
     def to_json(self):
@@ -55,7 +108,7 @@ class GeopointMeta(AbstractFieldType):
         Returns json representation of value
         :return: dict[float, float]
         """
-        return self.value
+        return self.value_to_json(self.value)
 
     def from_json(self, value):
         """
@@ -63,7 +116,7 @@ class GeopointMeta(AbstractFieldType):
         :param value: dict[float, float]
         :return: shiftcontent.fields.text.GeopointMeta
         """
-        self.set(value)
+        self.value = self.value_from_json(value)
         return self
 
     def to_search(self):
@@ -71,7 +124,7 @@ class GeopointMeta(AbstractFieldType):
         Returns search representation of value
         :return: int
         """
-        return self.value
+        return self.value_to_search(self.value)
 
     def search_mapping(self):
         """
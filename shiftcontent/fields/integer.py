@@ -3,16 +3,82 @@ from .abstract import AbstractFieldType
 
 class Integer(AbstractFieldType):
 
-    def set(self, value):
+    # field index column type
+    index_type = 'number'
+
+    @classmethod
+    def convert(cls, value):
         """
-        Sets field value
+        Converts value to integer
         :param value: mixed, field value
-        :return: shiftcontent.fields.text.Integer
+        :return: int
         """
         if value is not None:
             value = int(float(value))
 
-        self.value = value
+        return value
+
+    @classmethod
+    def value_to_db(cls, value):
+        """
+        Returns db representation of value
+        :param value: int, field value
+        :return: int
+        """
+        return value
+
+    @classmethod
+    def value_from_db(cls, value):
+        """
+        Converts value from db representation
+        :param value: str or int
+        :return: int
+        """
+        return cls.convert(value)
+
+    @classmethod
+    def value_to_json(cls, value):
+        """
+        Returns json representation of value
+        :param value: int, field value
+        :return: int
+        """
+        return value
+
+    @classmethod
+    def value_from_json(cls, value):
+        """
+        Converts value from json representation
+        :param value: str or int
+        :return: int
+        """
+        return cls.convert(value)
+
+    @classmethod
+    def value_to_search(cls, value):
+        """
+        Returns search representation of value
+        :param value: int, field value
+        :return: int
+        """
+        return value
+
+    @classmethod
+    def value_to_index(cls, value):
+        """
+        Returns representation of value for field index
+        :param value: int, field value
+        :return: int
+        """
+        return value
+
+    def set(self, value):
+        """
+        Sets field value
+        :param value: mixed, field value
+        :return: shiftcontent.fields.text.Integer
+        """
+        self.value = self.convert(value)
         return self
 
     def get(self):
@@ -27,15 +93,15 @@ class Integer(AbstractFieldType):
         Returns db representation of value
         :return: int
         """
-        return self.value
+        return self.value_to_db(self.value)
 
     def from_db(self, value):
         """
         Populate field value from db representation
-        :param value: str or date
+        :param value: str or int
         :return: shiftcontent.fields.text.Integer
         """
-        self.set(value)
+        self.value = self.value_from_db(value)
         return self
 
     def to_json(self):
@@ -43,15 +109,15 @@ class Integer(AbstractFieldType):
         Returns json representation of value
         :return: int
         """
-        return self.value
+        return self.value_to_json(self.value)
 
     def from_json(self, value):
         """
         Populate field value from json representation
-        :param value: str or date
+        :param value: str or int
         :return: shiftcontent.fields.text.Integer
         """
-        self.set(value)
+        self.value = self.value_from_json(value)
         return self
 
     def to_search(self):
@@ -59,7 +125,7 @@ class Integer(AbstractFieldType):
         Returns search representation of value
         :return: int
         """
-        return self.value
+        return self.value_to_search(self.value)
 
     def search_mapping(self):
         """
@@ -3,16 +3,84 @@ from .abstract import AbstractFieldType
 
 class Text(AbstractFieldType):
 
-    def set(self, value):
+    # field index column type
+    index_type = 'string'
+
+    @classmethod
+    def convert(cls, value):
         """
-        Sets field value
+        Converts value to string
         :param value: str, field value
-        :return: shiftcontent.fields.text.Text
+        :return: str
         """
         if value is not None:
             value = str(value)
 
-        self.value = value
+        return value
+
+    @classmethod
+    def value_to_db(cls, value):
+        """
+        Returns db representation of value
+        :param value: str, field value
+        :return: str
+        """
+        return value
+
+    @classmethod
+    def value_from_db(cls, value):
+        """
+        Converts value from db representation
+        :param value: str
+        :return: str
+        """
+        return cls.convert(value)
+
+    @classmethod
+    def value_to_json(cls, value):
+        """
+        Returns json representation of value
+        :param value: str, field value
+        :return: str
+        """
+        return value
+
+    @classmethod
+    def value_from_json(cls, value):
+        """
+        Converts value from json representation
+        :param value: str
+        :return: str
+        """
+        return cls.convert(value)
+
+    @classmethod
+    def value_to_search(cls, value):
+        """
+        Returns search representation of value
+        :param value: str, field value
+        :return: str
+        """
+        return value
+
+    @classmethod
+    def value_to_index(cls, value):
+        """
+        Returns representation of value for field index
+        :param value: str, field value
+        :return: str
+        """
+        if value is None:
+            return None
+        return str(value)[:256]
+
+    def set(self, value):
+        """
+        Sets field value
+        :param value: str, field value
+        :return: shiftcontent.fields.text.Text
+        """
+        self.value = self.convert(value)
         return self
 
     def get(self):
@@ -27,15 +95,15 @@ class Text(AbstractFieldType):
         Returns db representation of value
         :return: str
         """
-        return self.value
+        return self.value_to_db(self.value)
 
     def from_db(self, value):
         """
         Populate field value from db representation
-        :param value: str or date
+        :param value: str
         :return: shiftcontent.fields.text.Text
         """
-        self.set(value)
+        self.value = self.value_from_db(value)
         return self
 
     def to_json(self):
@@ -43,15 +111,15 @@ class Text(AbstractFieldType):
         Returns json representation of value
         :return: str
         """
-        return self.value
+        return self.value_to_json(self.value)
 
     def from_json(self, value):
         """
         Populate field value from json representation
-        :param value: str or date
+        :param value: str
         :return: shiftcontent.fields.text.Text
         """
-        self.set(value)
+        self.value = self.value_from_json(value)
         return self
 
     def to_search(self):
@@ -59,7 +127,7 @@ class Text(AbstractFieldType):
         Returns search representation of value
         :return: str
         """
-        return self.value
+        return self.value_to_search(self.value)
 
     def search_mapping(self):
         """
@@ -3,6 +3,7 @@ from .event_handlers import ContentItemDelete
 from .event_handlers import ContentItemUpdate
 from .event_handlers import ContentItemFieldUpdateField
 from .event_handlers import ContentItemSetParent
+from .event_handlers import ContentItemsImport
 
 """
 Note: we used to have multiple chained handlers per event, but then decided to
@@ -36,6 +37,11 @@ content_handlers = dict(
     # set content item parent
     CONTENT_ITEM_SET_PARENT=[
         ContentItemSetParent
+    ],
+
+    # import a batch of content items
+    CONTENT_ITEMS_IMPORT=[
+        ContentItemsImport
     ]
 )
 
@@ -5,6 +5,74 @@ import arrow
 from pprint import pprint as pp
 
 
+class ItemLayout:
+    """
+    Item layout
+    A precompiled table of field converters for a content type. Layouts are
+    built once per content type definition and shared between all the items
+    of that type, so that items only need to hold plain values instead of
+    instantiating a field type object for every field.
+    """
+
+    # compiled layouts by content type
+    _layouts = dict()
+
+    def __init__(
+        self,
+        converters,
+        custom_fields=(),
+        definition=None,
+        indexed_fields=()):
+        """
+        Create layout
+        :param converters: dict, field handle to field type class
+        :param custom_fields: tuple, custom field handles
+        :param definition: dict, content type definition
+        :param indexed_fields: tuple, handles of fields marked as indexed
+        """
+        self.converters = converters
+        self.custom_fields = custom_fields
+        self.definition = definition
+        self.indexed_fields = indexed_fields
+
+    @classmethod
+    def get(cls, metafields, field_types, content_type=None, definition=None):
+        """
+        Get layout
+        Returns compiled layout for content type or layout of just the
+        metafields if no content type given. Layouts get recompiled when
+        content type definition changes.
+
+        :param metafields: dict, metafield handles to field type names
+        :param field_types: dict, field type names to field type classes
+        :param content_type: str, content type handle
+        :param definition: dict, content type definition
+        :return: shiftcontent.item.ItemLayout
+        """
+        layout = cls._layouts.get(content_type)
+        if layout and layout.definition is definition:
+            return layout
+
+        converters = {h: field_types[t] for h, t in metafields.items()}
+        custom_fields = []
+        indexed_fields = []
+        if definition:
+            for field in definition['fields']:
+                converters[field['handle']] = field_types[field['type']]
+                custom_fields.append(field['handle'])
+                if field.get('indexed'):
+                    indexed_fields.append(field['handle'])
+
+        layout = cls(
+            converters,
+            tuple(custom_fields),
+            definition,
+            tuple(indexed_fields)
+        )
+        cls._layouts[content_type] = layout
+        return layout
+
+
 class Item:
     """
     Content item
@@ -21,7 +89,7 @@ class Item:
         'sort_order': 'integer',
         'author': 'text',
         'object_id': 'text',
-        # 'version',
+        'version': 'integer',
         # 'parent_version',
         # 'status',
         # 'lat',
@@ -34,17 +102,19 @@ class Item:
         # 'downvotes',
     }
 
-    # impossible to change after creation
+    # impossible to change after creation (version is only bumped by handlers)
     frozen_metafields = (
         'id',
         'object_id',
         'author',
         'type',
-        'created'
+        'created',
+        'version',
     )
 
-    # content type definition and field types mapping
+    # content type definition, layout and field types mapping
     _definition = None
+    _layout = None
     _field_types = None
 
     # meta fields + custom fields
@@ -59,20 +129,22 @@ class Item:
         """
 
         # init meta fields
-        self.fields = dict()
-        for field, field_type in self.metafields.items():
-            self.fields[field] = self.field_types[field_type]()
+        self.fields = dict.fromkeys(self.metafields)
 
         # populate from kwargs
         if kwargs:
             self.from_dict(kwargs, initial=True)
 
         # set sort order
-        if self.fields['sort_order'].get() is None:
+        if self.fields['sort_order'] is None:
             self.set_field('sort_order', 0)
 
+        # new items start at first version
+        if self.fields['version'] is None:
+            self.set_field('version', 1, initial=True)
+
         # set creation date
-        if not self.fields['created'].get():
+        if not self.fields['created']:
             self.set_field('created', arrow.utcnow().datetime, initial=True)
 
     @property
@@ -105,6 +177,29 @@ class Item:
             self._field_types = field_types
         return self._field_types
 
+    @property
+    def layout(self):
+        """
+        Layout
+        Returns compiled layout of item fields. Until content type is set
+        this will only contain metafields.
+        :return: shiftcontent.item.ItemLayout
+        """
+        if not self._layout:
+            self._layout = ItemLayout.get(self.metafields, self.field_types)
+        return self._layout
+
+    @property
+    def parent_id(self):
+        """
+        Parent id
+        Returns object id of item parent taken from item path
+        :return: str or None
+        """
+        if not self.path:
+            return None
+        return str(self.path).split('.')[-1]
+
     def __repr__(self):
         """ Returns printable representation of item """
         repr = '<ContentItem id=[{}] object_id=[{}]>'
@@ -118,7 +213,7 @@ class Item:
         :return:
         """
         if item in self.fields:
-            return self.fields[item].get()
+            return self.fields[item]
         return object.__getattribute__(self, item)
 
     def __setattr__(self, key, value):
@@ -137,15 +232,20 @@ class Item:
     def init_fields(self):
         """
         Initialize fields
-        Retrieves content type definition schema ant initializes the
+        Gets compiled layout for item content type and initializes the
         fields.
         :return: shiftcontent.item.Item
         """
-        for field in self.definition['fields']:
-            handle = field['handle']
-            field_type = field['type']
+        self._layout = ItemLayout.get(
+            self.metafields,
+            self.field_types,
+            self.type,
+            self.definition
+        )
+
+        for handle in self._layout.custom_fields:
             if handle not in self.fields:
-                self.fields[handle] = self.field_types[field_type]()
+                self.fields[handle] = None
         return self
 
     def set_field(
@@ -175,28 +275,25 @@ class Item:
         if field in self.frozen_metafields and not initial:
             return self
 
-        # get setter name
+        converter = self.layout.converters.get(field)
+        if not converter:
+            return self
+
+        # convert
         if from_db:
-            setter_name = 'from_db'
+            value = converter.value_from_db(value)
         elif from_json:
-            setter_name = 'from_json'
+            value = converter.value_from_json(value)
         else:
-            setter_name = 'set'
+            value = converter.convert(value)
+
+        self.fields[field] = value
 
-        # set type first and init custom fields
+        # init custom fields when setting type
         if field == 'type':
-            field_type = self.field_types[self.metafields['type']]()
-            self.fields['type'] = field_type
-            getattr(self.fields['type'], setter_name)(value)
+            self._definition = None
             self.init_fields()
-            return
 
-        if field not in self.fields.keys():
-            return
-
-        # set fields
-        setter = getattr(self.fields[field], setter_name)
-        setter(value)
         return self
 
     def is_updatable(self, field):
@@ -218,7 +315,7 @@ class Item:
         Returns dictionary representation of an item.
         :return: dict
         """
-        data = {p: v.get() for p, v in self.fields.items()}
+        data = dict(self.fields)
         return data
 
     def from_dict(self, data, initial=False):
@@ -254,11 +351,13 @@ class Item:
         """
         data = dict()
         fields = dict()
+        converters = self.layout.converters
         for field, value in self.fields.items():
+            value = converters[field].value_to_db(value)
             if field not in self.metafields:
-                fields[field] = value.to_db()
+                fields[field] = value
             else:
-                data[field] = value.to_db()
+                data[field] = value
 
         # jsonify custom fields
         data['fields'] = json.dumps(fields, ensure_ascii=False)
@@ -300,7 +399,10 @@ class Item:
         Returns representation sutable for putting to search index
         :return: dict
         """
-        data = {f: v.to_search() for f, v in self.fields.items()}
+        converters = self.layout.converters
+        data = {
+            f: converters[f].value_to_search(v) for f, v in self.fields.items()
+        }
         return data
 
     def to_json(self, as_string=True):
@@ -312,7 +414,10 @@ class Item:
         :param as_string: bool, strinify or return as dict
         :return: str | dict
         """
-        data = {f: v.to_json() for f, v in self.fields.items()}
+        converters = self.layout.converters
+        data = {
+            f: converters[f].value_to_json(v) for f, v in self.fields.items()
+        }
 
         # return dict to jsonify later?
         if not as_string:
@@ -324,14 +429,17 @@ class Item:
     def from_json(self, json_data):
         """
         From json
-        Populates itself from a json string
-        :param json_data: str, json string
+        Populates itself from a json string or an already decoded dict
+        :param json_data: str or dict, json string
         :return: shiftcontent.item.Item
         """
-        try:
-            data = json.loads(json_data, encoding='utf-8')
-        except json.JSONDecodeError:
-            raise x.ItemError('Failed to decode json')
+        if isinstance(json_data, dict):
+            data = {**json_data}
+        else:
+            try:
+                data = json.loads(json_data, encoding='utf-8')
+            except json.JSONDecodeError:
+                raise x.ItemError('Failed to decode json')
 
         # first, set type to initialize custom fields
         if 'type' in data:
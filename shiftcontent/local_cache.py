@@ -0,0 +1,145 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class LocalCache:
+    """
+    Local cache
+    A small in-process LRU cache with per-entry expiration. It is used as a
+    first tier in front of redis to skip network round-trips for hot items.
+    Bounded by the number of entries, least recently used entries get evicted
+    first.
+    """
+
+    def __init__(self, size=1000, ttl=60):
+        """
+        Create local cache
+        :param size: int, max number of entries to keep
+        :param ttl: int, default entry ttl in seconds
+        """
+        self.size = size
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """ Returns number of entries currently held """
+        return len(self._items)
+
+    def __contains__(self, key):
+        """ Checks if there is an unexpired entry for the key """
+        return self.get(key) is not None
+
+    def get(self, key):
+        """
+        Get
+        Returns cached value by key or None if missing or expired. Marks the
+        entry as recently used.
+        :param key: str, cache key
+        :return: mixed
+        """
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return
+
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._items[key]
+                return
+
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Set
+        Puts value to cache evicting least recently used entries if the
+        cache is full.
+        :param key: str, cache key
+        :param value: mixed, value to cache
+        :param ttl: int, optional custom ttl in seconds
+        :return: shiftcontent.local_cache.LocalCache
+        """
+        expires = time.monotonic() + (ttl or self.ttl)
+        with self._lock:
+            self._items[key] = (expires, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+        return self
+
+    def delete(self, key):
+        """
+        Delete
+        Removes entry from cache
+        :param key: str, cache key
+        :return: shiftcontent.local_cache.LocalCache
+        """
+        with self._lock:
+            self._items.pop(key, None)
+        return self
+
+    def delete_all(self):
+        """
+        Delete all
+        Removes all entries from cache
+        :return: shiftcontent.local_cache.LocalCache
+        """
+        with self._lock:
+            self._items.clear()
+        return self
+
+
+class RedisInvalidationChannel:
+    """
+    Redis invalidation channel
+    Broadcasts local cache invalidations to other processes over redis
+    pub/sub and listens to invalidations coming from other processes in a
+    background thread. Any object implementing publish(), subscribe() and
+    close() can be used in its place.
+    """
+
+    def __init__(self, redis, channel):
+        """
+        Create channel
+        :param redis: redis.StrictRedis, redis connection
+        :param channel: str, pub/sub channel name
+        """
+        self.redis = redis
+        self.channel = channel
+        self._thread = None
+
+    def publish(self, message):
+        """
+        Publish
+        Sends invalidation message to all subscribers
+        :param message: str, message
+        :return: None
+        """
+        self.redis.publish(self.channel, message)
+
+    def subscribe(self, callback):
+        """
+        Subscribe
+        Starts listening to the channel in a background thread and calls the
+        callback with every message received.
+        :param callback: callable, receives message string
+        :return: None
+        """
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        handler = lambda message: callback(message['data'])
+        pubsub.subscribe(**{self.channel: handler})
+        self._thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def close(self):
+        """
+        Close
+        Stops listening to the channel
+        :return: None
+        """
+        if self._thread:
+            self._thread.stop()
+            self._thread = None
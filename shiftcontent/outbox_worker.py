@@ -0,0 +1,185 @@
+import threading
+from shiftcontent import db
+from shiftcontent import cache_service
+from shiftcontent import search_service
+from shiftcontent.database import outbox
+from shiftcontent.item import Item
+from pprint import pprint as pp
+
+
+class OutboxWorker:
+    """
+    Outbox worker
+    Drains content outbox in batches putting changed items to cache and
+    search index. Multiple updates of the same item queued since the last
+    run are coalesced into one, and the item is read from the database at
+    processing time, so only its latest state gets indexed. Failed entries
+    are retried with exponential backoff until they run out of attempts.
+
+    Run it in a background thread with start(), in a separate process via
+    `./cli content outbox-worker`, or call drain() from your own scheduler
+    or asyncio executor.
+    """
+
+    def __init__(
+        self,
+        batch_size=500,
+        max_attempts=5,
+        retry_delay=10,
+        interval=1):
+        """
+        Create worker
+        :param batch_size: int, max number of entries to process at once
+        :param max_attempts: int, give up on entries after this many failures
+        :param retry_delay: int, base retry delay in seconds
+        :param interval: int, seconds to wait when outbox is empty
+        """
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.interval = interval
+        self._thread = None
+        self._stop = threading.Event()
+
+    def process_batch(self):
+        """
+        Process batch
+        Takes a batch of pending entries and applies them. Processed entries
+        are removed from outbox, failed ones are scheduled for retry.
+        :return: int, number of entries taken
+        """
+        with db.engine.begin() as conn:
+            rows = outbox.pending(conn, self.batch_size, self.max_attempts)
+            if not rows:
+                return 0
+
+            # coalesce by object id, last one wins
+            latest = dict()
+            for row in rows:
+                latest[row.object_id] = row
+
+            put_ids = [i for i, r in latest.items() if r.action == outbox.PUT]
+            items = self.load_items(conn, put_ids)
+            deletes = [
+                (row.type, object_id) for object_id, row in latest.items()
+                if object_id not in items
+            ]
+
+            errors = self.apply(list(items.values()), deletes)
+
+            # remove done and superseded entries, retry failed ones
+            failed = [latest[object_id] for object_id in errors]
+            failed_ids = set(row.id for row in failed)
+            outbox.remove(conn, [r.id for r in rows if r.id not in failed_ids])
+            outbox.retry(conn, failed, errors, self.retry_delay)
+
+        return len(rows)
+
+    def load_items(self, conn, object_ids):
+        """
+        Load items
+        Reads current state of items from the database
+        :param conn: sqlalchemy.engine.Connection
+        :param object_ids: list, item object ids
+        :return: dict, items by object id
+        """
+        if not object_ids:
+            return dict()
+
+        table = db.tables['items']
+        query = table.select().where(table.c.object_id.in_(object_ids))
+        items = [Item().from_db(row) for row in conn.execute(query)]
+        return {item.object_id: item for item in items}
+
+    def apply(self, items, deletes):
+        """
+        Apply
+        Puts items to cache and index and removes deleted ones
+        :param items: list, of shiftcontent.item.Item
+        :param deletes: list, of (content_type, object_id) tuples
+        :return: dict, error messages by object id for failed entries
+        """
+        object_ids = [item.object_id for item in items]
+        object_ids += [object_id for _, object_id in deletes]
+
+        errors = dict()
+        try:
+            cache_service.set_many(items)
+            cache_service.delete_many([object_id for _, object_id in deletes])
+
+            failures = search_service.put_many(items, raise_on_error=False)
+            failures += search_service.delete_many(
+                deletes,
+                raise_on_error=False
+            )
+        except Exception as exception:
+            return {object_id: str(exception) for object_id in object_ids}
+
+        for failure in failures:
+            errors[failure['object_id']] = str(failure['error'])
+
+        return errors
+
+    def drain(self):
+        """
+        Drain
+        Processes pending entries until there are none left
+        :return: int, number of entries processed
+        """
+        count = 0
+        while True:
+            processed = self.process_batch()
+            count += processed
+            if not processed:
+                return count
+
+    def stats(self):
+        """
+        Stats
+        Returns number of pending and failed entries and outbox lag in
+        seconds
+        :return: dict
+        """
+        with db.engine.begin() as conn:
+            return outbox.stats(conn, self.max_attempts)
+
+    def run(self):
+        """
+        Run
+        Keeps draining outbox until stopped. Backs off for an interval when
+        outbox is empty or unavailable.
+        :return: None
+        """
+        while not self._stop.is_set():
+            try:
+                processed = self.process_batch()
+            except Exception:
+                processed = 0
+            if not processed:
+                self._stop.wait(self.interval)
+
+    def start(self):
+        """
+        Start
+        Runs worker in a background thread
+        :return: shiftcontent.outbox_worker.OutboxWorker
+        """
+        if self._thread and self._thread.is_alive():
+            return self
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        Stop
+        Stops background thread after current batch is done
+        :param timeout: int, seconds to wait for the thread
+        :return: None
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
@@ -1,9 +1,14 @@
 from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import streaming_bulk, scan
+from contextlib import contextmanager, ExitStack
 from elasticsearch import exceptions as ex
 from pprint import pprint as pp
+from sqlalchemy import select, and_
+from itertools import islice
+import time
 
 from shiftcontent.item import Item
+from shiftcontent import db
 from shiftcontent import definition_service
 from shiftcontent.field_types import field_types
 from shiftcontent import exceptions as x
@@ -103,16 +108,20 @@ class SearchService:
         """
         Index info
         Returns information about te index and creates one if not found.
+        New indices are created under a versioned name and accessed through
+        an alias so that they can later be rebuilt without downtime.
 
         :param index_name: str, index name
         :return: dict
         """
         full_index_name = self.index_name(index_name)
-        if index_name not in self.indices.keys():
+        if full_index_name not in self.indices.keys():
             try:
                 index = self.es.indices.get(full_index_name)
             except ex.NotFoundError:
                 config = self.get_index_config(index_name)
+                config['index'] = self.versioned_index_name(index_name)
+                config['body']['aliases'] = {full_index_name: {}}
                 self.es.indices.create(**config)
                 index = self.es.indices.get(full_index_name)
 
@@ -120,6 +129,17 @@ class SearchService:
 
         return self.indices[full_index_name]
 
+    def versioned_index_name(self, index_name):
+        """
+        Versioned index name
+        Returns a unique name for a physical index behind index alias
+
+        :param index_name: str, index name
+        :return: str
+        """
+        version = int(time.time() * 1000)
+        return '{}.{}'.format(self.index_name(index_name), version)
+
     def disconnect(self):
         """
         Disconnect
@@ -141,7 +161,13 @@ class SearchService:
         :param index_name: str, index name
         :return: shiftcontent.search_service.SearchService
         """
-        self.es.indices.delete(self.index_name(index_name), ignore=404)
+        full_index_name = self.index_name(index_name)
+        self.es.indices.delete(
+            index='{0},{0}.*'.format(full_index_name),
+            ignore_unavailable=True,
+            ignore=404
+        )
+        self.indices.pop(full_index_name, None)
         return self
 
     def drop_all_indices(self):
@@ -222,6 +248,399 @@ class SearchService:
 
         return self
 
+    @contextmanager
+    def refresh_disabled(self, *index_names):
+        """
+        Refresh disabled
+        A context manager that switches off periodic refresh on given indices
+        for the duration of a large load and restores previous refresh
+        intervals afterwards. Documents become searchable after the indices
+        are refreshed on exit.
+
+        :param index_names: str, index names
+        :return: shiftcontent.search_service.SearchService
+        """
+        if not self.es or not index_names:
+            yield self
+            return
+
+        names = ','.join(self.index_name(name) for name in index_names)
+        setting = 'index.refresh_interval'
+
+        # settings are keyed by physical index names behind the aliases
+        current = self.es.indices.get_settings(index=names, name=setting)
+        self.es.indices.put_settings(
+            index=names,
+            body={'index': {'refresh_interval': '-1'}}
+        )
+
+        try:
+            yield self
+        finally:
+            for name, index in current.items():
+                settings = index.get('settings', {})
+                interval = settings.get('index', {}).get('refresh_interval')
+                self.es.indices.put_settings(
+                    index=name,
+                    body={'index': {'refresh_interval': interval}}
+                )
+            self.es.indices.refresh(index=names)
+
+    def put_many(
+        self,
+        items,
+        chunk_size=500,
+        max_retries=3,
+        disable_refresh=False,
+        raise_on_error=True,
+        index=None):
+        """
+        Put many items to index
+        Indexes items with bulk requests sent in chunks. Chunks rejected by
+        elasticsearch because of back pressure (429) are retried with an
+        exponential backoff. Documents that failed to index are collected
+        and either raised or returned.
+
+        :param items: list, of shiftcontent.item.Item
+        :param chunk_size: int, number of documents per bulk request
+        :param max_retries: int, retries for rejected documents
+        :param disable_refresh: bool, switch off refresh during the load
+        :param raise_on_error: bool, raise if any documents failed
+        :param index: str, optional physical index to put all items to
+        :return: list, failed documents
+        """
+        items = list(items)
+        actions = []
+        for item in items:
+            if not isinstance(item, Item):
+                err = 'Item must be of type shiftcontent.item.Item to be ' \
+                      'indexed. Got {} instead'
+                raise x.SearchError(err.format(type(item)))
+
+            if not item.id:
+                raise x.SearchError('Item must be saved first to be indexed')
+
+            if not item.object_id:
+                raise x.SearchError('Item must have object_id to be indexed')
+
+            actions.append(dict(
+                _index=index or self.index_name(item.type),
+                _type=self.doc_type,
+                _id=item.object_id,
+                _source=item.to_search()
+            ))
+
+        if not self.es or not actions:
+            return []
+
+        # create indices if required
+        content_types = sorted(set(item.type for item in items))
+        for content_type in content_types if not index else ():
+            if self.index_name(content_type) not in self.indices:
+                self.index_info(content_type)
+
+        # put to index
+        with ExitStack() as stack:
+            if disable_refresh and not index:
+                stack.enter_context(self.refresh_disabled(*content_types))
+
+            failures = self._bulk(actions, chunk_size, max_retries)
+
+        if failures and raise_on_error:
+            err = 'Failed to index {} of {} documents'
+            raise x.BulkIndexError(
+                err.format(len(failures), len(actions)),
+                failures=failures
+            )
+
+        return failures
+
+    def update_many(
+        self,
+        updates,
+        chunk_size=500,
+        max_retries=3,
+        raise_on_error=True):
+        """
+        Update many
+        Partially updates indexed documents with bulk requests. Documents
+        that are not in the index are skipped.
+
+        :param updates: list, of (content_type, object_id, fields) tuples
+        :param chunk_size: int, number of documents per bulk request
+        :param max_retries: int, retries for rejected documents
+        :param raise_on_error: bool, raise if any documents failed
+        :return: list, failed documents
+        """
+        actions = []
+        for content_type, object_id, fields in updates:
+            actions.append(dict(
+                _op_type='update',
+                _index=self.index_name(content_type),
+                _type=self.doc_type,
+                _id=object_id,
+                doc=fields
+            ))
+
+        if not self.es or not actions:
+            return []
+
+        failures = self._bulk(actions, chunk_size, max_retries)
+        failures = [f for f in failures if f['status'] != 404]
+        if failures and raise_on_error:
+            err = 'Failed to update {} of {} documents'
+            raise x.BulkIndexError(
+                err.format(len(failures), len(actions)),
+                failures=failures
+            )
+
+        return failures
+
+    def delete_many(
+        self,
+        entries,
+        chunk_size=500,
+        max_retries=3,
+        raise_on_error=True,
+        index=None):
+        """
+        Delete many
+        Removes documents from index with bulk requests. Documents that are
+        not in the index are skipped.
+
+        :param entries: list, of (content_type, object_id) tuples
+        :param chunk_size: int, number of documents per bulk request
+        :param max_retries: int, retries for rejected documents
+        :param raise_on_error: bool, raise if any documents failed
+        :param index: str, optional physical index to delete documents from
+        :return: list, failed documents
+        """
+        actions = []
+        for content_type, object_id in entries:
+            actions.append(dict(
+                _op_type='delete',
+                _index=index or self.index_name(content_type),
+                _type=self.doc_type,
+                _id=object_id,
+            ))
+
+        if not self.es or not actions:
+            return []
+
+        failures = self._bulk(actions, chunk_size, max_retries)
+        failures = [f for f in failures if f['status'] != 404]
+        if failures and raise_on_error:
+            err = 'Failed to delete {} of {} documents'
+            raise x.BulkIndexError(
+                err.format(len(failures), len(actions)),
+                failures=failures
+            )
+
+        return failures
+
+    def _bulk(self, actions, chunk_size=500, max_retries=3):
+        """
+        Bulk
+        Sends actions to elasticsearch in chunks and collects failures
+        :param actions: list, bulk actions
+        :param chunk_size: int, number of actions per bulk request
+        :param max_retries: int, retries for rejected documents
+        :return: list, failed documents
+        """
+        failures = []
+        results = streaming_bulk(
+            self.es,
+            actions,
+            chunk_size=chunk_size,
+            max_retries=max_retries,
+            raise_on_error=False,
+            yield_ok=False
+        )
+
+        for ok, result in results:
+            if ok:
+                continue
+            _, info = result.popitem()
+            failures.append(dict(
+                object_id=info.get('_id'),
+                index=info.get('_index'),
+                status=info.get('status'),
+                error=info.get('error')
+            ))
+
+        return failures
+
+    def rebuild_index(self, content_type, batch_size=1000):
+        """
+        Rebuild index
+        Creates a fresh index for content type from current definition and
+        streams all items of that type from the database into it with bulk
+        requests. Once loaded, index alias is atomically switched to the new
+        index and old indices are dropped. Readers keep using the old index
+        until the switch happens.
+
+        Writers keep going to the old index during the load, so items that
+        were created, updated or deleted meanwhile are caught up by their
+        versions before the switch and once more right after it. Writes do
+        not have to be paused for the rebuild.
+
+        If the type is still indexed into a legacy index without an alias,
+        that index has to be dropped before the alias can be created.
+
+        :param content_type: str, content type to rebuild index for
+        :param batch_size: int, number of rows to fetch and index at once
+        :return: int, number of indexed items
+        """
+        if not self.es:
+            return 0
+
+        alias = self.index_name(content_type)
+        new_index = self.versioned_index_name(content_type)
+
+        # create new index without refresh for the duration of the load
+        config = self.get_index_config(content_type)
+        config['index'] = new_index
+        config['body']['settings']['refresh_interval'] = '-1'
+        self.es.indices.create(**config)
+
+        # stream items from database
+        indexed = 0
+        items = db.tables['items']
+        query = items.select()\
+            .where(items.c.type == content_type)\
+            .order_by(items.c.id)
+
+        try:
+            with db.engine.connect() as conn:
+                conn = conn.execution_options(stream_results=True)
+                result = conn.execute(query)
+                while True:
+                    rows = result.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    batch = [Item().from_db(row) for row in rows]
+                    self.put_many(batch, chunk_size=batch_size, index=new_index)
+                    indexed += len(batch)
+
+            # catch up with writes made during the load
+            indexed += self.catch_up(content_type, new_index, batch_size)
+        except Exception:
+            self.es.indices.delete(new_index, ignore=404)
+            raise
+
+        # restore refresh
+        self.es.indices.put_settings(
+            index=new_index,
+            body={'index': {'refresh_interval': None}}
+        )
+        self.es.indices.refresh(index=new_index)
+
+        # find old indices
+        old_indices = list(self.es.indices.get_alias(name=alias, ignore=404))
+        old_indices = [i for i in old_indices if i not in ('error', 'status')]
+        if not old_indices and self.es.indices.exists(alias):
+            self.es.indices.delete(alias)
+
+        # swap alias
+        actions = [dict(remove=dict(index=i, alias=alias)) for i in old_indices]
+        actions.append(dict(add=dict(index=new_index, alias=alias)))
+        self.es.indices.update_aliases(body=dict(actions=actions))
+
+        # catch up with writes that went to old index before the switch
+        indexed += self.catch_up(content_type, new_index, batch_size)
+        self.es.indices.refresh(index=new_index)
+
+        # drop old indices
+        for old_index in old_indices:
+            self.es.indices.delete(old_index, ignore=404)
+
+        self.indices.pop(alias, None)
+        return indexed
+
+    def catch_up(self, content_type, index, batch_size=1000):
+        """
+        Catch up
+        Brings a physical index up to date with the database. Walks items of
+        content type in batches and compares their versions with versions of
+        indexed documents, putting new and changed items to the index again.
+        Then walks indexed documents in batches and removes the ones whose
+        items no longer exist. Only holds one batch in memory at a time.
+
+        :param content_type: str, content type
+        :param index: str, physical index name
+        :param batch_size: int, number of items to compare at once
+        :return: int, number of items added minus number of items removed
+        """
+        items = db.tables['items']
+        columns = [items.c.id, items.c.object_id, items.c.version]
+        added = 0
+        last_id = 0
+        while True:
+            where = and_(items.c.type == content_type, items.c.id > last_id)
+            query = select(columns)\
+                .where(where)\
+                .order_by(items.c.id)\
+                .limit(batch_size)
+
+            with db.engine.connect() as conn:
+                rows = conn.execute(query).fetchall()
+                if not rows:
+                    break
+
+                docs = self.es.mget(
+                    index=index,
+                    doc_type=self.doc_type,
+                    body=dict(ids=[row.object_id for row in rows]),
+                    _source=['version']
+                )['docs']
+                indexed = {
+                    doc['_id']: doc['_source'].get('version')
+                    for doc in docs if doc.get('found')
+                }
+                changed = [
+                    row.id for row in rows
+                    if indexed.get(row.object_id) != row.version
+                ]
+                added += len(set(r.object_id for r in rows) - set(indexed))
+                if changed:
+                    query = items.select().where(items.c.id.in_(changed))
+                    batch = [Item().from_db(r) for r in conn.execute(query)]
+                    self.put_many(batch, chunk_size=batch_size, index=index)
+
+            last_id = rows[-1].id
+
+        # remove documents of deleted items
+        self.es.indices.refresh(index=index)
+        docs = scan(
+            self.es,
+            index=index,
+            query=dict(_source=False),
+            size=batch_size
+        )
+        removed = 0
+        while True:
+            object_ids = [doc['_id'] for doc in islice(docs, batch_size)]
+            if not object_ids:
+                break
+
+            where = and_(
+                items.c.type == content_type,
+                items.c.object_id.in_(object_ids)
+            )
+            with db.engine.connect() as conn:
+                query = select([items.c.object_id]).where(where)
+                existing = set(row.object_id for row in conn.execute(query))
+
+            deleted = [i for i in object_ids if i not in existing]
+            self.delete_many(
+                [(content_type, object_id) for object_id in deleted],
+                chunk_size=batch_size,
+                index=index
+            )
+            removed += len(deleted)
+
+        return added - removed
+
     def get(self, index_name, object_id):
         """
         Get single item from index by its object id
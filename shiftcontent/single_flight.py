@@ -0,0 +1,62 @@
+import threading
+
+
+class SingleFlight:
+    """
+    Single flight
+    Coalesces concurrent calls with the same key within the process: while
+    a call is in flight, other callers asking for the same key wait for it
+    to finish and share its result (or exception) instead of doing the same
+    work again. Used to stop hot cache misses from stampeding the database.
+    """
+
+    def __init__(self):
+        """ Create single flight """
+        self._calls = dict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """ Returns number of calls currently in flight """
+        return len(self._calls)
+
+    def __contains__(self, key):
+        """ Checks if a call with the key is in flight """
+        return key in self._calls
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Do
+        Runs function unless a call with the same key is already in flight,
+        in which case waits for that call to finish. Returns a tuple of the
+        result and a flag telling whether the result is shared with another
+        caller, in which case it should not be mutated.
+        :param key: str, call key
+        :param func: callable, function to run
+        :param args: positional arguments for the function
+        :param kwargs: keyword arguments for the function
+        :return: tuple, (result, shared)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = dict(done=threading.Event(), result=None, error=None)
+                self._calls[key] = call
+
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result'], True
+
+        try:
+            call['result'] = func(*args, **kwargs)
+        except Exception as exception:
+            call['error'] = exception
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['done'].set()
+
+        return call['result'], False
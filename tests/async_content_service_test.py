@@ -0,0 +1,98 @@
+from tests.base import BaseTestCase
+from nose.plugins.attrib import attr
+
+import asyncio
+import time
+from shiftcontent.async_content_service import AsyncContentService
+from shiftcontent.content_service import ContentService
+from shiftcontent import cache_service
+
+
+class SlowService:
+    """ Content service that takes a while to respond """
+    def get_item(self, object_id):
+        time.sleep(0.5)
+        return object_id
+
+
+@attr('async', 'service')
+class AsyncContentServiceTest(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache_service.init()
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        super().tearDown()
+
+    def run_async(self, coroutine):
+        """ Run coroutine to completion """
+        return self.loop.run_until_complete(coroutine)
+
+    def test_instantiating_service(self):
+        """ Instantiating async content service """
+        service = AsyncContentService()
+        self.assertIsInstance(service, AsyncContentService)
+
+    def test_delegates_to_global_content_service_by_default(self):
+        """ Async service delegates to global content service by default """
+        from shiftcontent import content_service
+        service = AsyncContentService()
+        self.assertIs(content_service, service.service)
+
+    def test_executor_is_bounded(self):
+        """ Async service runs calls in a bounded pool """
+        service = AsyncContentService(max_workers=3)
+        self.assertEquals(3, service.executor._max_workers)
+        service.shutdown()
+        self.assertIsNone(service._executor)
+
+    def test_get_item(self):
+        """ Getting item asynchronously """
+        item = self.insert_item()
+        service = AsyncContentService(ContentService())
+        result = self.run_async(service.get_item(item.object_id))
+        service.shutdown()
+        self.assertEquals(item.object_id, result.object_id)
+        self.assertEquals(item.body, result.body)
+
+    def test_get_items_concurrently(self):
+        """ Getting items concurrently """
+        items = [self.insert_item(body='Body {}'.format(i)) for i in range(5)]
+        service = AsyncContentService(ContentService(), max_workers=2)
+
+        async def get_all():
+            calls = [service.get_item(item.object_id) for item in items]
+            return await asyncio.gather(*calls)
+
+        results = self.run_async(get_all())
+        service.shutdown()
+        self.assertEquals(
+            [item.object_id for item in items],
+            [result.object_id for result in results]
+        )
+
+    def test_get_items_in_batch(self):
+        """ Getting a batch of items asynchronously """
+        items = [self.insert_item(body='Body {}'.format(i)) for i in range(3)]
+        object_ids = [item.object_id for item in items]
+        service = AsyncContentService(ContentService())
+        results = self.run_async(service.get_items(object_ids))
+        service.shutdown()
+        self.assertEquals(object_ids, [item.object_id for item in results])
+
+    def test_call_times_out(self):
+        """ Slow calls raise timeout error """
+        service = AsyncContentService(SlowService(), timeout=0.05)
+        with self.assertRaises(asyncio.TimeoutError):
+            self.run_async(service.get_item('123'))
+        service.shutdown()
+
+    def test_per_call_timeout_overrides_default(self):
+        """ Per call timeout overrides default timeout """
+        service = AsyncContentService(SlowService(), timeout=0.05)
+        result = self.run_async(service.get_item('123', timeout=2))
+        service.shutdown()
+        self.assertEquals('123', result)
@@ -79,6 +79,32 @@ class BaseTestCase(unittest.TestCase):
         cwd = os.getcwd()
         return os.path.join(cwd, 'var', 'data', 'tests', 'known_schemas')
 
+    def insert_item(self, content_type='plain_text', **fields):
+        """
+        Insert item
+        Puts an item directly to the database, bypassing events. Plain text
+        items get a body unless given.
+        :param content_type: str, content type
+        :param fields: item fields
+        :return: shiftcontent.item.Item
+        """
+        from uuid import uuid1
+        from shiftcontent.item import Item
+        if content_type == 'plain_text':
+            fields.setdefault('body', 'Some body')
+
+        item = Item(
+            type=content_type,
+            author=fields.pop('author', 123),
+            object_id=str(uuid1()),
+            **fields
+        )
+        with self.db.engine.begin() as conn:
+            items = self.db.tables['items']
+            result = conn.execute(items.insert(), **item.to_db(False))
+            item.set_field('id', result.inserted_primary_key[0], True)
+        return item
+
     def create_db(self):
         """
         Create db
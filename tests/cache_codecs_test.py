@@ -0,0 +1,67 @@
+from tests.base import BaseTestCase
+from nose.plugins.attrib import attr
+
+from unittest import mock
+from shiftcontent import cache_codecs
+from shiftcontent.cache_codecs import JsonCodec, CompactCodec
+from shiftcontent import exceptions as x
+
+
+@attr('cache', 'codecs')
+class CacheCodecsTest(BaseTestCase):
+
+    data = dict(
+        type='plain_text',
+        object_id='123',
+        body='Ünicode body ' * 200
+    )
+
+    def test_json_codec_roundtrip(self):
+        """ Json codec encodes and decodes item data """
+        codec = JsonCodec()
+        encoded = codec.dumps(self.data)
+        self.assertIsInstance(encoded, str)
+        self.assertEquals(self.data, codec.loads(encoded))
+        self.assertEquals(self.data, codec.loads(encoded.encode('utf-8')))
+
+    def test_json_codec_returns_none_for_bad_data(self):
+        """ Json codec returns none for data it can't decode """
+        self.assertIsNone(JsonCodec().loads(b'\x01\x00garbage'))
+
+    def test_compact_codec_roundtrip(self):
+        """ Compact codec encodes and decodes item data """
+        codec = CompactCodec(compress_over=None)
+        encoded = codec.dumps(self.data)
+        self.assertIsInstance(encoded, bytes)
+        self.assertEquals(bytes((CompactCodec.VERSION, 0)), encoded[:2])
+        self.assertEquals(self.data, codec.loads(encoded))
+
+    def test_compact_codec_compresses_large_data(self):
+        """ Compact codec compresses data above threshold """
+        small = dict(type='plain_text', body='small')
+        codec = CompactCodec(compress_over=100)
+        self.assertEquals(0, codec.dumps(small)[1])
+
+        encoded = codec.dumps(self.data)
+        self.assertEquals(CompactCodec.COMPRESSED, encoded[1])
+        self.assertLess(len(encoded), len(JsonCodec().dumps(self.data)) / 5)
+        self.assertEquals(self.data, codec.loads(encoded))
+
+    def test_compact_codec_reads_json_format(self):
+        """ Compact codec decodes data cached in json format """
+        encoded = JsonCodec().dumps(self.data)
+        codec = CompactCodec()
+        self.assertEquals(self.data, codec.loads(encoded))
+        self.assertEquals(self.data, codec.loads(encoded.encode('utf-8')))
+
+    def test_compact_codec_returns_none_for_unknown_format(self):
+        """ Compact codec treats data of unknown format as a miss """
+        codec = CompactCodec()
+        self.assertIsNone(codec.loads(b'\x09\x00{}'))
+        self.assertIsNone(codec.loads(b'\x01\x01not compressed'))
+
+    def test_raise_when_msgpack_requested_but_not_installed(self):
+        """ Compact codec requires msgpack to be installed to use it """
+        with mock.patch.object(cache_codecs, 'msgpack', None):
+            with self.assertRaises(x.ConfigurationException):
+                CompactCodec(use_msgpack=True)
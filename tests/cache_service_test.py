@@ -1,7 +1,27 @@
 from tests.base import BaseTestCase
 from nose.plugins.attrib import attr
+import time
 
 from shiftcontent.cache_service import CacheService
+from shiftcontent.item import Item
+from shiftcontent.local_cache import LocalCache
+from shiftcontent.cache_codecs import CompactCodec
+
+
+class FakeChannel:
+    """ In-process invalidation channel shared between services """
+    def __init__(self):
+        self.subscribers = []
+
+    def publish(self, message):
+        for callback in self.subscribers:
+            callback(message)
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def close(self):
+        self.subscribers = []
 
 
 @attr('cache', 'service')
@@ -75,4 +95,336 @@ class CacheServiceTest(BaseTestCase):
         service.disconnect()
         self.assertIsNone(service.delete_all())
 
+    def test_set_and_get_many_items(self):
+        """ Putting and getting multiple items in a single round-trip """
+        service = CacheService()
+        service.init()
+        items = [
+            Item(type='plain_text', object_id='one', body='first'),
+            Item(type='plain_text', object_id='two', body='second'),
+        ]
+
+        service.set_many(items)
+        found = service.get_many(['one', 'two', 'nonexistent'])
+        self.assertEquals(2, len(found))
+        self.assertEquals('first', found['one'].body)
+        self.assertEquals('second', found['two'].body)
+        self.assertNotIn('nonexistent', found)
+
+        service.delete_all()
+
+    def test_get_item_with_ttl(self):
+        """ Getting item along with its remaining ttl """
+        service = CacheService()
+        service.init()
+        service.set(Item(type='plain_text', object_id='one', body='first'))
+        item, ttl = service.get_with_ttl('one')
+        self.assertEquals('first', item.body)
+        self.assertTrue(0 < ttl <= service.cache.ttl)
+
+        missing, ttl = service.get_with_ttl('nonexistent')
+        self.assertIsNone(missing)
+        self.assertIsNone(ttl)
+        service.delete_all()
+
+    def test_early_refresh_is_disabled_by_default(self):
+        """ Items are not refreshed ahead of expiry unless enabled """
+        service = CacheService()
+        service.init()
+        self.assertFalse(service.should_refresh(0.001))
+
+    def test_early_refresh_depends_on_remaining_ttl(self):
+        """ Items closer to expiry are more likely to be refreshed """
+        service = CacheService()
+        service.init(early_refresh=10)
+        self.assertTrue(service.should_refresh(0))
+        self.assertFalse(service.should_refresh(None))
+        near = sum(service.should_refresh(1) for _ in range(1000))
+        far = sum(service.should_refresh(30) for _ in range(1000))
+        self.assertGreater(near, far)
+
+    def test_lock_and_unlock_item(self):
+        """ Only one process can hold a lock on loading an item """
+        service = CacheService()
+        service.init(lock_timeout=1)
+        token = service.lock('one')
+        self.assertIsNotNone(token)
+        self.assertIsNone(service.lock('one'))
+
+        service.unlock('one', 'wrong-token')
+        self.assertIsNone(service.lock('one'))
+
+        service.unlock('one', token)
+        token = service.lock('one')
+        self.assertIsNotNone(token)
+        service.unlock('one', token)
+
+    def test_skip_locking_unless_enabled(self):
+        """ Locks are not used unless lock timeout is set """
+        service = CacheService()
+        service.init()
+        self.assertIsNone(service.lock('one'))
+
+    def test_wait_for_item_locked_by_another_process(self):
+        """ Waiting for item being loaded by another process """
+        service = CacheService()
+        service.init(lock_timeout=1)
+        token = service.lock('one')
+        self.assertIsNone(service.wait('one', interval=0.01))
+
+        service.set(Item(type='plain_text', object_id='one', body='first'))
+        self.assertEquals('first', service.wait('one', interval=0.01).body)
+        service.unlock('one', token)
+        service.delete_all()
+
+    def test_set_get_and_delete_missing_items(self):
+        """ Putting and removing tombstones of missing items """
+        service = CacheService()
+        service.init(missing_ttl=60)
+        service.set_missing('one', 'two')
+        self.assertTrue(service.is_missing('one'))
+        self.assertEquals({'one'}, service.get_missing(['one', 'three']))
+
+        service.delete_missing('one')
+        self.assertFalse(service.is_missing('one'))
+        self.assertTrue(service.is_missing('two'))
+        service.delete_all()
+
+    def test_skip_tombstones_unless_enabled(self):
+        """ Tombstones are only used if missing ttl is set """
+        service = CacheService()
+        service.init()
+        service.set_missing('one')
+        self.assertFalse(service.is_missing('one'))
+
+    def test_delete_many_items(self):
+        """ Removing multiple items in a single round-trip """
+        service = CacheService()
+        service.init()
+        service.set_many([
+            Item(type='plain_text', object_id='one', body='first'),
+            Item(type='plain_text', object_id='two', body='second'),
+            Item(type='plain_text', object_id='three', body='third'),
+        ])
+
+        service.delete_many(['one', 'two'])
+        self.assertEquals(['three'], list(service.get_many(
+            ['one', 'two', 'three']
+        ).keys()))
+        service.delete_all()
+
+    def test_delete_items_of_type(self):
+        """ Removing all items of a content type """
+        service = CacheService()
+        service.init()
+        service.set_many([
+            Item(type='plain_text', object_id='one', body='first'),
+            Item(type='markdown', object_id='two', body='second'),
+        ])
+        service.set(Item(type='plain_text', object_id='three', body='third'))
+
+        self.assertEquals(2, service.delete_type('plain_text'))
+        self.assertIsNone(service.get('one'))
+        self.assertIsNone(service.get('three'))
+        self.assertIsNotNone(service.get('two'))
+        service.delete_all()
+
+    def test_delete_subtree(self):
+        """ Removing item with all its descendants """
+        service = CacheService()
+        service.init()
+        service.set_many([
+            Item(type='plain_text', object_id='root', body='root'),
+            Item(type='plain_text', object_id='one', path='root'),
+            Item(type='plain_text', object_id='two', path='root.one'),
+            Item(type='plain_text', object_id='other', body='other'),
+        ])
+
+        self.assertEquals(2, service.delete_subtree('root'))
+        found = service.get_many(['root', 'one', 'two', 'other'])
+        self.assertEquals(['other'], list(found.keys()))
+        service.delete_all()
+
+    def test_bulk_invalidations_are_broadcast_in_one_message(self):
+        """ Invalidating several items sends a single message """
+        channel = FakeChannel()
+        messages = []
+        channel.subscribe(messages.append)
+        service1 = CacheService()
+        service1.init(local_cache_size=100, invalidation_channel=channel)
+        service2 = CacheService()
+        service2.init(local_cache_size=100, invalidation_channel=channel)
+
+        service1.set_many([
+            Item(type='plain_text', object_id='one', body='first'),
+            Item(type='plain_text', object_id='two', body='second'),
+        ])
+        service2.get_many(['one', 'two'])
+        self.assertEquals(2, len(service2.local_cache))
+
+        del messages[:]
+        service1.delete_many(['one', 'two'])
+        self.assertEquals(1, len(messages))
+        self.assertEquals(0, len(service2.local_cache))
+
+        service1.delete_all()
+        service1.disconnect()
+        service2.disconnect()
+
+    def test_set_and_get_items_with_compact_codec(self):
+        """ Items can be cached in compact format """
+        service = CacheService()
+        service.init(codec=CompactCodec(compress_over=10))
+        item = Item(type='plain_text', object_id='one', body='Ünicode ' * 50)
+        service.set(item)
+        self.assertEquals(item.body, service.get('one').body)
+        self.assertEquals(item.body, service.get_many(['one'])['one'].body)
+        self.assertEquals(item.body, service.get_with_ttl('one')[0].body)
+
+        # raw data is compressed
+        key = service.cache.get_full_item_key('one')
+        raw = service.data_redis.hget(key, 'data')
+        self.assertLess(len(raw), len(item.to_json()))
+        service.delete_all()
+
+    def test_undecodable_items_are_cache_misses(self):
+        """ Items cached in unknown format are treated as misses """
+        service = CacheService()
+        service.init(codec=CompactCodec())
+        key = service.cache.get_full_item_key('one')
+        service.data_redis.hset(key, 'data', b'\x09garbage')
+        self.assertIsNone(service.get('one'))
+        self.assertEquals(dict(), service.get_many(['one']))
+        service.delete_all()
+
+    def test_return_empty_dict_when_getting_many_if_no_redis(self):
+        """ Cache service returns empty dict for many items if no Redis"""
+        service = CacheService()
+        service.disconnect()
+        self.assertEquals(dict(), service.get_many(['something']))
+
+    def test_set_get_and_delete_children(self):
+        """ Caching lists of item child ids """
+        service = CacheService()
+        service.init()
+        self.assertIsNone(service.get_children('parent'))
+
+        service.set_children('parent', ['one', 'two'])
+        service.set_children('empty', [])
+        self.assertEquals(['one', 'two'], service.get_children('parent'))
+        self.assertEquals([], service.get_children('empty'))
+
+        service.delete_children('parent', 'empty', None)
+        self.assertIsNone(service.get_children('parent'))
+        self.assertIsNone(service.get_children('empty'))
+
+        service.delete_all()
+
+    def test_init_local_cache(self):
+        """ Initializing optional in-process cache """
+        service = CacheService()
+        service.init()
+        self.assertIsNone(service.local_cache)
+
+        service.init(local_cache_size=100, local_cache_ttl=30)
+        self.assertIsInstance(service.local_cache, LocalCache)
+        self.assertEquals(100, service.local_cache.size)
+        self.assertEquals(30, service.local_cache.ttl)
+
+    def test_getting_item_puts_it_to_local_cache(self):
+        """ Getting item from redis puts it to local cache """
+        service = CacheService()
+        service.init(local_cache_size=100, invalidation_channel=FakeChannel())
+        item = Item(type='plain_text', object_id='one', body='first')
+        service.set(item)
+        self.assertNotIn('one', service.local_cache)
+
+        service.get('one')
+        self.assertIn('one', service.local_cache)
+
+        # served from local cache now
+        service.cache.delete('one')
+        self.assertEquals('first', service.get('one').body)
+
+        service.delete_all()
+        service.disconnect()
+
+    def test_local_cache_returns_fresh_item_instances(self):
+        """ Items from local cache can be modified without side effects """
+        service = CacheService()
+        service.init(local_cache_size=100, invalidation_channel=FakeChannel())
+        service.set(Item(type='plain_text', object_id='one', body='first'))
+
+        item = service.get('one')
+        item.body = 'modified'
+        self.assertEquals('first', service.get('one').body)
+
+        service.delete_all()
+        service.disconnect()
+
+    def test_updating_or_deleting_item_invalidates_local_cache(self):
+        """ Setting or deleting item drops it from local cache """
+        service = CacheService()
+        service.init(local_cache_size=100, invalidation_channel=FakeChannel())
+        item = Item(type='plain_text', object_id='one', body='first')
+        service.set(item)
+        service.get('one')
+
+        item.body = 'updated'
+        service.set(item)
+        self.assertNotIn('one', service.local_cache)
+        self.assertEquals('updated', service.get('one').body)
+
+        service.delete('one')
+        self.assertNotIn('one', service.local_cache)
+        self.assertIsNone(service.get('one'))
+
+        service.delete_all()
+        service.disconnect()
+
+    def test_invalidations_are_broadcast_to_other_processes(self):
+        """ Local cache invalidations are broadcast over channel """
+        channel = FakeChannel()
+        service1 = CacheService()
+        service1.init(local_cache_size=100, invalidation_channel=channel)
+        service2 = CacheService()
+        service2.init(local_cache_size=100, invalidation_channel=channel)
+
+        item = Item(type='plain_text', object_id='one', body='first')
+        service1.set(item)
+        service2.get('one')
+        self.assertIn('one', service2.local_cache)
+
+        item.body = 'updated'
+        service1.set(item)
+        self.assertNotIn('one', service2.local_cache)
+        self.assertEquals('updated', service2.get('one').body)
+
+        service2.get('one')
+        service1.delete_all()
+        self.assertEquals(0, len(service2.local_cache))
+
+        service1.disconnect()
+        service2.disconnect()
+
+    def test_invalidations_are_broadcast_over_redis(self):
+        """ Local cache invalidations are broadcast over redis pub/sub """
+        service1 = CacheService()
+        service1.init(local_cache_size=100)
+        service2 = CacheService()
+        service2.init(local_cache_size=100)
+
+        item = Item(type='plain_text', object_id='one', body='first')
+        service1.set(item)
+        service2.get('one')
+        self.assertIn('one', service2.local_cache)
+
+        service1.delete('one')
+        time.sleep(1.5)  # give it some time
+        self.assertNotIn('one', service2.local_cache)
+
+        service1.delete_all()
+        service1.disconnect()
+        service2.disconnect()
+
 
@@ -1,8 +1,11 @@
 from tests.base import BaseTestCase
 from nose.plugins.attrib import attr
 
+import os
+import json
 from click.testing import CliRunner
 from shiftcontent.cli import cli
+from shiftcontent.cli.content import read_items
 
 
 @attr('cli')
@@ -18,8 +21,30 @@ class CliTest(BaseTestCase):
         result = runner.invoke(cli)
         self.assertEquals(0, result.exit_code)
         self.assertIn('definition  Definition commands', result.output)
-
-
-
-
+        self.assertIn('content     Content commands', result.output)
+        self.assertIn('search      Search index commands', result.output)
+
+    def test_reading_items_from_jsonl(self):
+        """ Streaming items for import from JSON lines file """
+        path = os.path.join(self.tmp, 'items.jsonl')
+        with open(path, 'w') as file:
+            file.write(json.dumps(dict(type='plain_text', body='one')) + '\n')
+            file.write('\n')
+            file.write(json.dumps(dict(type='plain_text', body='two')) + '\n')
+
+        items = list(read_items(path))
+        self.assertEquals(2, len(items))
+        self.assertEquals('two', items[1]['body'])
+
+    def test_reading_items_from_yaml(self):
+        """ Streaming items for import from YAML file """
+        path = os.path.join(self.tmp, 'items.yml')
+        with open(path, 'w') as file:
+            file.write('- type: plain_text\n  body: one\n')
+            file.write('- type: plain_text\n  body: two\n')
+            file.write('---\ntype: plain_text\nbody: three\n')
+
+        items = list(read_items(path))
+        self.assertEquals(3, len(items))
+        self.assertEquals('three', items[2]['body'])
 
@@ -0,0 +1,85 @@
+from tests.base import BaseTestCase
+from nose.plugins.attrib import attr
+
+import io
+from unittest import mock
+from collections import OrderedDict
+from shiftcontent import columnar
+from shiftcontent.columnar import ColumnBatch, write_csv
+from shiftcontent import exceptions as x
+
+
+@attr('columnar')
+class ColumnarTest(BaseTestCase):
+
+    types = OrderedDict(
+        object_id='text',
+        views='integer',
+        rating='float',
+        featured='boolean',
+        published='datetime',
+        day='date',
+    )
+
+    def test_create_batch(self):
+        """ Creating column batch """
+        batch = ColumnBatch(self.types)
+        self.assertIsInstance(batch, ColumnBatch)
+        self.assertEquals(0, len(batch))
+        self.assertIsInstance(batch['object_id'], list)
+        self.assertEquals('q', batch['views'].typecode)
+        self.assertEquals('d', batch['rating'].typecode)
+        self.assertEquals('b', batch['featured'].typecode)
+
+    def test_append_rows(self):
+        """ Appending rows converts values by field types """
+        batch = ColumnBatch(self.types)
+        batch.append(dict(
+            object_id='one',
+            views='10',
+            rating=4.5,
+            featured=True,
+            published='1970-01-02 00:00:00',
+            day='1970-01-11',
+        ))
+
+        self.assertEquals(1, len(batch))
+        self.assertEquals(['one'], batch['object_id'])
+        self.assertEquals([10], list(batch['views']))
+        self.assertEquals([4.5], list(batch['rating']))
+        self.assertEquals([1], list(batch['featured']))
+        self.assertEquals([86400], list(batch['published']))
+        self.assertEquals([10], list(batch['day']))
+
+    def test_missing_values_are_recorded_as_nulls(self):
+        """ Missing values are zeroed and recorded as nulls """
+        batch = ColumnBatch(self.types)
+        batch.append(dict(object_id='one', views=1))
+        batch.append(dict(object_id='two'))
+        self.assertEquals([1, 0], list(batch['views']))
+        self.assertEquals({1}, batch.nulls['views'])
+        self.assertEquals({0, 1}, batch.nulls['published'])
+        self.assertEquals(
+            [('one', 1, None, None, None, None), ('two',) + (None,) * 5],
+            list(batch.rows())
+        )
+
+    def test_write_csv(self):
+        """ Writing batches to CSV """
+        batch = ColumnBatch(OrderedDict(object_id='text', views='integer'))
+        batch.append(dict(object_id='one', views=1))
+        batch.append(dict(object_id='two'))
+
+        file = io.StringIO()
+        count = write_csv([batch, batch], file)
+        self.assertEquals(4, count)
+        lines = file.getvalue().splitlines()
+        self.assertEquals(['object_id,views', 'one,1', 'two,'], lines[:3])
+        self.assertEquals(5, len(lines))
+
+    def test_raise_on_arrow_export_without_pyarrow(self):
+        """ Converting to arrow requires pyarrow """
+        batch = ColumnBatch(self.types)
+        with mock.patch.object(columnar, 'pyarrow', None):
+            with self.assertRaises(x.ConfigurationException):
+                batch.to_arrow()
@@ -3,19 +3,27 @@ from nose.plugins.attrib import attr
 from pprint import pprint as pp
 
 from uuid import uuid1
+from unittest import mock
+from sqlalchemy import and_
 from datetime import datetime
 from shiftschema.schema import Result, Schema
 from shiftcontent import event_service
 from shiftcontent import db
+from shiftcontent import definition_service
 from shiftcontent import content_service
 from shiftcontent import exceptions as x
 from shiftcontent.content_service import ContentService
 from shiftcontent.item import Item
+from shiftcontent.field_types import field_types
+from shiftcontent.fields.text import Text
+from shiftcontent.database import tree
+from shiftcontent.database import field_index
 from shiftcontent.item_schema import UpdateItemSchema, CreateItemSchema
 from shiftcontent import search_service
 from shiftcontent import cache_service
 from shiftmemory import exceptions as cx
 import time
+import threading
 
 
 @attr('content', 'service')
@@ -54,6 +62,24 @@ class ContentServiceTest(BaseTestCase):
         self.assertEquals(1, len(prop.filters))
         self.assertEquals(2, len(prop.validators))
 
+    def test_item_schemas_are_memoized(self):
+        """ Reusing compiled item schemas until definition changes """
+        schema = content_service.item_schema('plain_text', 'create')
+        self.assertIs(
+            schema,
+            content_service.item_schema('plain_text', 'create')
+        )
+        self.assertIsNot(
+            schema,
+            content_service.item_schema('plain_text', 'update')
+        )
+
+        definition_service.definition_hash = 'changed'
+        self.assertIsNot(
+            schema,
+            content_service.item_schema('plain_text', 'create')
+        )
+
     def test_creating_item_create_schema(self):
         """ Create schema for content item creation """
         schema = content_service.item_schema('plain_text', 'create')
@@ -161,6 +187,75 @@ class ContentServiceTest(BaseTestCase):
         cached = content_service.get_item(object_id)
         self.assertEquals(new_value, cached.body)
 
+    def test_concurrent_cache_misses_are_coalesced(self):
+        """ Concurrent cache misses for the same item query database once """
+        object_id = str(uuid1())
+        items = db.tables['items']
+        with db.engine.begin() as conn:
+            conn.execute(
+                items.insert(),
+                author=123,
+                created=datetime.utcnow(),
+                object_id=object_id,
+                type='plain_text',
+                fields='{"body": "some content"}'
+            )
+
+        loads = []
+
+        class SlowContentService(ContentService):
+            def load_item(self, object_id, current=None):
+                loads.append(object_id)
+                time.sleep(0.2)
+                return super().load_item(object_id, current)
+
+        service = SlowContentService()
+        results = []
+        get = lambda: results.append(service.get_item(object_id))
+        threads = [threading.Thread(target=get) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEquals(1, len(loads))
+        self.assertEquals(5, len(set(id(item) for item in results)))
+        for item in results:
+            self.assertEquals('some content', item.body)
+
+    def test_wait_for_item_being_loaded_by_another_process(self):
+        """ Getting item waits while another process holds the lock """
+        cache_service.init(lock_timeout=1)
+        item = Item(type='plain_text', object_id=str(uuid1()), body='cached')
+        token = cache_service.lock(item.object_id)
+
+        # another process puts item to cache
+        timer = threading.Timer(0.1, cache_service.set, [item])
+        timer.start()
+        found = content_service.get_item(item.object_id)
+        timer.join()
+        cache_service.unlock(item.object_id, token)
+        self.assertEquals('cached', found.body)
+
+    def test_refresh_items_ahead_of_expiry(self):
+        """ Items close to expiry get refreshed from database """
+        cache_service.init(early_refresh=10 ** 9)
+        object_id = str(uuid1())
+        items = db.tables['items']
+        with db.engine.begin() as conn:
+            conn.execute(
+                items.insert(),
+                author=123,
+                created=datetime.utcnow(),
+                object_id=object_id,
+                type='plain_text',
+                fields='{"body": "fresh"}'
+            )
+
+        stale = Item(type='plain_text', object_id=object_id, body='stale')
+        cache_service.set(stale, ttl=60)
+        self.assertEquals('fresh', content_service.get_item(object_id).body)
+
     def test_fail_to_initialize_an_item_from_database_if_type_is_unknown(self):
         """ Fail to initialize item from database if type not in schema """
         object_id = str(uuid1())
@@ -183,6 +278,63 @@ class ContentServiceTest(BaseTestCase):
         err = 'Database contains item (1) of undefined type [nonexistent]'
         self.assertIn(err, str(cm.exception))
 
+    def test_get_multiple_items(self):
+        """ Getting multiple items by object ids in requested order """
+        object_ids = [str(uuid1()) for _ in range(3)]
+        items = db.tables['items']
+        with db.engine.begin() as conn:
+            for object_id in object_ids:
+                conn.execute(items.insert(), **dict(
+                    author=123,
+                    created=datetime.utcnow(),
+                    object_id=object_id,
+                    type='plain_text',
+                    fields='{"body": "some content"}'
+                ))
+
+        requested = list(reversed(object_ids))
+        result = content_service.get_items(requested)
+        self.assertEquals(3, len(result))
+        for object_id, item in zip(requested, result):
+            self.assertIsInstance(item, Item)
+            self.assertEquals(object_id, item.object_id)
+
+    def test_getting_multiple_items_returns_none_for_missing(self):
+        """ Missing items are returned as None when getting multiple items """
+        object_id = str(uuid1())
+        items = db.tables['items']
+        with db.engine.begin() as conn:
+            conn.execute(items.insert(), **dict(
+                author=123,
+                created=datetime.utcnow(),
+                object_id=object_id,
+                type='plain_text',
+                fields='{"body": "some content"}'
+            ))
+
+        result = content_service.get_items(['nonexistent', object_id])
+        self.assertEquals(2, len(result))
+        self.assertIsNone(result[0])
+        self.assertEquals(object_id, result[1].object_id)
+
+    def test_getting_multiple_items_puts_them_to_cache(self):
+        """ Getting multiple items puts misses to cache """
+        object_ids = [str(uuid1()) for _ in range(2)]
+        items = db.tables['items']
+        with db.engine.begin() as conn:
+            for object_id in object_ids:
+                conn.execute(items.insert(), **dict(
+                    author=123,
+                    created=datetime.utcnow(),
+                    object_id=object_id,
+                    type='plain_text',
+                    fields='{"body": "some content"}'
+                ))
+
+        content_service.get_items(object_ids)
+        for object_id in object_ids:
+            self.assertIsNotNone(cache_service.get(object_id))
+
     # --------------------------------------------------------------------------
     # CRUD & events
     # --------------------------------------------------------------------------
@@ -294,6 +446,49 @@ class ContentServiceTest(BaseTestCase):
             result = conn.execute(query).fetchone()
             self.assertIsNone(result)
 
+    def test_importing_items(self):
+        """ Bulk-importing content items in batches """
+        author = 123
+        data = [
+            dict(type='plain_text', body='I am item {}'.format(i))
+            for i in range(5)
+        ]
+        data.append(dict(
+            type='plain_text',
+            body='I am a legacy item',
+            created='2010-01-01 10:00:00'
+        ))
+
+        report = content_service.import_items(author, data, batch_size=2)
+        self.assertEquals(6, report['imported'])
+        self.assertFalse(report['errors'])
+
+        items = db.tables['items']
+        with db.engine.begin() as conn:
+            result = conn.execute(items.select()).fetchall()
+            self.assertEquals(6, len(result))
+            created = [row.created.year for row in result]
+            self.assertIn(2010, created)
+
+        # one event per batch
+        self.assertIsNotNone(event_service.get_event(3))
+        self.assertIsNone(event_service.get_event(4))
+
+    def test_importing_items_reports_invalid_items(self):
+        """ Bulk import skips and reports invalid items """
+        author = 123
+        data = [
+            dict(type='plain_text', body=''),
+            dict(type='nonexistent', body='I have bad type'),
+            dict(type='plain_text', body='Bad date', created='yesterday'),
+        ]
+
+        report = content_service.import_items(author, data)
+        self.assertEquals(0, report['imported'])
+        self.assertIn('body', report['errors'][0])
+        self.assertIn('type', report['errors'][1])
+        self.assertIn('created', report['errors'][2])
+
     def test_raise_when_updating_item_of_bad_type(self):
         """ Fail to update item of bad type """
         with self.assertRaises(x.ItemError) as cm:
@@ -360,6 +555,36 @@ class ContentServiceTest(BaseTestCase):
 
         self.assertIn('is not allowed for content type', str(cm.exception))
 
+    def test_raise_when_trying_to_update_path(self):
+        """ Items can only be moved with set_parent """
+        author = 123
+        parent = content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am a parent')
+        )
+        item = content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am a simple content item')
+        )
+
+        with self.assertRaises(x.ItemError) as cm:
+            content_service.update_item_field(
+                author,
+                item.object_id,
+                'path',
+                parent.object_id
+            )
+        self.assertIn('use set_parent', str(cm.exception))
+
+        item.path = parent.object_id
+        with self.assertRaises(x.ItemError):
+            content_service.update_item(author, item)
+
+        self.assertIsNone(content_service.get_item(item.object_id).path)
+        self.assertEquals([], content_service.get_children(parent.object_id))
+
     def test_return_errors_when_updating_item_field_with_bad_data(self):
         """ Validate data when updating item field"""
         type = 'plain_text'
@@ -667,6 +892,53 @@ class ContentServiceTest(BaseTestCase):
         cached = cache_service.get(item.object_id)
         self.assertIsNone(cached)
 
+    def test_missing_items_are_cached(self):
+        """ Requests for missing items do not hit database again """
+        cache_service.init(missing_ttl=60)
+        object_id = str(uuid1())
+        self.assertIsNone(content_service.get_item(object_id))
+        self.assertTrue(cache_service.is_missing(object_id))
+
+        # appears in database behind our back
+        items = db.tables['items']
+        with db.engine.begin() as conn:
+            conn.execute(
+                items.insert(),
+                author=123,
+                created=datetime.utcnow(),
+                object_id=object_id,
+                type='plain_text',
+                fields='{"body": "some content"}'
+            )
+
+        self.assertIsNone(content_service.get_item(object_id))
+        self.assertEquals([None], content_service.get_items([object_id]))
+
+    def test_missing_items_are_not_cached_unless_enabled(self):
+        """ Missing items are only cached if enabled """
+        object_id = str(uuid1())
+        self.assertIsNone(content_service.get_item(object_id))
+        self.assertFalse(cache_service.is_missing(object_id))
+
+    def test_getting_many_items_caches_missing_ones(self):
+        """ Getting multiple items caches ones that do not exist """
+        cache_service.init(missing_ttl=60)
+        object_id = str(uuid1())
+        self.assertEquals([None], content_service.get_items([object_id]))
+        self.assertTrue(cache_service.is_missing(object_id))
+
+    def test_deleting_item_leaves_tombstone(self):
+        """ Deleting item leaves a missing item tombstone """
+        cache_service.init(missing_ttl=60)
+        item = content_service.create_item(
+            author=123,
+            content_type='plain_text',
+            fields=dict(body='I am a simple content item')
+        )
+
+        content_service.delete_item(author=123, object_id=item.object_id)
+        self.assertTrue(cache_service.is_missing(item.object_id))
+
     # --------------------------------------------------------------------------
     # Trees & nesting
     # --------------------------------------------------------------------------
@@ -912,6 +1184,44 @@ class ContentServiceTest(BaseTestCase):
         self.assertIn(child2.object_id, ids)
         self.assertNotIn(child3.object_id, ids)
 
+    def test_getting_item_children_from_cache(self):
+        """ Caching child ids and dropping them when children change """
+        author = 123
+        parent = content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am a parent')
+        )
+        child1 = content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am child 1'),
+            parent=parent
+        )
+
+        children = content_service.get_children(parent.object_id)
+        self.assertEquals([child1.object_id], [c.object_id for c in children])
+        self.assertEquals(
+            [child1.object_id],
+            cache_service.get_children(parent.object_id)
+        )
+
+        child2 = content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am child 2'),
+            parent=parent
+        )
+        self.assertIsNone(cache_service.get_children(parent.object_id))
+
+        children = content_service.get_children(parent.object_id)
+        ids = [child.object_id for child in children]
+        self.assertEquals([child1.object_id, child2.object_id], ids)
+
+        content_service.delete_item(author, child1.object_id)
+        children = content_service.get_children(parent.object_id)
+        self.assertEquals([child2.object_id], [c.object_id for c in children])
+
     def test_getting_tem_descendants(self):
         """ Getting item descendants """
         author = 123
@@ -959,6 +1269,35 @@ class ContentServiceTest(BaseTestCase):
         self.assertNotIn(parent.object_id, ids)
         self.assertNotIn(root.object_id, ids)
 
+    def test_counting_item_descendants(self):
+        """ Counting item descendants """
+        author = 123
+        parent = content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am a parent')
+        )
+        child = content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am a child'),
+            parent=parent
+        )
+        content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am a grandchild'),
+            parent=child
+        )
+
+        self.assertEquals(2, content_service.count_descendants(parent.object_id))
+        self.assertEquals(1, content_service.count_descendants(
+            parent.object_id,
+            max_depth=1
+        ))
+        descendants = content_service.get_descendants(parent.object_id)
+        self.assertEquals(child.object_id, descendants[0].object_id)
+
     def test_getting_tree(self):
         """ Getting item tree """
         author = 123
@@ -1141,3 +1480,426 @@ class ContentServiceTest(BaseTestCase):
         self.assertEquals(child2.id, children[3]['node'].id)
         self.assertEquals(child1.id, children[4]['node'].id)
 
+    def test_getting_tree_limited_by_depth(self):
+        """ Getting item tree down to certain depth """
+        author = 123
+        root = content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am the root')
+        )
+        child = content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am a child'),
+            parent=root
+        )
+        content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am a grandchild'),
+            parent=child
+        )
+
+        tree = content_service.get_tree(root.object_id, max_depth=1)
+        self.assertEquals(1, len(tree['children']))
+        self.assertEquals(child.id, tree['children'][0]['node'].id)
+        self.assertEquals([], tree['children'][0]['children'])
+
+    def test_getting_tree_of_projections(self):
+        """ Getting item tree with nodes projected to fields """
+        author = 123
+        root = content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am the root')
+        )
+        child = content_service.create_item(
+            author=author,
+            content_type='plain_text',
+            fields=dict(body='I am a child'),
+            parent=root
+        )
+
+        tree = content_service.get_tree(root.object_id, fields=['body'])
+        self.assertEquals(root.object_id, tree['node']['object_id'])
+        self.assertEquals('I am the root', tree['node']['body'])
+
+        node = tree['children'][0]['node']
+        self.assertTrue(type(node) is dict)
+        self.assertEquals(child.object_id, node['object_id'])
+        self.assertEquals('I am a child', node['body'])
+
+    def insert_items(self, count, **data):
+        """ Insert a number of items directly to the database """
+        created = []
+        items = db.tables['items']
+        with db.engine.begin() as conn:
+            for i in range(count):
+                item = Item(
+                    type=data.get('type', 'plain_text'),
+                    author=data.get('author', 123),
+                    object_id=str(uuid1()),
+                    body='Item {}'.format(i),
+                )
+                item.created = datetime(2018, 1, 1 + i % 3)
+                if 'sort_order' in data:
+                    item.sort_order = data['sort_order'](i)
+                result = conn.execute(items.insert(), **item.to_db(False))
+                item.set_field('id', result.inserted_primary_key[0], True)
+                created.append(item)
+
+        return created
+
+    def test_listing_items_page_by_page(self):
+        """ Listing items with keyset pagination """
+        created = self.insert_items(7)
+        created += self.insert_items(2, author=456)
+        expected = sorted(created, key=lambda i: (i.created, i.id))
+
+        ids = []
+        cursor = None
+        while True:
+            page = content_service.list_items(after=cursor, limit=3)
+            ids.extend(item.id for item in page['items'])
+            cursor = page['cursor']
+            if not cursor:
+                break
+
+        self.assertEquals([item.id for item in expected], ids)
+
+        page = content_service.list_items(author=456)
+        self.assertEquals(2, len(page['items']))
+        self.assertIsNone(page['cursor'])
+
+    def test_listing_items_in_descending_order(self):
+        """ Listing items in descending order with nulls last """
+        created = self.insert_items(
+            6,
+            sort_order=lambda i: i % 3 if i < 4 else None
+        )
+
+        ids = []
+        cursor = None
+        while True:
+            page = content_service.list_items(
+                order_by='-sort_order',
+                after=cursor,
+                limit=2
+            )
+            ids.extend(item.id for item in page['items'])
+            cursor = page['cursor']
+            if not cursor:
+                break
+
+        with_order = [i for i in created if i.sort_order is not None]
+        without_order = [i for i in created if i.sort_order is None]
+        expected = sorted(
+            with_order,
+            key=lambda i: (i.sort_order, i.id),
+            reverse=True
+        )
+        expected += sorted(without_order, key=lambda i: i.id, reverse=True)
+        self.assertEquals([item.id for item in expected], ids)
+
+    def test_listing_item_projections(self):
+        """ Listing items projected to fields """
+        self.insert_items(2)
+        page = content_service.list_items(fields=['body'])
+        self.assertEquals('Item 0', page['items'][0]['body'])
+
+        page = content_service.list_items(fields=[])
+        self.assertNotIn('fields', page['items'][0])
+        self.assertNotIn('body', page['items'][0])
+        self.assertIn('object_id', page['items'][0])
+
+    def test_raise_on_bad_listing_cursor(self):
+        """ Raise when listing items with malformed cursor """
+        with self.assertRaises(x.InvalidCursor):
+            content_service.list_items(after='not a cursor')
+
+    def test_raise_on_updating_stale_item(self):
+        """ Raise version conflict when updating item changed since read """
+        item = self.insert_items(1)[0]
+        stale = content_service.get_item(item.object_id)
+        stale.set_field('version', 0, initial=True)
+        stale.body = 'Updated body'
+        with self.assertRaises(x.VersionConflict):
+            content_service.update_item(123, stale)
+
+        with self.assertRaises(x.VersionConflict):
+            content_service.update_item_field(
+                author=123,
+                object_id=item.object_id,
+                field='body',
+                value='Updated body',
+                version=3
+            )
+
+    def insert_posts(self, published):
+        """ Insert blog posts with publication dates and index them """
+        created = [
+            self.insert_item(
+                'blog_post',
+                author_name='Author {}'.format(i % 2),
+                published=date
+            )
+            for i, date in enumerate(published)
+        ]
+        with db.engine.begin() as conn:
+            field_index.index_items(conn, created)
+
+        return created
+
+    def test_listing_items_filtered_by_indexed_fields(self):
+        """ Listing items filtered by indexed fields """
+        created = self.insert_posts([
+            '2018-01-01 00:00:00',
+            '2018-02-01 00:00:00',
+            '2018-03-01 00:00:00',
+            '2018-04-01 00:00:00',
+        ])
+
+        page = content_service.list_items(
+            content_type='blog_post',
+            where=dict(
+                author_name='Author 1',
+                published=('>', '2018-01-15 00:00:00')
+            )
+        )
+        ids = [item.id for item in page['items']]
+        self.assertEquals([created[1].id, created[3].id], ids)
+
+        page = content_service.list_items(
+            content_type='blog_post',
+            where=dict(author_name=('in', ['Author 0', 'Nobody']))
+        )
+        self.assertEquals(2, len(page['items']))
+
+    def test_filtering_long_indexed_values_by_full_value(self):
+        """ Values sharing indexed prefix are told apart on filtering """
+        prefix = 'a' * 256
+        one, two = self.insert_posts(['2018-01-01 00:00:00'] * 2)
+        one.author_name = prefix + 'one'
+        two.author_name = prefix + 'two'
+        with db.engine.begin() as conn:
+            field_index.index_items(conn, [one, two])
+
+        page = content_service.list_items(
+            content_type='blog_post',
+            where=dict(author_name=prefix + 'two')
+        )
+        self.assertEquals([two.id], [item.id for item in page['items']])
+
+        page = content_service.list_items(
+            content_type='blog_post',
+            where=dict(author_name=('in', [prefix + 'one', prefix]))
+        )
+        self.assertEquals([one.id], [item.id for item in page['items']])
+
+    def test_listing_items_ordered_by_indexed_field(self):
+        """ Listing items ordered by indexed field page by page """
+        created = self.insert_posts([
+            '2018-03-01 00:00:00',
+            '2018-05-01 00:00:00',
+            '2018-01-01 00:00:00',
+            '2018-02-01 00:00:00',
+        ])
+
+        # drop publication date of one item from index
+        index = db.tables['index']
+        with db.engine.begin() as conn:
+            conn.execute(index.delete().where(and_(
+                index.c.object_id == created[1].object_id,
+                index.c.field == 'published'
+            )))
+
+        ids = []
+        cursor = None
+        while True:
+            page = content_service.list_items(
+                content_type='blog_post',
+                order_by='-published',
+                after=cursor,
+                limit=1
+            )
+            ids.extend(item.id for item in page['items'])
+            cursor = page['cursor']
+            if not cursor:
+                break
+
+        expected = [created[i].id for i in (0, 3, 2, 1)]
+        self.assertEquals(expected, ids)
+
+    def test_raise_on_querying_non_indexed_fields(self):
+        """ Raise when filtering or ordering by non-indexed fields """
+        with self.assertRaises(x.InvalidQuery):
+            content_service.list_items(
+                content_type='blog_post',
+                where=dict(title='Some title')
+            )
+        with self.assertRaises(x.InvalidQuery):
+            content_service.list_items(order_by='published')
+        with self.assertRaises(x.InvalidQuery):
+            content_service.list_items(
+                content_type='blog_post',
+                where=dict(published=('like', '2018'))
+            )
+
+    def test_listing_item_children(self):
+        """ Listing children of an item """
+        parent, child1, child2 = self.insert_items(3)
+        with db.engine.begin() as conn:
+            tree.insert_nodes(conn, [
+                (parent.object_id, None),
+                (child1.object_id, parent.object_id),
+                (child2.object_id, parent.object_id),
+            ])
+
+        page = content_service.list_items(parent=parent.object_id)
+        ids = [item.object_id for item in page['items']]
+        self.assertEquals(2, len(ids))
+        self.assertNotIn(parent.object_id, ids)
+
+    # --------------------------------------------------------------------------
+    # Export
+    # --------------------------------------------------------------------------
+
+    def test_exporting_typed_columns(self):
+        """ Exporting items of a type as typed columns """
+        created = self.insert_posts([
+            '2018-01-01 00:00:00',
+            '2018-01-02 00:00:00',
+            '2018-01-03 00:00:00',
+        ])
+        self.insert_items(2)
+
+        batches = list(content_service.export_columns(
+            'blog_post',
+            fields=['published', 'author_name', 'version'],
+            batch_size=2
+        ))
+
+        self.assertEquals([2, 1], [len(batch) for batch in batches])
+        self.assertEquals(
+            ['object_id', 'published', 'author_name', 'version'],
+            list(batches[0].columns.keys())
+        )
+
+        published = [v for batch in batches for v in batch['published']]
+        self.assertEquals([1514764800, 1514851200, 1514937600], published)
+        self.assertEquals('q', batches[0]['published'].typecode)
+        self.assertEquals('q', batches[0]['version'].typecode)
+        self.assertEquals(
+            [item.object_id for item in created],
+            [v for batch in batches for v in batch['object_id']]
+        )
+
+    def test_exporting_all_custom_fields_by_default(self):
+        """ Exporting all custom fields of a type unless specified """
+        self.insert_posts(['2018-01-01 00:00:00'])
+        batch = next(content_service.export_columns('blog_post'))
+        self.assertEquals(
+            ['object_id', 'author_name', 'published', 'url', 'title', 'body'],
+            list(batch.columns.keys())
+        )
+        self.assertEquals({0}, batch.nulls['url'])
+
+    def test_raise_on_exporting_unknown_fields(self):
+        """ Exporting fields that content type does not have raises """
+        with self.assertRaises(x.InvalidQuery):
+            list(content_service.export_columns('blog_post', ['nonexistent']))
+
+    def test_exporting_fields_of_custom_types(self):
+        """ Exporting fields of types registered with definition service """
+        class Slug(Text):
+            @classmethod
+            def value_from_db(cls, value):
+                return value.lower()
+
+        registry = dict(field_types, slug=Slug)
+        type_definition = dict(fields=[dict(handle='slug', type='slug')])
+        with db.engine.begin() as conn:
+            conn.execute(db.tables['items'].insert(), **dict(
+                created=datetime.utcnow(),
+                type='tag',
+                author='123',
+                object_id=str(uuid1()),
+                fields='{"slug": "Some-Tag"}',
+            ))
+
+        with mock.patch.object(definition_service, '_field_types', registry):
+            with mock.patch.object(
+                definition_service,
+                'get_type',
+                return_value=type_definition):
+                batch = next(content_service.export_columns('tag'))
+
+        self.assertEquals(['some-tag'], batch['slug'])
+
+    # --------------------------------------------------------------------------
+    # Streaming descendants
+    # --------------------------------------------------------------------------
+
+    def insert_subtree(self):
+        """ Insert root item with two children having a child each """
+        items = db.tables['items']
+        created = dict()
+        nodes = [
+            ('root', None),
+            ('a', 'root'),
+            ('b', 'root'),
+            ('a1', 'a'),
+            ('b1', 'b'),
+        ]
+        with db.engine.begin() as conn:
+            for name, parent in nodes:
+                path = created[parent].path if parent else None
+                if parent:
+                    parent_id = created[parent].object_id
+                    path = path + '.' + parent_id if path else parent_id
+
+                item = Item(
+                    type='plain_text',
+                    author=123,
+                    object_id=str(uuid1()),
+                    path=path,
+                    body=name
+                )
+                conn.execute(items.insert(), **item.to_db(False))
+                tree.insert_node(conn, item.object_id, item.path)
+                created[name] = item
+
+        return created
+
+    def test_iterating_descendants_closest_first(self):
+        """ Streaming descendants closest first """
+        created = self.insert_subtree()
+        root = created['root'].object_id
+        descendants = content_service.iter_descendants(root, batch_size=2)
+        self.assertFalse(isinstance(descendants, list))
+
+        bodies = [item.body for item in descendants]
+        self.assertEquals(['a', 'b', 'a1', 'b1'], bodies)
+
+        limited = content_service.iter_descendants(root, max_depth=1)
+        self.assertEquals(['a', 'b'], [item.body for item in limited])
+
+    def test_iterating_descendants_depth_first(self):
+        """ Streaming descendants depth-first """
+        created = self.insert_subtree()
+        root = created['root'].object_id
+        descendants = content_service.iter_descendants(root, order='path')
+        bodies = [item.body for item in descendants]
+
+        first, second = sorted(
+            ['a', 'b'],
+            key=lambda name: created[name].object_id
+        )
+        expected = [first, first + '1', second, second + '1']
+        self.assertEquals(expected, bodies)
+
+    def test_raise_on_iterating_descendants_in_bad_order(self):
+        """ Streaming descendants in unsupported order raises """
+        with self.assertRaises(x.InvalidQuery):
+            next(content_service.iter_descendants('123', order='random'))
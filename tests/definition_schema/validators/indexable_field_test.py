@@ -0,0 +1,38 @@
+from tests.base import BaseTestCase
+from nose.plugins.attrib import attr
+from pprint import pprint as pp
+
+from shiftcontent.definition_schema.validators import IndexableField
+
+
+@attr('schema', 'validators', 'indexable_field')
+class IndexableFieldTest(BaseTestCase):
+
+    def test_instantiate_validator(self):
+        """ Instantiating indexable field validator """
+        validator = IndexableField()
+        self.assertIsInstance(validator, IndexableField)
+
+    def test_indexable_type_passes_validation(self):
+        """ Indexed field of indexable type passes validation """
+        validator = IndexableField()
+        error = validator.validate(True, dict(type='datetime'))
+        self.assertFalse(error)
+
+    def test_non_indexed_field_passes_validation(self):
+        """ Non-indexed field passes validation regardless of type """
+        validator = IndexableField()
+        error = validator.validate(False, dict(type='geopoint_meta'))
+        self.assertFalse(error)
+
+    def test_non_indexable_type_fails_validation(self):
+        """ Indexed field of non-indexable type fails validation """
+        from shiftcontent import definition_service
+        from shiftcontent.fields import GeopointMeta
+        types = {**definition_service.field_types(), 'geo': GeopointMeta}
+        definition_service._field_types = types
+
+        validator = IndexableField()
+        error = validator.validate(True, dict(type='geo'))
+        self.assertTrue(error)
+        definition_service._field_types = None
@@ -86,6 +86,28 @@ class ContentItemCreateTest(BaseTestCase):
         # assert cached
         self.assertIsNotNone(cache_service.get(object_id))
 
+    def test_creating_item_removes_tombstone(self):
+        """ Create item handler removes missing item tombstone """
+        cache_service.init(missing_ttl=60)
+        object_id = str(uuid1())
+        cache_service.set_missing(object_id)
+
+        handler = ContentItemCreate()
+        handler.handle(Event(
+            id=123,
+            type='CONTENT_ITEM_CREATE',
+            author=123,
+            object_id=object_id,
+            payload=dict(
+                type='plain_text',
+                author=123,
+                object_id=object_id,
+                body='Some body content'
+            ))
+        )
+
+        self.assertFalse(cache_service.is_missing(object_id))
+
     def test_created_item_is_put_to_index(self):
         """ Create item handler puts item to index """
         type = 'plain_text'
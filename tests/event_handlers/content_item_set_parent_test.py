@@ -547,3 +547,31 @@ class ContentItemCacheTest(BaseTestCase):
         self.assertIsNotNone(search_service.get(child1.type, child2.object_id))
 
 
+
+    def test_moving_subtree_updates_cached_descendants(self):
+        """ Moving subtree rewrites paths of cached descendants """
+        root = Item(type='plain_text', author=1, object_id=str(uuid1()))
+        child = Item(type='plain_text', author=1, object_id=str(uuid1()))
+        grandchild = Item(type='plain_text', author=1, object_id=str(uuid1()))
+
+        items = db.tables['items']
+        with db.engine.begin() as conn:
+            query = items.insert()
+            for item in (root, child, grandchild):
+                result = conn.execute(query, **item.to_db(update=False))
+                item.set_field('id', result.inserted_primary_key[0], True)
+
+        handler = ContentItemSetParent()
+        handler.set_parent(grandchild.object_id, child.object_id)
+        self.assertIsNotNone(cache_service.get(grandchild.object_id))
+
+        handler.set_parent(child.object_id, root.object_id)
+        expected = '{}.{}'.format(root.object_id, child.object_id)
+
+        cached = cache_service.get(grandchild.object_id)
+        self.assertEquals(expected, cached.path)
+
+        with db.engine.begin() as conn:
+            query = items.select()\
+                .where(items.c.object_id == grandchild.object_id)
+            self.assertEquals(expected, conn.execute(query).fetchone().path)
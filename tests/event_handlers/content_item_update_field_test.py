@@ -9,6 +9,7 @@ from shiftcontent.item import Item
 from shiftcontent import db
 from shiftcontent import cache_service
 from shiftcontent import search_service
+from shiftcontent import exceptions as x
 
 
 @attr('event', 'handler', 'content_item_update_field')
@@ -409,3 +410,9 @@ class ContentItemUpdateFieldTest(BaseTestCase):
         found = search_service.get(type, object_id)
         self.assertIsNotNone(found)
         self.assertEquals('Initial body', found['_source']['body'])
+
+    def test_raise_when_updating_field_of_nonexistent_item(self):
+        """ Updating field of nonexistent item raises not found """
+        handler = ContentItemFieldUpdateField()
+        with self.assertRaises(x.ItemNotFound):
+            handler.update_field(str(uuid1()), 'body', 'New', False)
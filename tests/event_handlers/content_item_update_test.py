@@ -7,6 +7,7 @@ from shiftevent.event import Event
 from shiftcontent.event_handlers import ContentItemUpdate
 from shiftcontent.item import Item
 from shiftcontent import db
+from shiftcontent import exceptions as x
 from shiftcontent import cache_service
 from shiftcontent import search_service
 import json
@@ -83,6 +84,47 @@ class ContentItemUpdateTest(BaseTestCase):
             updated.from_db(record)
             self.assertEquals('Updated body', updated.body)
 
+    def test_raise_on_updating_stale_version(self):
+        """ Update handler rejects updates to items changed since read """
+        object_id = str(uuid1())
+        item = Item(
+            type='plain_text',
+            author=123,
+            object_id=object_id,
+            body='Initial body'
+        )
+
+        old_data = item.to_json()
+
+        items = db.tables['items']
+        with db.engine.begin() as conn:
+            conn.execute(items.insert(), **item.to_db(update=False))
+            query = items.update().where(items.c.object_id == object_id)
+            conn.execute(query.values(version=2))
+
+        item.body = 'Updated body'
+        event = Event(
+            id=123,
+            type='CONTENT_ITEM_UPDATE',
+            author=123,
+            object_id=object_id,
+            payload=item.to_json(),
+            payload_rollback=old_data
+        )
+
+        handler = ContentItemUpdate()
+        with self.assertRaises(x.VersionConflict):
+            handler.handle(event)
+
+        # rollback is skipped
+        handler.rollback(event)
+        with db.engine.begin() as conn:
+            query = items.select().where(items.c.object_id == object_id)
+            record = conn.execute(query).fetchone()
+
+        self.assertEquals(2, record.version)
+        self.assertEquals('Initial body', json.loads(record.fields)['body'])
+
     def test_update_item_updates_cache(self):
         """ Update item handler updates cache """
         object_id = str(uuid1())
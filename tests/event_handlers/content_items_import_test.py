@@ -0,0 +1,119 @@
+from tests.base import BaseTestCase
+from nose.plugins.attrib import attr
+
+from uuid import uuid1
+from shiftevent.event import Event
+from shiftcontent.event_handlers import ContentItemsImport
+from shiftcontent import cache_service
+from shiftcontent import search_service
+from pprint import pprint as pp
+
+
+@attr('event', 'handler', 'content_items_import')
+class ContentItemsImportTest(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache_service.init()
+        search_service.init(
+            hosts=['127.0.0.1:9200'],
+            index_prefix='content_tests'
+        )
+
+    def tearDown(self):
+        """ Clean up """
+        search_service.drop_all_indices()
+        search_service.disconnect()
+        cache_service.drop_cache(cache_service.cache_name)
+        super().tearDown()
+
+    def get_event(self, count=3):
+        """ Create import event with a number of items """
+        items = []
+        for i in range(count):
+            items.append(dict(
+                type='plain_text',
+                author=123,
+                object_id=str(uuid1()),
+                body='Item body {}'.format(i)
+            ))
+
+        return Event(
+            id=123,
+            type='CONTENT_ITEMS_IMPORT',
+            author=123,
+            payload=dict(items=items),
+            payload_rollback=None
+        )
+
+    # -------------------------------------------------------------------------
+    # Tests
+    # -------------------------------------------------------------------------
+
+    def test_instantiating_handler(self):
+        """ Instantiating content items import handler """
+        handler = ContentItemsImport()
+        self.assertIsInstance(handler, ContentItemsImport)
+
+    def test_handle_event(self):
+        """ Handler content items import handles event"""
+        event = self.get_event()
+        handler = ContentItemsImport()
+        handler.handle(event)
+
+        object_ids = [i['object_id'] for i in event.payload['items']]
+        items = self.db.tables['items']
+        with self.db.engine.begin() as conn:
+            query = items.select().where(items.c.object_id.in_(object_ids))
+            result = conn.execute(query).fetchall()
+            self.assertEquals(3, len(result))
+
+    def test_imported_items_are_cached(self):
+        """ Import items handler caches items """
+        event = self.get_event()
+        handler = ContentItemsImport()
+        handler.handle(event)
+
+        for data in event.payload['items']:
+            cached = cache_service.get(data['object_id'])
+            self.assertIsNotNone(cached)
+            self.assertIsNotNone(cached.id)
+
+    def test_imported_items_are_put_to_index(self):
+        """ Import items handler puts items to index """
+        event = self.get_event()
+        handler = ContentItemsImport()
+        handler.handle(event)
+
+        for data in event.payload['items']:
+            indexed = search_service.get(data['type'], data['object_id'])
+            self.assertIsNotNone(indexed)
+
+    def test_rollback_event(self):
+        """ Handler content items import rolling back changes """
+        event = self.get_event()
+        handler = ContentItemsImport()
+        handler.handle(event)
+        handler.rollback(event)
+
+        object_ids = [i['object_id'] for i in event.payload['items']]
+        items = self.db.tables['items']
+        with self.db.engine.begin() as conn:
+            query = items.select().where(items.c.object_id.in_(object_ids))
+            result = conn.execute(query).fetchall()
+            self.assertEquals(0, len(result))
+
+        for object_id in object_ids:
+            self.assertIsNone(cache_service.get(object_id))
+
+
+    def test_rollback_removes_items_from_index(self):
+        """ Rolling back import removes items from index """
+        event = self.get_event()
+        handler = ContentItemsImport()
+        handler.handle(event)
+        handler.rollback(event)
+
+        for data in event.payload['items']:
+            indexed = search_service.get(data['type'], data['object_id'])
+            self.assertIsNone(indexed)
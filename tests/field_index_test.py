@@ -0,0 +1,103 @@
+from tests.base import BaseTestCase
+from nose.plugins.attrib import attr
+
+from uuid import uuid1
+from unittest import mock
+from sqlalchemy import select
+from datetime import datetime
+from shiftcontent.item import Item
+from shiftcontent.database import field_index
+
+
+@attr('db', 'field_index')
+class FieldIndexTest(BaseTestCase):
+
+    def rows(self):
+        """ Get all field index rows """
+        table = self.db.tables['index']
+        with self.db.engine.begin() as conn:
+            return conn.execute(select([table])).fetchall()
+
+    def test_get_index_rows_for_item(self):
+        """ Getting index rows for indexed fields of an item """
+        item = Item(
+            type='blog_post',
+            author=123,
+            object_id=str(uuid1()),
+            author_name='Some author',
+            published='2018-03-05 10:00:00',
+            title='Not indexed'
+        )
+
+        rows = {row['field']: row for row in field_index.item_rows(item)}
+        self.assertEquals({'author_name', 'published'}, set(rows.keys()))
+        self.assertEquals('Some author', rows['author_name']['string_value'])
+        self.assertEquals(
+            field_index.value_hash('Some author'),
+            rows['author_name']['hash_value']
+        )
+        self.assertIsNone(rows['published']['hash_value'])
+        self.assertIsNone(rows['author_name']['date_value'])
+        self.assertEquals(
+            datetime(2018, 3, 5, 10),
+            rows['published']['date_value']
+        )
+
+    def test_skip_empty_values(self):
+        """ Empty field values are not indexed """
+        item = Item(type='blog_post', author=123, object_id=str(uuid1()))
+        self.assertEquals([], field_index.item_rows(item))
+
+    def test_index_and_delete_items(self):
+        """ Indexing and deleting items """
+        item = Item(
+            type='blog_post',
+            author=123,
+            object_id=str(uuid1()),
+            author_name='Some author',
+        )
+        with self.db.engine.begin() as conn:
+            field_index.index_items(conn, [item])
+            item.author_name = 'Other author'
+            field_index.index_items(conn, [item])
+
+        rows = self.rows()
+        self.assertEquals(1, len(rows))
+        self.assertEquals('Other author', rows[0].string_value)
+
+        with self.db.engine.begin() as conn:
+            field_index.delete_items(conn, [item.object_id])
+        self.assertEquals([], self.rows())
+
+    def test_skip_items_without_indexed_fields(self):
+        """ Items of types without indexed fields do not touch the index """
+        item = Item(
+            type='plain_text',
+            author=123,
+            object_id=str(uuid1()),
+            body='Not indexed'
+        )
+        conn = mock.Mock()
+        field_index.index_items(conn, [item])
+        conn.execute.assert_not_called()
+
+    def test_rebuild_index(self):
+        """ Rebuilding field index from items """
+        items = self.db.tables['items']
+        with self.db.engine.begin() as conn:
+            for name in ('One', 'Two'):
+                item = Item(
+                    type='blog_post',
+                    author=123,
+                    object_id=str(uuid1()),
+                    author_name=name,
+                    published='2018-01-01 00:00:00',
+                )
+                conn.execute(items.insert(), **item.to_db(False))
+
+        with self.db.engine.begin() as conn:
+            count = field_index.rebuild(conn, batch_size=1)
+
+        self.assertEquals(2, count)
+        values = set(row.string_value for row in self.rows())
+        self.assertEquals({'One', 'Two', None}, values)
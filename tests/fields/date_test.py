@@ -1,6 +1,7 @@
 from tests.base import BaseTestCase
 from nose.plugins.attrib import attr
 from datetime import datetime, date
+import arrow
 
 from shiftcontent.fields import Date
 
@@ -80,6 +81,21 @@ class DateTest(BaseTestCase):
         mapping = field.search_mapping()
         self.assertEquals('date', mapping['type'])
 
+    def test_canonical_strings_parse_the_same_as_arrow(self):
+        """ Fast path parses canonical date strings exactly like arrow """
+        value = '2020-10-18'
+        expected = arrow.get(value, 'YYYY-MM-DD').to('UTC').date()
+        self.assertEquals(expected, Date.convert(value))
+        self.assertTrue(type(Date.convert(value)) is date)
+
+    def test_converting_datetimes_to_dates(self):
+        """ Datetimes and datetime strings are converted to their dates """
+        value = datetime(2020, 10, 18, 16, 40, 22)
+        self.assertEquals(date(2020, 10, 18), Date.convert(value))
+        self.assertEquals(date(2020, 10, 18), Date.convert(str(value)))
+        with self.assertRaises(arrow.parser.ParserError):
+            Date.convert('2020-1-18')
+
 
 
 
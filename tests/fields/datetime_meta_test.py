@@ -38,3 +38,8 @@ class DatetimeMetaFieldTest(BaseTestCase):
         field.from_json(value)
         self.assertEquals(value, field.get().strftime(fmt))
         self.assertTrue(type(field.get()) is datetime)
+
+    def test_converting_to_db_keeps_datetime(self):
+        """ Datetime meta field converter keeps datetime for db """
+        value = DateTimeMeta.convert('2020-10-18 16:40:22')
+        self.assertTrue(type(DateTimeMeta.value_to_db(value)) is datetime)
@@ -1,6 +1,7 @@
 from tests.base import BaseTestCase
 from nose.plugins.attrib import attr
 from datetime import datetime
+import arrow
 
 from shiftcontent.fields import DateTime
 
@@ -79,6 +80,40 @@ class DatetimeTest(BaseTestCase):
         mapping = field.search_mapping()
         self.assertEquals('date', mapping['type'])
 
+    def test_converting_values_without_field_instance(self):
+        """ Converting datetime values with class-level converters """
+        value = '2020-10-18 16:40:22'
+        converted = DateTime.convert(value)
+        self.assertTrue(type(converted) is datetime)
+        self.assertEquals(value, DateTime.value_to_db(converted))
+        self.assertEquals(value, DateTime.value_to_json(converted))
+        self.assertEquals(converted, DateTime.value_from_json(value))
+
+    def test_canonical_strings_parse_the_same_as_arrow(self):
+        """ Fast path parses canonical strings exactly like arrow """
+        fmt = 'YYYY-MM-DD HH:mm:ss'
+        for value in ['2020-10-18 16:40:22', '1999-01-01 00:00:00']:
+            expected = arrow.get(value, fmt).to('UTC').datetime
+            converted = DateTime.convert(value)
+            self.assertEquals(expected, converted)
+            self.assertEquals(expected.tzinfo, converted.tzinfo)
+
+    def test_other_strings_fall_back_to_arrow(self):
+        """ Strings in other formats are still parsed by arrow """
+        converted = DateTime.convert('2020-10-18 16:40:22.123456')
+        self.assertEquals(datetime(2020, 10, 18, 16, 40, 22), converted.replace(
+            tzinfo=None
+        ))
+        with self.assertRaises(ValueError):
+            DateTime.convert('2020-13-18 16:40:22')
+        with self.assertRaises(arrow.parser.ParserError):
+            DateTime.convert('2020-10-18T16:40:22')
+
+    def test_native_datetimes_are_not_converted(self):
+        """ Datetimes from database driver are used as they are """
+        value = datetime(2020, 10, 18, 16, 40, 22)
+        self.assertIs(value, DateTime.convert(value))
+
 
 
 
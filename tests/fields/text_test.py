@@ -63,6 +63,13 @@ class TextTest(BaseTestCase):
         mapping = field.search_mapping()
         self.assertEquals('text', mapping['type'])
 
+    def test_converting_values_without_field_instance(self):
+        """ Converting text values with class-level converters """
+        self.assertEquals('123', Text.convert(123))
+        self.assertIsNone(Text.convert(None))
+        self.assertEquals('value', Text.value_from_db('value'))
+        self.assertEquals('value', Text.value_to_json('value'))
+
 
 
 
@@ -1,7 +1,7 @@
 from tests.base import BaseTestCase
 from nose.plugins.attrib import attr
 
-from shiftcontent.item import Item
+from shiftcontent.item import Item, ItemLayout
 from shiftcontent import exceptions as x
 from datetime import datetime
 from uuid import uuid1
@@ -17,6 +17,13 @@ class ItemTest(BaseTestCase):
         item = Item()
         self.assertIsInstance(item, Item)
 
+    def test_getting_parent_id_from_path(self):
+        """ Getting item parent id from its path """
+        item = Item(type='plain_text')
+        self.assertIsNone(item.parent_id)
+        item.path = 'root.parent'
+        self.assertEquals('parent', item.parent_id)
+
     def test_can_access_field_types(self):
         """ Content item has access to field types """
         item = Item()
@@ -88,6 +95,24 @@ class ItemTest(BaseTestCase):
         self.assertIn('type', item.fields)
         self.assertIn('body', item.fields)
 
+    def test_items_of_same_type_share_layout(self):
+        """ Items of the same content type share compiled layout """
+        item1 = Item(type='plain_text', body='one')
+        item2 = Item(type='plain_text', body='two')
+        item3 = Item(type='markdown', body='three')
+        self.assertIsInstance(item1.layout, ItemLayout)
+        self.assertIs(item1.layout, item2.layout)
+        self.assertIsNot(item1.layout, item3.layout)
+        self.assertIn('body', item1.layout.custom_fields)
+        self.assertNotIn('body', Item().layout.converters)
+
+    def test_item_fields_hold_plain_values(self):
+        """ Item fields hold converted values rather than field objects """
+        item = Item(type='plain_text', path=123, body='I am a body')
+        self.assertEquals('123', item.fields['path'])
+        self.assertEquals('I am a body', item.fields['body'])
+        self.assertIsInstance(item.fields['created'], datetime)
+
     def test_throw_exception_when_setting_invalid_type(self):
         """ Unable to set nonexistent content type on an item """
         item = Item()
@@ -126,6 +151,16 @@ class ItemTest(BaseTestCase):
         item.author = 'UPDATED'
         self.assertEquals(data['author'], item.author)
 
+    def test_new_items_start_at_first_version(self):
+        """ New items start at version one that can't be changed directly """
+        item = Item(type='plain_text', author=123)
+        self.assertEquals(1, item.version)
+        item.version = 5
+        self.assertEquals(1, item.version)
+
+        item = Item(type='plain_text', author=123, version=3)
+        self.assertEquals(3, item.version)
+
     def test_item_to_dict(self):
         """ Getting dictionary representation of an item """
         item = Item()
@@ -0,0 +1,69 @@
+from tests.base import BaseTestCase
+from nose.plugins.attrib import attr
+
+import json
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
+from shiftcontent.database import json_fields
+from shiftcontent import exceptions as x
+
+
+@attr('db', 'json_fields')
+class JsonFieldsTest(BaseTestCase):
+
+    def tearDown(self):
+        json_fields._json_support.clear()
+        super().tearDown()
+
+    def test_compile_dialect_expressions(self):
+        """ Compiling json update expressions for different dialects """
+        column = self.db.tables['items'].c.fields
+
+        expr = json_fields.set_field_expression('mysql', column, 'body', 1)
+        sql = str(expr.compile(dialect=mysql.dialect()))
+        self.assertIn('JSON_SET', sql)
+
+        expr = json_fields.set_field_expression('postgresql', column, 'body', 1)
+        sql = str(expr.compile(dialect=postgresql.dialect()))
+        self.assertIn('jsonb_set', sql)
+
+    def test_set_field_in_place(self):
+        """ Setting custom field in a single statement """
+        item = self.insert_item()
+        with self.db.engine.begin() as conn:
+            self.assertTrue(json_fields.supports_json(conn))
+            row = json_fields.set_field(conn, item.object_id, 'body', 'New')
+
+        fields = json.loads(row.fields)
+        self.assertEquals('New', fields['body'])
+
+    def test_set_field_with_compare_and_swap(self):
+        """ Setting custom field without json support in database """
+        item = self.insert_item()
+        json_fields._json_support[id(self.db.engine)] = False
+        with self.db.engine.begin() as conn:
+            self.assertFalse(json_fields.supports_json(conn))
+            row = json_fields.set_field(conn, item.object_id, 'body', 'New')
+            missing = json_fields.set_field(conn, 'nope', 'body', 'New')
+
+        self.assertEquals('New', json.loads(row.fields)['body'])
+        self.assertIsNone(missing)
+
+    def test_raise_on_stale_version_when_setting_in_place(self):
+        """ Stale version raises conflict instead of returning nothing """
+        item = self.insert_item()
+        with self.assertRaises(x.VersionConflict) as cm:
+            with self.db.engine.begin() as conn:
+                self.assertTrue(json_fields.supports_json(conn))
+                json_fields.set_field(
+                    conn,
+                    item.object_id,
+                    'body',
+                    'New',
+                    version=item.version + 1
+                )
+
+        self.assertEquals(item.version, cm.exception.actual)
+        with self.db.engine.begin() as conn:
+            missing = json_fields.set_field(conn, 'nope', 'body', 'New')
+        self.assertIsNone(missing)
@@ -0,0 +1,58 @@
+from unittest import TestCase
+from nose.plugins.attrib import attr
+import time
+
+from shiftcontent.local_cache import LocalCache
+
+
+@attr('cache', 'local')
+class LocalCacheTest(TestCase):
+
+    def test_create_local_cache(self):
+        """ Creating local cache """
+        cache = LocalCache(size=10, ttl=5)
+        self.assertIsInstance(cache, LocalCache)
+        self.assertEquals(10, cache.size)
+        self.assertEquals(5, cache.ttl)
+
+    def test_set_and_get(self):
+        """ Putting and getting values from local cache """
+        cache = LocalCache()
+        cache.set('key', 'value')
+        self.assertEquals('value', cache.get('key'))
+        self.assertIsNone(cache.get('nonexistent'))
+
+    def test_expired_entries_are_dropped(self):
+        """ Local cache drops expired entries """
+        cache = LocalCache(ttl=0.01)
+        cache.set('key', 'value')
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('key'))
+        self.assertEquals(0, len(cache))
+
+    def test_evict_least_recently_used(self):
+        """ Local cache evicts least recently used entries when full """
+        cache = LocalCache(size=2)
+        cache.set('one', 1)
+        cache.set('two', 2)
+        cache.get('one')
+        cache.set('three', 3)
+
+        self.assertEquals(2, len(cache))
+        self.assertIn('one', cache)
+        self.assertIn('three', cache)
+        self.assertNotIn('two', cache)
+
+    def test_delete(self):
+        """ Deleting entries from local cache """
+        cache = LocalCache()
+        cache.set('one', 1)
+        cache.set('two', 2)
+
+        cache.delete('one')
+        self.assertNotIn('one', cache)
+        self.assertIn('two', cache)
+
+        cache.delete_all()
+        self.assertEquals(0, len(cache))
+
@@ -0,0 +1,149 @@
+from tests.base import BaseTestCase
+from nose.plugins.attrib import attr
+
+from unittest import mock
+from datetime import datetime, timedelta
+from shiftevent.event import Event
+from shiftcontent.database import outbox
+from shiftcontent.event_handlers import ContentItemUpdate
+from shiftcontent.outbox_worker import OutboxWorker
+from shiftcontent import cache_service
+
+
+class RecordingWorker(OutboxWorker):
+    """ Worker that records applied changes instead of indexing them """
+    def __init__(self, *args, errors=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.applied = []
+        self.errors = errors or dict()
+
+    def apply(self, items, deletes):
+        self.applied.append((items, deletes))
+        return self.errors
+
+
+@attr('outbox')
+class OutboxWorkerTest(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.db.init(self.db_url, outbox=True)
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        super().tearDown()
+
+    def entries(self):
+        """ Get all outbox entries """
+        with self.db.engine.begin() as conn:
+            query = self.db.tables['outbox'].select()
+            return conn.execute(query).fetchall()
+
+    def test_skip_enqueueing_when_outbox_disabled(self):
+        """ Entries are not queued unless outbox is enabled """
+        self.db.init(self.db_url)
+        with self.db.engine.begin() as conn:
+            outbox.put(conn, [('plain_text', '123')])
+        self.assertEquals([], self.entries())
+
+    def test_coalesce_entries_by_object_id(self):
+        """ Multiple updates of an item are applied once """
+        item = self.insert_item()
+        with self.db.engine.begin() as conn:
+            outbox.put(conn, [(item.type, item.object_id)] * 3)
+            outbox.delete(conn, [('plain_text', 'gone')])
+
+        worker = RecordingWorker()
+        self.assertEquals(4, worker.drain())
+        self.assertEquals(1, len(worker.applied))
+
+        items, deletes = worker.applied[0]
+        self.assertEquals([item.object_id], [i.object_id for i in items])
+        self.assertEquals('Some body', items[0].body)
+        self.assertEquals([('plain_text', 'gone')], deletes)
+        self.assertEquals([], self.entries())
+
+    def test_put_of_deleted_item_becomes_delete(self):
+        """ Items missing in the database get removed from index """
+        with self.db.engine.begin() as conn:
+            outbox.put(conn, [('plain_text', 'missing')])
+
+        worker = RecordingWorker()
+        worker.drain()
+        self.assertEquals([([], [('plain_text', 'missing')])], worker.applied)
+
+    def test_retry_failed_entries_with_backoff(self):
+        """ Failed entries are postponed and eventually given up on """
+        item = self.insert_item()
+        with self.db.engine.begin() as conn:
+            outbox.put(conn, [(item.type, item.object_id)] * 2)
+
+        worker = RecordingWorker(
+            errors={item.object_id: 'Boom'},
+            max_attempts=2
+        )
+        worker.drain()
+
+        entries = self.entries()
+        self.assertEquals(1, len(entries))
+        self.assertEquals(1, entries[0].attempts)
+        self.assertEquals('Boom', entries[0].error)
+        self.assertGreater(entries[0].retry_at, datetime.utcnow())
+
+        stats = worker.stats()
+        self.assertEquals(1, stats['pending'])
+        self.assertEquals(0, stats['failed'])
+        self.assertGreaterEqual(stats['lag'], 0)
+
+        # make it due and fail again
+        with self.db.engine.begin() as conn:
+            table = self.db.tables['outbox']
+            past = datetime.utcnow() - timedelta(seconds=1)
+            conn.execute(table.update().values(retry_at=past))
+
+        worker.drain()
+        stats = worker.stats()
+        self.assertEquals(0, stats['pending'])
+        self.assertEquals(1, stats['failed'])
+        self.assertEquals(0, stats['lag'])
+
+    def test_handlers_queue_index_updates(self):
+        """ Handlers queue index updates when outbox is enabled """
+        cache_service.init()
+        item = self.insert_item(body='Initial body')
+        old_data = item.to_json()
+        item.body = 'Updated body'
+
+        handler = ContentItemUpdate()
+        handler.handle(Event(
+            id=123,
+            type='CONTENT_ITEM_UPDATE',
+            author=123,
+            object_id=item.object_id,
+            payload=item.to_json(),
+            payload_rollback=old_data
+        ))
+
+        entries = self.entries()
+        self.assertEquals(1, len(entries))
+        self.assertEquals(outbox.PUT, entries[0].action)
+        self.assertEquals(item.object_id, entries[0].object_id)
+        self.assertEquals('Updated body', cache_service.get(item.object_id).body)
+        cache_service.drop_cache(cache_service.cache_name)
+
+    def test_skip_locked_rows_only_where_supported(self):
+        """ Skipping locked rows depends on database server version """
+        def supported(name, version, mariadb=False):
+            dialect = mock.Mock(server_version_info=version)
+            dialect.name = name
+            dialect._is_mariadb = mariadb
+            return outbox.supports_skip_locked(mock.Mock(dialect=dialect))
+
+        self.assertTrue(supported('mysql', (8, 0, 21)))
+        self.assertFalse(supported('mysql', (5, 7, 30)))
+        self.assertFalse(supported('mysql', (10, 3, 9, 'MariaDB'), True))
+        self.assertTrue(supported('mysql', (10, 6, 4, 'MariaDB'), True))
+        self.assertTrue(supported('postgresql', (12,)))
+        self.assertFalse(supported('postgresql', (9, 4)))
+        with self.db.engine.begin() as conn:
+            self.assertTrue(outbox.supports_skip_locked(conn))
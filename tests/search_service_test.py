@@ -2,6 +2,7 @@ from tests.base import BaseTestCase
 from nose.plugins.attrib import attr
 
 from uuid import uuid1
+from unittest import mock
 from pprint import pprint as pp
 from elasticsearch import Elasticsearch
 from shiftcontent import search_service
@@ -204,6 +205,167 @@ class SearchServiceTest(BaseTestCase):
             result['hits']['hits'][0]['_source']['body']
         )
 
+    def test_raise_when_bulk_indexing_bad_item(self):
+        """ Raise when trying to bulk index something that is not an item """
+        with self.assertRaises(x.SearchError) as cm:
+            search_service.put_many(['crap'])
+        self.assertIn('Item must be of type', str(cm.exception))
+
+    def test_can_bulk_index_items(self):
+        """ Putting multiple items to index with bulk requests """
+        items = []
+        for i in range(5):
+            items.append(Item(
+                id=i + 1,
+                type='plain_text',
+                object_id=str(uuid1()),
+                author=123,
+                body='Body content {}'.format(i)
+            ))
+
+        failures = search_service.put_many(items, chunk_size=2)
+        self.assertEquals([], failures)
+        for item in items:
+            found = search_service.get(item.type, item.object_id)
+            self.assertEquals(item.object_id, found['_id'])
+
+    def test_bulk_indexing_reports_failed_documents(self):
+        """ Bulk indexing collects per-document failures """
+        good = Item(id=1, type='blog_post', object_id=str(uuid1()), author=1)
+        bad = Item(id=2, type='blog_post', object_id=str(uuid1()), author=1)
+        bad.fields['published'] = 'not a date'
+
+        failures = search_service.put_many([good, bad], raise_on_error=False)
+        self.assertEquals(1, len(failures))
+        self.assertEquals(bad.object_id, failures[0]['object_id'])
+        self.assertIsNotNone(search_service.get(good.type, good.object_id))
+
+        with self.assertRaises(x.BulkIndexError) as cm:
+            search_service.put_many([bad])
+        self.assertEquals(1, len(cm.exception.failures))
+
+    def test_bulk_indexing_with_refresh_disabled(self):
+        """ Toggling refresh interval during bulk load """
+        item = Item(
+            id=123,
+            type='plain_text',
+            object_id=str(uuid1()),
+            author=123,
+            body='Here is some body content'
+        )
+
+        search_service.index_info(item.type)
+        index_name = search_service.index_name(item.type)
+        search_service.es.indices.put_settings(
+            index=index_name,
+            body={'index': {'refresh_interval': '5s'}}
+        )
+
+        search_service.put_many([item], disable_refresh=True)
+        found = search_service.get(item.type, item.object_id)
+        self.assertIsNotNone(found)
+
+        settings = search_service.es.indices.get_settings(index=index_name)
+        self.assertEquals(1, len(settings))
+        for index in settings.values():
+            interval = index['settings']['index'].get('refresh_interval')
+            self.assertEquals('5s', interval)
+
+    def test_new_indices_are_created_behind_alias(self):
+        """ Creating index under versioned name with an alias """
+        search_service.index_info('plain_text')
+        alias = search_service.index_name('plain_text')
+        aliases = search_service.es.indices.get_alias(name=alias)
+        self.assertEquals(1, len(aliases))
+        self.assertTrue(list(aliases)[0].startswith(alias + '.'))
+
+    def test_rebuilding_index(self):
+        """ Rebuilding index from database and swapping alias """
+        items = self.db.tables['items']
+        object_ids = [str(uuid1()) for _ in range(3)]
+        with self.db.engine.begin() as conn:
+            for object_id in object_ids:
+                item = Item(
+                    type='plain_text',
+                    author=1,
+                    object_id=object_id,
+                    body='Item {}'.format(object_id)
+                )
+                conn.execute(items.insert().values(**item.to_db(False)))
+
+        search_service.index_info('plain_text')
+        alias = search_service.index_name('plain_text')
+        old_index = list(search_service.es.indices.get_alias(name=alias))[0]
+
+        indexed = search_service.rebuild_index('plain_text', batch_size=2)
+        self.assertEquals(3, indexed)
+
+        new_index = list(search_service.es.indices.get_alias(name=alias))
+        self.assertEquals(1, len(new_index))
+        self.assertNotEquals(old_index, new_index[0])
+        self.assertFalse(search_service.es.indices.exists(old_index))
+
+        for object_id in object_ids:
+            found = search_service.get('plain_text', object_id)
+            self.assertIsNotNone(found)
+
+    def test_rebuilding_index_catches_up_with_writes(self):
+        """ Items written during rebuild end up in the new index """
+        items = self.db.tables['items']
+        object_ids = [str(uuid1()) for _ in range(4)]
+        with self.db.engine.begin() as conn:
+            for object_id in object_ids[:3]:
+                item = Item(
+                    type='plain_text',
+                    author=1,
+                    object_id=object_id,
+                    body='Item {}'.format(object_id)
+                )
+                conn.execute(items.insert().values(**item.to_db(False)))
+
+        catch_up = search_service.catch_up
+        calls = []
+
+        def write_during_load(*args, **kwargs):
+            if not calls:
+                with self.db.engine.begin() as conn:
+                    item = Item(
+                        type='plain_text',
+                        author=1,
+                        object_id=object_ids[3],
+                        body='New item'
+                    )
+                    conn.execute(items.insert().values(**item.to_db(False)))
+                    where = items.c.object_id == object_ids[1]
+                    conn.execute(items.update().where(where).values(
+                        version=items.c.version + 1,
+                        fields='{"body": "Updated item"}'
+                    ))
+                    where = items.c.object_id == object_ids[2]
+                    conn.execute(items.delete().where(where))
+            calls.append(args)
+            return catch_up(*args, **kwargs)
+
+        with mock.patch.object(search_service, 'catch_up', write_during_load):
+            indexed = search_service.rebuild_index('plain_text', batch_size=2)
+
+        self.assertEquals(3, indexed)
+        self.assertIsNotNone(search_service.get('plain_text', object_ids[3]))
+        self.assertIsNone(search_service.get('plain_text', object_ids[2]))
+        found = search_service.get('plain_text', object_ids[1])
+        self.assertEquals('Updated item', found['_source']['body'])
+
+    def test_rebuilding_legacy_index_without_alias(self):
+        """ Rebuilding index that was created without an alias """
+        alias = search_service.index_name('plain_text')
+        config = search_service.get_index_config('plain_text')
+        search_service.es.indices.create(**config)
+
+        search_service.rebuild_index('plain_text')
+        aliases = search_service.es.indices.get_alias(name=alias)
+        self.assertEquals(1, len(aliases))
+        self.assertNotIn(alias, aliases)
+
     def test_getting_item_by_id(self):
         """ Search service can get item by id """
         item = Item(
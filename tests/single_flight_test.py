@@ -0,0 +1,66 @@
+from tests.base import BaseTestCase
+from nose.plugins.attrib import attr
+
+import threading
+import time
+from shiftcontent.single_flight import SingleFlight
+
+
+@attr('single_flight')
+class SingleFlightTest(BaseTestCase):
+
+    def test_create_single_flight(self):
+        """ Creating single flight """
+        flight = SingleFlight()
+        self.assertIsInstance(flight, SingleFlight)
+
+    def test_run_call(self):
+        """ Running a call returns its result """
+        flight = SingleFlight()
+        result, shared = flight.do('key', lambda a, b: a + b, 1, b=2)
+        self.assertEquals(3, result)
+        self.assertFalse(shared)
+        self.assertEquals(0, len(flight))
+
+    def test_concurrent_calls_are_coalesced(self):
+        """ Concurrent calls with the same key run only once """
+        flight = SingleFlight()
+        started = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return 'result'
+
+        results = []
+        run = lambda: results.append(flight.do('key', slow))
+        leader = threading.Thread(target=run)
+        leader.start()
+        started.wait()
+        self.assertIn('key', flight)
+
+        followers = [threading.Thread(target=run) for _ in range(5)]
+        for thread in followers:
+            thread.start()
+        for thread in [leader] + followers:
+            thread.join()
+
+        self.assertEquals(1, len(calls))
+        self.assertEquals(6, len(results))
+        self.assertEquals(5, len([r for r in results if r == ('result', True)]))
+        self.assertNotIn('key', flight)
+
+    def test_errors_are_shared_and_not_cached(self):
+        """ Errors are raised to all waiting callers but not remembered """
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError('Failed')
+
+        with self.assertRaises(ValueError):
+            flight.do('key', fail)
+
+        result, shared = flight.do('key', lambda: 'ok')
+        self.assertEquals('ok', result)
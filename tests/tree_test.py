@@ -0,0 +1,90 @@
+from tests.base import BaseTestCase
+from nose.plugins.attrib import attr
+
+from sqlalchemy import select
+from datetime import datetime
+from shiftcontent.database import tree
+
+
+@attr('db', 'tree')
+class TreeTest(BaseTestCase):
+
+    def links(self):
+        """ Get all closure rows as a set of tuples """
+        table = self.db.tables['tree']
+        with self.db.engine.begin() as conn:
+            rows = conn.execute(select([table])).fetchall()
+        return set((r.ancestor, r.descendant, r.depth) for r in rows)
+
+    def test_get_node_rows_from_path(self):
+        """ Getting closure rows for item from its path """
+        rows = tree.node_rows('c', 'a.b')
+        self.assertIn(dict(ancestor='c', descendant='c', depth=0), rows)
+        self.assertIn(dict(ancestor='b', descendant='c', depth=1), rows)
+        self.assertIn(dict(ancestor='a', descendant='c', depth=2), rows)
+        self.assertEquals(3, len(rows))
+
+    def test_insert_and_delete_nodes(self):
+        """ Inserting and deleting tree nodes """
+        with self.db.engine.begin() as conn:
+            tree.insert_nodes(conn, [('a', None), ('b', 'a')])
+        self.assertEquals(
+            {('a', 'a', 0), ('b', 'b', 0), ('a', 'b', 1)},
+            self.links()
+        )
+
+        with self.db.engine.begin() as conn:
+            tree.delete_node(conn, 'b')
+        self.assertEquals({('a', 'a', 0)}, self.links())
+
+    def test_replace_nodes(self):
+        """ Relinking moved subtree to new ancestors """
+        with self.db.engine.begin() as conn:
+            tree.insert_nodes(conn, [
+                ('a', None),
+                ('b', 'a'),
+                ('c', 'a.b'),
+                ('x', None),
+                ('y', 'x'),
+            ])
+            tree.replace_nodes(conn, [('b', 'x.y'), ('c', 'x.y.b')])
+
+        links = self.links()
+        self.assertIn(('y', 'b', 1), links)
+        self.assertIn(('x', 'b', 2), links)
+        self.assertIn(('y', 'c', 2), links)
+        self.assertIn(('x', 'c', 3), links)
+        self.assertIn(('b', 'c', 1), links)
+        self.assertNotIn(('a', 'b', 1), links)
+        self.assertNotIn(('a', 'c', 2), links)
+
+    def test_replace_nodes_moving_to_root(self):
+        """ Relinking subtree moved to root level """
+        with self.db.engine.begin() as conn:
+            tree.insert_nodes(conn, [('a', None), ('b', 'a'), ('c', 'a.b')])
+            tree.replace_nodes(conn, [('b', None), ('c', 'b')])
+
+        self.assertEquals(
+            {('a', 'a', 0), ('b', 'b', 0), ('c', 'c', 0), ('b', 'c', 1)},
+            self.links()
+        )
+
+    def test_rebuild_from_paths(self):
+        """ Rebuilding closure table from item paths """
+        items = self.db.tables['items']
+        rows = [('a', None), ('b', 'a'), ('c', 'a.b')]
+        with self.db.engine.begin() as conn:
+            for object_id, path in rows:
+                conn.execute(items.insert().values(
+                    created=datetime.utcnow(),
+                    type='plain_text',
+                    author='1',
+                    object_id=object_id,
+                    path=path,
+                    fields='{}'
+                ))
+            count = tree.rebuild(conn, batch_size=2)
+
+        self.assertEquals(3, count)
+        self.assertIn(('a', 'c', 2), self.links())
+        self.assertEquals(6, len(self.links()))
@@ -0,0 +1,167 @@
+from tests.base import BaseTestCase
+from nose.plugins.attrib import attr
+
+from uuid import uuid1
+from datetime import datetime
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateIndex
+from shiftcontent import definition_service
+from shiftcontent import content_service
+from shiftcontent.database import type_tables
+
+
+@attr('db', 'type_tables')
+class TypeTablesTest(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.db.init(self.db_url, type_tables=True)
+        definition_service.init(self.definition_path, self.revisions_path)
+        definition_service.definition
+
+    def tearDown(self):
+        self.db.engine.dispose()
+        super().tearDown()
+
+    def columns(self, table_name):
+        """ Get column types of a table in the database """
+        inspector = sa.inspect(self.db.engine)
+        columns = inspector.get_columns(table_name)
+        return {c['name']: type(c['type']) for c in columns}
+
+    def insert_posts(self, titles):
+        """ Insert blog posts and put them to type table """
+        created = [
+            self.insert_item(
+                'blog_post',
+                title=title,
+                published='2018-01-0{} 12:00:00'.format(i + 1)
+            )
+            for i, title in enumerate(titles)
+        ]
+        with self.db.engine.begin() as conn:
+            type_tables.put_items(conn, created)
+
+        return created
+
+    def test_create_tables_on_loading_definition(self):
+        """ Creating type tables when definition is loaded """
+        columns = self.columns('content_type_blog_post')
+        self.assertIn('object_id', columns)
+        self.assertTrue(issubclass(columns['title'], sa.Text))
+        self.assertTrue(issubclass(columns['published'], sa.DateTime))
+
+    def test_add_columns_for_new_fields(self):
+        """ Adding columns for new fields to existing tables """
+        definition = dict(thing=dict(fields=[
+            dict(handle='name', type='text'),
+        ]))
+        type_tables.sync(definition)
+        columns = self.columns('content_type_thing')
+        self.assertEquals({'object_id', 'name'}, set(columns))
+
+        definition['thing']['fields'].append(
+            dict(handle='rating', type='integer', indexed=True)
+        )
+        type_tables.sync(definition)
+        columns = self.columns('content_type_thing')
+        self.assertTrue(issubclass(columns['rating'], sa.Integer))
+
+        indexes = sa.inspect(self.db.engine).get_indexes('content_type_thing')
+        self.assertEquals([['rating']], [i['column_names'] for i in indexes])
+
+    def test_index_text_columns_by_prefix_on_mysql(self):
+        """ Indexes of text columns have key length on mysql """
+        table = type_tables.define_table('thing', dict(fields=[
+            dict(handle='name', type='text', indexed=True),
+            dict(handle='rating', type='integer', indexed=True),
+        ]))
+        indexes = {i.name: i for i in table.indexes}
+        self.assertEquals(2, len(indexes))
+
+        ddl = CreateIndex(indexes['ix_content_type_thing_name'])
+        self.assertIn('(name(768))', str(ddl.compile(dialect=mysql.dialect())))
+        ddl = CreateIndex(indexes['ix_content_type_thing_rating'])
+        self.assertIn('(rating)', str(ddl.compile(dialect=mysql.dialect())))
+
+        type_tables.sync(dict(thing=dict(fields=[
+            dict(handle='name', type='text', indexed=True),
+        ])))
+        indexes = sa.inspect(self.db.engine).get_indexes('content_type_thing')
+        self.assertEquals([['name']], [i['column_names'] for i in indexes])
+
+    def test_type_tables_do_not_collide_with_core_tables(self):
+        """ Content types named like core tables get their own tables """
+        self.insert_posts(['One'])
+        definition = dict(items=dict(fields=[
+            dict(handle='name', type='text'),
+        ]))
+        type_tables.sync(definition)
+        self.assertIn('content_type_items', self.db.engine.table_names())
+        self.assertNotIn('name', self.columns('content_items'))
+
+        with self.db.engine.begin() as conn:
+            conn.execute(type_tables.table('items').delete())
+            items = conn.execute(self.db.tables['items'].select()).fetchall()
+        self.assertEquals(1, len(items))
+
+    def test_recreate_table_when_field_changes_type(self):
+        """ Recreating and repopulating table when field changes type """
+        definition = dict(thing=dict(fields=[
+            dict(handle='rating', type='text'),
+        ]))
+        type_tables.sync(definition)
+        items = self.db.tables['items']
+        with self.db.engine.begin() as conn:
+            conn.execute(items.insert(), **dict(
+                created=datetime.utcnow(),
+                type='thing',
+                author='123',
+                object_id=str(uuid1()),
+                fields='{"rating": "5"}',
+            ))
+
+        definition['thing']['fields'][0]['type'] = 'integer'
+        type_tables.sync(definition)
+        columns = self.columns('content_type_thing')
+        self.assertTrue(issubclass(columns['rating'], sa.Integer))
+        with self.db.engine.begin() as conn:
+            row = conn.execute(type_tables.table('thing').select()).fetchone()
+        self.assertEquals(5, row.rating)
+
+    def test_put_and_delete_items(self):
+        """ Putting items to type table and deleting them """
+        item = self.insert_posts(['Some title'])[0]
+        table = type_tables.table('blog_post')
+        with self.db.engine.begin() as conn:
+            row = conn.execute(table.select()).fetchone()
+            self.assertEquals(item.object_id, row.object_id)
+            self.assertEquals('Some title', row.title)
+            self.assertEquals(datetime(2018, 1, 1, 12), row.published)
+
+            type_tables.delete_items(conn, 'blog_post', [item.object_id])
+            self.assertIsNone(conn.execute(table.select()).fetchone())
+
+    def test_rebuild_type_tables(self):
+        """ Rebuilding type tables from items """
+        self.insert_posts(['One', 'Two'])
+        with self.db.engine.begin() as conn:
+            conn.execute(type_tables.table('blog_post').delete())
+            count = type_tables.rebuild(conn, batch_size=1)
+
+        self.assertEquals(2, count)
+        with self.db.engine.begin() as conn:
+            rows = conn.execute(type_tables.table('blog_post').select())
+            self.assertEquals({'One', 'Two'}, set(r.title for r in rows))
+
+    def test_listing_items_filtered_by_type_table_columns(self):
+        """ Listing items filtered and ordered by type table columns """
+        created = self.insert_posts(['One', 'Two', 'Three'])
+        page = content_service.list_items(
+            content_type='blog_post',
+            where=dict(title=('in', ['One', 'Three'])),
+            order_by='-published'
+        )
+        ids = [item.id for item in page['items']]
+        self.assertEquals([created[2].id, created[0].id], ids)